@@ -1,67 +1,171 @@
-import streamlit as st
-import pandas as pd
-import plotly.express as px
-import seaborn as sns
-import matplotlib.pyplot as plt
-
-# Load data
-@st.cache_data
-def load_data():
-    file_path = "/mnt/data/CFC Physical Capability Data_.csv"
-    df = pd.read_csv(file_path)
-    return df
-
-df = load_data()
-
-df["Date"] = pd.to_datetime(df["Date"])
-
-# Sidebar filters
-st.sidebar.header("Filters")
-movement = st.sidebar.selectbox("Select Movement", df["MOVEMENT"].unique())
-quality_options = st.sidebar.multiselect("Select Quality", df["QUALITY"].unique(), default=df["QUALITY"].unique()[0])
-expression_options = st.sidebar.multiselect("Select Expression", df["EXPRESSION"].unique(), default=df["EXPRESSION"].unique()[0])
-
-# Filter data
-df_filtered = df[(df["MOVEMENT"] == movement) & (df["QUALITY"].isin(quality_options)) & (df["EXPRESSION"].isin(expression_options))]
-
-# Title
-st.title("Football Player Physical Performance Dashboard")
-
-# Line chart of performance over time
-st.subheader(f"Performance Trend for {movement}")
-fig = px.line(df_filtered, x="Date", y="Score", color="QUALITY", title="Performance Score Over Time")
-st.plotly_chart(fig)
-
-# Benchmark comparison
-if "BenchmarkPct" in df_filtered.columns:
-    st.subheader("Benchmark Comparison")
-    fig_bench = px.line(df_filtered, x="Date", y="BenchmarkPct", color="QUALITY", title="Benchmark Percentage Over Time")
-    st.plotly_chart(fig_bench)
-
-# Heatmap of performance trends
-st.subheader("Performance Heatmap")
-heatmap_data = df.pivot_table(index="QUALITY", columns="Date", values="Score", aggfunc="mean")
-plt.figure(figsize=(12, 6))
-sns.heatmap(heatmap_data, cmap="coolwarm", linewidths=0.5)
-st.pyplot(plt)
-
-# Detect performance peaks and drops
-st.subheader("Performance Peaks & Drops")
-df_filtered["Score_Diff"] = df_filtered["Score"].diff()
-df_peaks = df_filtered[df_filtered["Score_Diff"] > df_filtered["Score_Diff"].quantile(0.95)]
-df_drops = df_filtered[df_filtered["Score_Diff"] < df_filtered["Score_Diff"].quantile(0.05)]
-st.write("### Performance Peaks")
-st.dataframe(df_peaks)
-st.write("### Performance Drops")
-st.dataframe(df_drops)
-
-# Correlation between qualities
-st.subheader("Correlation Between Qualities")
-corr_matrix = df.pivot_table(index="Date", columns="QUALITY", values="Score", aggfunc="mean").corr()
-plt.figure(figsize=(10, 6))
-sns.heatmap(corr_matrix, annot=True, cmap="coolwarm", linewidths=0.5)
-st.pyplot(plt)
-
-# Show data table
-st.subheader("Raw Data")
-st.dataframe(df_filtered)
+import streamlit as st
+import pandas as pd
+
+import cfc_charts as charts
+import cfc_store as store
+from cfc_correlation import CorrelationService
+from cfc_data import PHYSICAL_CAPABILITY_CSV, source_fingerprint
+from cfc_events import PeakDropDetector
+from cfc_export import EXPORT_FORMATS, PAGE_SIZES, TableView, n_pages, export_bytes
+from cfc_heatmap import HeatmapEngine, correlation_figure
+from cfc_profiling import PROFILE_DEFAULT, Profiler, cache_stats, counted_cache, section
+
+COLUMNS = {
+    "testDate": "Date",
+    "expression": "EXPRESSION",
+    "movement": "MOVEMENT",
+    "quality": "QUALITY",
+    "benchmarkPct": "Score",
+}
+
+# Opt-in profiling: wall time and memory per section, cache hit rates
+profiler = Profiler("PeakMotion_app1").start() if st.session_state.get("profiling", PROFILE_DEFAULT) else None
+cache_resource = counted_cache(st.cache_resource)
+
+
+def plotly_chart(fig, name=None, **kwargs):
+    with section(name or fig.layout.title.text or "figure", "chart"):
+        st.plotly_chart(fig, **kwargs)
+
+# Load data (disk-backed store keyed on the CSV content, warmed by `python cfc_store.py warm`)
+# One read-only copy per process shared by every session (st.cache_data would copy it per call)
+@cache_resource
+def load_data(fingerprint):
+    return store.capability_cube().freeze()
+
+# Heatmap engine shared across sessions (cached pivots, no global matplotlib state)
+@cache_resource
+def load_heatmap_engine(fingerprint):
+    return HeatmapEngine(load_data(fingerprint))
+
+# Peak/drop detector over all 20 series, updated incrementally as tests arrive
+@cache_resource
+def load_detector(fingerprint):
+    return PeakDropDetector.from_frame(store.physical_capability())
+
+# Pairwise-complete correlations on a weekly grid, cached per window
+@cache_resource
+def load_correlation_service(fingerprint):
+    return CorrelationService(None, None, load_data(fingerprint))
+
+# Raw data browser over every series: filtering, sorting and paging run server-side on the shared frame
+@cache_resource
+def load_table_view(fingerprint):
+    return TableView(load_data(fingerprint).frame().rename(columns=COLUMNS))
+
+fingerprint = source_fingerprint(PHYSICAL_CAPABILITY_CSV)
+cube = load_data(fingerprint)
+heatmap_engine = load_heatmap_engine(fingerprint)
+detector = load_detector(fingerprint)
+correlation_service = load_correlation_service(fingerprint)
+
+# Sidebar filters
+st.sidebar.header("Filters")
+st.sidebar.toggle("Profiling mode", value=PROFILE_DEFAULT, key="profiling",
+                  help="Time and memory per section; applies from the next run.")
+movement = st.sidebar.selectbox("Select Movement", cube.levels("movement"))
+quality_options = st.sidebar.multiselect("Select Quality", cube.levels("quality"), default=cube.levels("quality")[0])
+expression_options = st.sidebar.multiselect("Select Expression", cube.levels("expression"), default=cube.levels("expression")[0])
+
+# Filter data (direct slice of the cube columns for the selected series)
+with section("cube.frame", "filter"):
+    df_filtered = cube.frame(movement=movement, quality=quality_options, expression=expression_options).rename(columns=COLUMNS)
+
+# Title
+st.title("Football Player Physical Performance Dashboard")
+
+# Line chart of performance over time
+st.subheader(f"Performance Trend for {movement}")
+fig = charts.line(df_filtered, x="Date", y="Score", color="QUALITY", title="Performance Score Over Time")
+plotly_chart(fig)
+
+# Benchmark comparison
+if "BenchmarkPct" in df_filtered.columns:
+    st.subheader("Benchmark Comparison")
+    fig_bench = charts.line(df_filtered, x="Date", y="BenchmarkPct", color="QUALITY", title="Benchmark Percentage Over Time")
+    plotly_chart(fig_bench)
+
+# Heatmap of performance trends
+st.subheader("Performance Heatmap")
+# Dates are binned by week, month or season depending on the span
+fig_heatmap = heatmap_engine.figure("quality", labels={"x": "Period", "y": "QUALITY", "color": "Score"})
+plotly_chart(fig_heatmap, name="Performance Heatmap")
+
+# Detect performance peaks and drops
+st.subheader("Performance Peaks & Drops")
+# Rolling z-score of each test-to-test change within its own series
+with section("peaks & drops", "filter"):
+    events = detector.events()
+    events_filtered = events[
+        (events["movement"] == movement) & (events["quality"].isin(quality_options)) & (events["expression"].isin(expression_options))
+    ].rename(columns=COLUMNS)
+df_peaks = events_filtered[events_filtered["event"] == "peak"]
+df_drops = events_filtered[events_filtered["event"] == "drop"]
+st.write("### Performance Peaks")
+st.dataframe(df_peaks)
+st.write("### Performance Drops")
+st.dataframe(df_drops)
+st.write("### Peaks & Drops Across All Series")
+with section("events per series", "aggregate"):
+    event_counts = events.groupby(["expression", "movement", "quality", "event"], observed=True).size().unstack(fill_value=0)
+st.dataframe(event_counts)
+
+# Correlation between qualities
+st.subheader("Correlation Between Qualities")
+corr_matrix, corr_counts = correlation_service.quality_corr()
+plotly_chart(correlation_figure(corr_matrix, corr_counts), name="Correlation Between Qualities")
+
+# Show data table: only the visible page is sent to the browser, exports are written chunk by chunk.
+# As a fragment, only this browser reruns when its widgets change
+@st.fragment
+def render_raw_data(filters):
+    view = load_table_view(fingerprint)
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        sort_by = st.selectbox("Sort by", view.columns, key="raw_sort")
+    with col2:
+        ascending = st.radio("Order", ["Ascending", "Descending"], horizontal=True, key="raw_order") == "Ascending"
+    with col3:
+        page_size = st.selectbox("Rows per page", PAGE_SIZES, key="raw_page_size")
+
+    with section("raw data page", "filter"):
+        total = len(view.positions(filters, sort_by, ascending))
+        pages = n_pages(total, page_size)
+        # Fewer pages after a new selection: fall back to the last one
+        if st.session_state.get("raw_page", 1) > pages:
+            st.session_state["raw_page"] = pages
+        page = st.number_input(f"Page (of {pages})", min_value=1, max_value=pages, key="raw_page")
+        window, total = view.page(page - 1, page_size, filters, sort_by, ascending)
+    st.dataframe(window, hide_index=True)
+    st.caption(f"Rows {(page - 1) * page_size + min(len(window), 1)}-{(page - 1) * page_size + len(window)} of {total}")
+
+    fmt = st.radio("Export format", list(EXPORT_FORMATS), horizontal=True, key="raw_format")
+    st.download_button(
+        "Download selection",
+        # Built only on click (Streamlit >= 1.52), in row chunks
+        data=lambda: export_bytes(view, fmt, filters, sort_by, ascending),
+        file_name=f"{movement}.{fmt}",
+        mime=EXPORT_FORMATS[fmt],
+        key="raw_download",
+    )
+
+st.subheader("Raw Data")
+render_raw_data({"MOVEMENT": [movement], "QUALITY": quality_options, "EXPRESSION": expression_options})
+
+# Profiling panel: sections of this run and cache hit rates, also written to the structured log
+if profiler is not None:
+    profiler.stop()
+    caches = {
+        **cache_stats(),
+        "heatmap_engine": heatmap_engine.cache.stats(),
+        "correlation_service": correlation_service.cache.stats(),
+    }
+    profiler.log(caches)
+    with st.sidebar.expander("Profiling", expanded=True):
+        st.metric("Full run", f"{profiler.total_s * 1000:.0f} ms")
+        st.dataframe(profiler.frame().sort_values("ms", ascending=False).round(2), hide_index=True)
+        st.markdown("**Caches**")
+        st.dataframe(
+            pd.DataFrame.from_dict(caches, orient="index")
+            .reindex(columns=["calls", "misses", "hits", "hit_rate", "entries", "nbytes"]).round(3)
+        )
@@ -0,0 +1,621 @@
+import pandas as pd
+import plotly.express as px
+import plotly.graph_objects as go
+
+import cfc_charts as charts
+from cfc_benchmark import BenchmarkEngine
+from cfc_correlation import CorrelationService
+from cfc_cube import CapabilityCube
+from cfc_data import HR_ZONE_SECONDS_COLUMNS, HR_ZONES, RECOVERY_CATEGORIES, season_labels
+from cfc_downsample import CHART_WIDTH_FULL, CHART_WIDTH_HALF, downsample_frame, target_points
+from cfc_filters import FilterService, LRUViewCache
+from cfc_heatmap import correlation_figure
+from cfc_rollup import GPS_ROLLUP_COLUMNS, RECOVERY_ROLLUP_COLUMNS, RollupTable, grain_for, period_start
+from cfc_smoothing import TrendCurves
+from cfc_workload import WorkloadEngine, metric_column
+
+DEFAULT_RECOVERY_CATEGORIES = ['sleep_composite', 'subjective_composite', 'soreness_composite']
+
+# Données des priorités (simulées basées sur le document)
+PRIORITIES = [
+    {
+        'Priority': 1,
+        'Category': 'Recovery',
+        'Area': 'Sleep',
+        'Target': 'Increase average sleep by 1hr per night',
+        'Performance Type': 'Habit',
+        'Target Set': '07/03/2025',
+        'Review Date': '07/05/2025',
+        'Tracking': 'On Track',
+        'Progress': 75,
+        'Status': '🟡'
+    },
+    {
+        'Priority': 2,
+        'Category': 'Recovery',
+        'Area': 'Nutrition',
+        'Target': '45g of carbohydrate every half time',
+        'Performance Type': 'Habit',
+        'Target Set': '07/03/2025',
+        'Review Date': '07/05/2025',
+        'Tracking': 'On Track',
+        'Progress': 80,
+        'Status': '🟢'
+    },
+    {
+        'Priority': 3,
+        'Category': 'Performance',
+        'Area': 'Sprint',
+        'Target': '>65% in max velocity score',
+        'Performance Type': 'Outcome',
+        'Target Set': '07/03/2025',
+        'Review Date': '07/05/2025',
+        'Tracking': 'Achieved',
+        'Progress': 100,
+        'Status': '🟢'
+    }
+]
+
+
+# Statut de récupération (libellé, couleur) pour un score de référence
+def recovery_status(score):
+    if score > 0.1:
+        return "🟢 Excellent", "green"
+    if score > -0.1:
+        return "🟡 Bon", "orange"
+    return "🔴 Attention", "red"
+
+
+def format_category(column):
+    return column.replace('_composite', '').replace('_', ' ').title()
+
+
+# Calculs et figures de chaque onglet, sans appel à Streamlit : utilisés par le tableau de bord
+# et par le générateur de rapports (cfc_report). Chaque méthode renvoie (métriques, figures).
+class Dashboard:
+
+    def __init__(self, gps_data, recovery_data, capability_cube, hr_zone_malformed=None, filter_service=None,
+                 workload_engine=None, correlation_service=None, trend_curves=None, priority_store=None,
+                 rollups=None, squad_tests=None, benchmark_engine=None):
+        self.gps_data = gps_data
+        self.recovery_data = recovery_data
+        self.cube = capability_cube
+        self.hr_zone_malformed = hr_zone_malformed or {}
+        self.filter_service = filter_service or FilterService(gps_data, recovery_data, capability_cube, LRUViewCache())
+        self.workload_engine = workload_engine or WorkloadEngine.from_sessions(gps_data)
+        self.correlation_service = correlation_service or CorrelationService(gps_data, recovery_data, capability_cube)
+        self._trend_curves = trend_curves
+        self.priority_store = priority_store
+        self._rollups = dict(rollups or {})
+        # Résultats bruts des tests de l'effectif (facultatifs) et distributions de référence
+        self.squad_tests = squad_tests
+        self._benchmark_engine = benchmark_engine
+
+    @classmethod
+    def from_frames(cls, gps_data, recovery_data, physical_data, hr_zone_malformed=None, rollups=None):
+        return cls(gps_data, recovery_data, CapabilityCube.from_frame(physical_data), hr_zone_malformed, rollups=rollups)
+
+    # Tableau de bord restreint à un joueur (les capacités physiques restent celles de l'effectif)
+    def for_player(self, player_id):
+        return type(self)(
+            self.gps_data[self.gps_data['player_id'] == player_id].reset_index(drop=True),
+            self.recovery_data[self.recovery_data['player_id'] == player_id].reset_index(drop=True),
+            self.cube,
+            self.hr_zone_malformed,
+            trend_curves=self._trend_curves,
+            priority_store=self.priority_store,
+            squad_tests=self.squad_tests,
+            benchmark_engine=self._benchmark_engine
+        )
+
+    @property
+    def trend_curves(self):
+        if self._trend_curves is None:
+            self._trend_curves = TrendCurves.from_frame(self.cube.frame())
+        return self._trend_curves
+
+    # Tables d'agrégats fournies (ex. maintenues par cfc_ingest) ou construites à la première utilisation
+    @property
+    def gps_rollup(self):
+        if 'gps' not in self._rollups:
+            self._rollups['gps'] = RollupTable.from_frame(self.gps_data, GPS_ROLLUP_COLUMNS)
+        return self._rollups['gps']
+
+    @property
+    def recovery_rollup(self):
+        if 'recovery' not in self._rollups:
+            self._rollups['recovery'] = RollupTable.from_frame(self.recovery_data, RECOVERY_ROLLUP_COLUMNS)
+        return self._rollups['recovery']
+
+    @property
+    def capability_rollup(self):
+        if 'capability' not in self._rollups:
+            self._rollups['capability'] = RollupTable.from_frame(
+                self.cube.frame(), ['benchmarkPct'], ['expression', 'movement', 'quality'], 'testDate'
+            )
+        return self._rollups['capability']
+
+    @property
+    def benchmark_engine(self):
+        if self._benchmark_engine is None and self.squad_tests is not None:
+            self._benchmark_engine = BenchmarkEngine.from_tests(self.squad_tests)
+        return self._benchmark_engine
+
+    def players(self):
+        return sorted(self.gps_data['player_id'].unique())
+
+    # Priorités de la base SQLite (cfc_priorities) si elle est fournie, sinon les priorités d'exemple
+    def priorities(self, player_id=None, categories=None):
+        if self.priority_store is None:
+            priorities = pd.DataFrame(PRIORITIES)
+            return priorities[priorities['Category'].isin(categories)] if categories else priorities
+        return self.priority_store.query(player_id, categories)
+
+    def priorities_revision(self):
+        return self.priority_store.revision() if self.priority_store is not None else 0
+
+    # Suivi des progrès d'un ensemble de priorités (résultat de priorities())
+    def priority_progress(self, priorities):
+        progress = priorities['Progress'].astype('int64')
+        metrics = {
+            'count': len(priorities),
+            'avg_progress': progress.mean() if len(priorities) else float('nan'),
+            'achieved': int(((priorities['Tracking'] == 'Achieved') | (progress >= 100)).sum()),
+        }
+
+        fig_priorities = px.bar(
+            priorities,
+            x='Area',
+            y='Progress',
+            color='Category',
+            title="Progression des Zones Prioritaires",
+            color_discrete_map={'Recovery': '#034694', 'Performance': '#1f5f99'}
+        )
+        fig_priorities.add_hline(y=100, line_dash="dash", line_color="green", annotation_text="Objectif")
+        fig_priorities.update_layout(
+            xaxis_title="Zone Prioritaire",
+            yaxis_title="Progression (%)",
+            yaxis=dict(range=[0, 110])
+        )
+        return metrics, {'progress': fig_priorities}
+
+    # Performance moyenne et nombre de tests par modalité (movement, expression ou quality)
+    def capability_performance(self, date_range, level='movement'):
+        start, end = pd.Timestamp(date_range[0]), pd.Timestamp(date_range[1])
+        return self.filter_service.derived(
+            f'{level}_perf', date_range, None, lambda: self.cube.aggregate(level, start, end)
+        )
+
+    # Temps total (secondes) et part de chaque zone cardiaque sur la période
+    def hr_zone_totals(self, date_range, seasons):
+        def build():
+            seconds = self.filter_service.gps(date_range, seasons)[HR_ZONE_SECONDS_COLUMNS].sum()
+            total = seconds.sum()
+            return pd.DataFrame({
+                'zone': HR_ZONES,
+                'seconds': seconds.to_numpy(dtype='int64'),
+                'share': seconds.to_numpy(dtype='float64') / total if total else 0.0,
+            })
+        return self.filter_service.derived('hr_zone_totals', date_range, seasons, build)
+
+    # Composites de récupération par catégorie : dernière mesure et moyenne sur la période
+    def recovery_composites(self, date_range):
+        def build():
+            recovery = self.filter_service.recovery(date_range)
+            composites = [f'{cat}_composite' for cat in RECOVERY_CATEGORIES]
+            completeness = [f'{cat}_completeness' for cat in RECOVERY_CATEGORIES]
+            latest = recovery.iloc[-1] if len(recovery) else pd.Series(dtype='float64')
+            return pd.DataFrame({
+                'category': RECOVERY_CATEGORIES,
+                'latest_composite': latest.reindex(composites).to_numpy(dtype='float64'),
+                'latest_completeness': latest.reindex(completeness).to_numpy(dtype='float64'),
+                'mean_composite': recovery[composites].mean().to_numpy(dtype='float64'),
+                'mean_completeness': recovery[completeness].mean().to_numpy(dtype='float64'),
+            })
+        return self.filter_service.derived('recovery_composites', date_range, None, build)
+
+    def overview(self):
+        gps_data, recovery_data = self.gps_data, self.recovery_data
+        # Score moyen des 7 derniers jours (tous joueurs du tableau de bord)
+        last_week = recovery_data['date'] >= recovery_data['date'].max() - pd.Timedelta(days=6)
+        recent_recovery = recovery_data.loc[last_week, 'emboss_baseline_score'].mean()
+        metrics = {
+            'avg_distance': gps_data['distance'].mean(),
+            'avg_peak_speed': gps_data['peak_speed'].mean(),
+            'recent_recovery': recent_recovery,
+            'recovery_status': "Excellent" if recent_recovery > 0.1 else "Bon" if recent_recovery > -0.1 else "Attention",
+            'physical_tests': int(self.cube.counts.sum()),
+            'acwr': self.workload_engine.latest_frame()[metric_column('distance', 'acwr_ewma')].mean(),
+        }
+
+        # Évolution de la charge d'entraînement (moyenne par période, grain adapté à la largeur)
+        gps_start, gps_end = gps_data['date'].min(), gps_data['date'].max()
+        fig_load = charts.line(
+            self.gps_rollup.query(grain_for(gps_start, gps_end, CHART_WIDTH_HALF), gps_start, gps_end),
+            x='date',
+            y='distance',
+            title="Évolution de la Distance Parcourue",
+            color_discrete_sequence=['#034694']
+        )
+        fig_load.update_layout(
+            xaxis_title="Date",
+            yaxis_title="Distance (m)",
+            hovermode='x unified'
+        )
+
+        # Score de récupération
+        last_day = recovery_data['date'].max()
+        fig_recovery = charts.line(
+            self.recovery_rollup.query('day', last_day - pd.Timedelta(days=29), last_day),
+            x='date',
+            y='emboss_baseline_score',
+            title="Score de Récupération (30 derniers jours)",
+            color_discrete_sequence=['#1f5f99']
+        )
+        fig_recovery.add_hline(y=0, line_dash="dash", line_color="gray")
+        fig_recovery.update_layout(
+            xaxis_title="Date",
+            yaxis_title="Score de Récupération",
+            hovermode='x unified'
+        )
+        return metrics, {'load': fig_load, 'recovery': fig_recovery}
+
+    def gps(self, date_range, seasons, load_column='distance'):
+        filter_service = self.filter_service
+        filtered_gps = filter_service.gps(date_range, seasons)
+        figures = {}
+
+        # Distribution des distances
+        figures['distance'] = px.histogram(
+            filtered_gps,
+            x='distance',
+            nbins=20,
+            title="Distribution des Distances Parcourues",
+            color_discrete_sequence=['#034694']
+        )
+        figures['distance'].update_layout(
+            xaxis_title="Distance (m)",
+            yaxis_title="Fréquence"
+        )
+
+        # Vitesses élevées par session
+        figures['speed'] = charts.scatter(
+            filtered_gps,
+            x='date',
+            y='peak_speed',
+            size='distance_over_27',
+            color='opposition_code',
+            title="Vitesse de Pointe vs Distance >27 km/h",
+            hover_data=['distance', 'day_duration']
+        )
+        figures['speed'].update_layout(
+            xaxis_title="Date",
+            yaxis_title="Vitesse de Pointe (km/h)"
+        )
+
+        # Moyennes par période (jour, semaine, mois ou saison selon la plage) des tables d'agrégats
+        grain = grain_for(date_range[0], date_range[1], CHART_WIDTH_FULL)
+
+        def period_means():
+            return self.gps_rollup.query(grain, date_range[0], date_range[1], seasons=seasons)
+
+        gps_periods = filter_service.derived(f'gps_{grain}', date_range, seasons, period_means)
+
+        # Accélérations/décélérations par seuil
+        accel_data = filter_service.derived('gps_accel', date_range, seasons, lambda: gps_periods[
+            ['date', 'accel_decel_over_2_5', 'accel_decel_over_3_5', 'accel_decel_over_4_5']
+        ].melt(
+            id_vars=['date'],
+            var_name='threshold',
+            value_name='count'
+        ))
+        figures['accel'] = charts.line(
+            accel_data,
+            x='date',
+            y='count',
+            color='threshold',
+            title="Évolution des Accélérations/Décélérations par Seuil"
+        )
+        figures['accel'].update_layout(
+            xaxis_title="Date",
+            yaxis_title="Nombre d'Accélérations/Décélérations"
+        )
+
+        # Zones de fréquence cardiaque (temps déjà convertis en secondes au chargement)
+        def build_hr_data():
+            hr_data = gps_periods[['date'] + HR_ZONE_SECONDS_COLUMNS].rename(
+                columns={col: f'Zone {zone}' for col, zone in zip(HR_ZONE_SECONDS_COLUMNS, HR_ZONES)}
+            ).melt(
+                id_vars=['date'],
+                var_name='zone',
+                value_name='seconds'
+            )
+            hr_data['minutes'] = hr_data['seconds'] / 60
+            return hr_data
+
+        hr_data = filter_service.derived('gps_hr_zones', date_range, seasons, build_hr_data)
+
+        # Mêmes périodes pour toutes les zones : l'empilement reste cohérent
+        figures['hr_zones'] = px.area(
+            hr_data,
+            x='date',
+            y='minutes',
+            color='zone',
+            title="Temps Passé dans les Zones de Fréquence Cardiaque"
+        )
+        figures['hr_zones'].update_layout(
+            xaxis_title="Date",
+            yaxis_title="Temps (minutes)"
+        )
+
+        # Charge aiguë (7 j) / chronique (28 j)
+        def build_workload():
+            metrics = self.workload_engine.metrics()
+            return metrics[
+                (metrics['date'] >= pd.Timestamp(date_range[0]))
+                & (metrics['date'] <= pd.Timestamp(date_range[1]))
+                & (pd.Series(season_labels(metrics['date']), index=metrics.index).isin(seasons))
+            ]
+
+        workload = filter_service.derived('workload', date_range, seasons, build_workload)
+        acwr_data = workload[['date', metric_column(load_column, 'acwr'), metric_column(load_column, 'acwr_ewma')]].rename(
+            columns={metric_column(load_column, 'acwr'): 'Moyennes glissantes', metric_column(load_column, 'acwr_ewma'): 'EWMA'}
+        ).melt(
+            id_vars=['date'],
+            var_name='méthode',
+            value_name='ratio'
+        )
+        figures['acwr'] = charts.line(
+            downsample_frame(acwr_data, 'date', 'ratio', target_points(CHART_WIDTH_FULL * 2 // 3), color='méthode'),
+            x='date',
+            y='ratio',
+            color='méthode',
+            title="Ratio Charge Aiguë:Chronique"
+        )
+        figures['acwr'].add_hrect(y0=0.8, y1=1.3, fillcolor="green", opacity=0.1, line_width=0)
+        figures['acwr'].add_hline(y=1.5, line_dash="dash", line_color="red", annotation_text="Risque")
+        figures['acwr'].update_layout(
+            xaxis_title="Date",
+            yaxis_title="Ratio A:C"
+        )
+
+        metrics = {'sessions': len(filtered_gps), 'hr_zone_malformed': sum(self.hr_zone_malformed.values())}
+        latest_load = workload.dropna(subset=[metric_column(load_column, 'strain')]).tail(1)
+        if not latest_load.empty:
+            metrics['monotony'] = latest_load[metric_column(load_column, 'monotony')].iloc[0]
+            metrics['strain'] = latest_load[metric_column(load_column, 'strain')].iloc[0]
+        return metrics, figures
+
+    # Figures de la qualité choisie : None si aucun test sur la période
+    def physical(self, date_range, quality=None, lag=1, reference='squad'):
+        physical_start, physical_end = pd.Timestamp(date_range[0]), pd.Timestamp(date_range[1])
+        cube = self.cube
+        quality = quality or cube.levels('quality')[0]
+        figures = {}
+
+        # Performance par mouvement
+        movement_perf = self.capability_performance(date_range, 'movement')
+        movement_perf = movement_perf[movement_perf['count'] >= 3]  # Au moins 3 tests
+        figures['movement'] = px.bar(
+            movement_perf,
+            x='movement',
+            y='mean',
+            title="Performance Moyenne par Type de Mouvement",
+            color='mean',
+            color_continuous_scale='RdYlGn'
+        )
+        figures['movement'].add_hline(y=0.65, line_dash="dash", line_color="green", annotation_text="Objectif: 65%")
+        figures['movement'].update_layout(
+            xaxis_title="Type de Mouvement",
+            yaxis_title="Performance Moyenne (%)",
+            xaxis_tickangle=-45
+        )
+
+        # Performance par expression
+        expression_perf = self.capability_performance(date_range, 'expression')
+        figures['expression'] = px.pie(
+            expression_perf,
+            values='count',
+            names='expression',
+            title="Répartition des Tests par Expression"
+        )
+
+        figures['quality_trend'] = self.quality_trend(quality, physical_start, physical_end)
+        figures['percentiles'] = self.percentile_trend(quality, physical_start, physical_end, reference)
+
+        # Moyennes hebdomadaires, corrélations sur les paires complètes (effectif au survol)
+        correlation_matrix, correlation_counts = self.correlation_service.quality_corr(date_range)
+        figures['correlation'] = None
+        if correlation_matrix.notna().any().any():
+            figures['correlation'] = correlation_figure(
+                correlation_matrix,
+                correlation_counts,
+                title="Matrice de Corrélation entre les Qualités Physiques"
+            )
+
+        # Corrélations décalées : charge et récupération des semaines précédentes vs tests
+        lagged = self.correlation_service.lagged(date_range)
+        lagged_matrix = lagged[lagged['lag'] == lag].pivot(index='driver', columns='target', values='r')
+        lagged_counts = lagged[lagged['lag'] == lag].pivot(index='driver', columns='target', values='n')
+        figures['lagged'] = None
+        if lagged_matrix.notna().any().any():
+            figures['lagged'] = correlation_figure(
+                lagged_matrix,
+                lagged_counts,
+                title=f"Corrélation Charge/Récupération (S-{lag}) et Qualités (S)"
+            )
+
+        metrics = {'tests': int(expression_perf['count'].sum()), 'quality': quality}
+        return metrics, figures
+
+    # Tests moyennés par période (grain selon la plage) et courbes de tendance LOWESS
+    def quality_trend(self, quality, start, end):
+        grain = grain_for(start, end, CHART_WIDTH_FULL)
+        quality_data = self.capability_rollup.query(grain, start, end, quality=quality).dropna(subset=['benchmarkPct'])
+        if quality_data.empty:
+            return None
+
+        fig = charts.scatter(
+            quality_data,
+            x='testDate',
+            y='benchmarkPct',
+            color='movement',
+            symbol='expression',
+            title=f"Évolution de la Performance - {quality.title()}",
+            hover_data=['movement', 'expression']
+        )
+
+        # Lignes de tendance précalculées (une par mouvement et expression), même couleur que les points
+        trends = self.trend_curves.for_quality(quality, start, end)
+        if grain != 'day':
+            # Courbes moyennées sur les mêmes périodes que les points
+            trends = trends.assign(testDate=period_start(trends['testDate'], grain)).groupby(
+                ['movement', 'expression', 'testDate'], observed=True, as_index=False
+            )['trend'].mean()
+        movement_colors = {trace.legendgroup.split(',')[0].strip(): trace.marker.color for trace in fig.data}
+        for (movement, expression), curve in trends.groupby(['movement', 'expression'], observed=True):
+            if len(curve) > 2:
+                fig.add_trace(go.Scattergl(
+                    x=curve['testDate'],
+                    y=curve['trend'],
+                    mode='lines',
+                    name=f"Tendance {movement} ({expression})",
+                    line=dict(color=movement_colors.get(movement), dash='solid' if expression == 'dynamic' else 'dash')
+                ))
+
+        fig.update_layout(
+            xaxis_title="Date",
+            yaxis_title="Performance (%)"
+        )
+        return fig
+
+    # Percentiles des tests d'un joueur (par défaut le premier) face à l'effectif ou à sa catégorie
+    # d'âge, calculés à partir des résultats bruts ; None sans résultats de l'effectif
+    def squad_percentiles(self, date_range, quality=None, reference='squad', player_id=None):
+        if self.squad_tests is None:
+            return None
+        tests = self.squad_tests
+        player_id = player_id or self.players()[0]
+        mask = (tests['player_id'] == player_id) & tests['testDate'].between(
+            pd.Timestamp(date_range[0]), pd.Timestamp(date_range[1])
+        )
+        if quality is not None:
+            mask &= tests['quality'] == quality
+        selected = tests[mask]
+        return selected.assign(percentile=self.benchmark_engine.percentiles(selected, reference))
+
+    # Percentiles moyennés par période (grain selon la plage), un trait par mouvement et expression
+    def percentile_trend(self, quality, start, end, reference='squad'):
+        percentiles = self.squad_percentiles((start, end), quality, reference)
+        if percentiles is None or percentiles.empty:
+            return None
+        grain = grain_for(start, end, CHART_WIDTH_FULL)
+        trend = percentiles.assign(testDate=period_start(percentiles['testDate'], grain)).groupby(
+            ['movement', 'expression', 'testDate'], observed=True, as_index=False
+        )['percentile'].mean()
+        trend['series'] = trend['movement'].astype(str) + ' (' + trend['expression'].astype(str) + ')'
+
+        label = "l'Effectif" if reference == 'squad' else "la Catégorie d'Âge"
+        fig = charts.line(
+            trend,
+            x='testDate',
+            y='percentile',
+            color='series',
+            title=f"Percentile face à {label} - {quality.title()}"
+        )
+        fig.add_hline(y=0.5, line_dash="dash", line_color="grey", annotation_text="Médiane")
+        fig.update_layout(
+            xaxis_title="Date",
+            yaxis_title="Percentile",
+            yaxis=dict(range=[0, 1], tickformat='.0%')
+        )
+        return fig
+
+    def recovery(self, date_range, key_categories=DEFAULT_RECOVERY_CATEGORIES):
+        filtered_recovery = self.filter_service.recovery(date_range)
+        figures = {}
+
+        # Moyennes par période des tables d'agrégats (grain selon la plage et la largeur du graphique)
+        def period_means(width):
+            grain = grain_for(date_range[0], date_range[1], width)
+            return self.filter_service.derived(
+                f'recovery_{grain}', date_range, None,
+                lambda: self.recovery_rollup.query(grain, date_range[0], date_range[1])
+            )
+
+        figures['global'] = charts.line(
+            period_means(CHART_WIDTH_FULL * 2 // 3),
+            x='date',
+            y='emboss_baseline_score',
+            title="Score Global de Récupération",
+            color_discrete_sequence=['#034694']
+        )
+        figures['global'].add_hline(y=0, line_dash="dash", line_color="gray")
+        figures['global'].add_hline(y=0.2, line_dash="dash", line_color="green", annotation_text="Excellent")
+        figures['global'].add_hline(y=-0.2, line_dash="dash", line_color="red", annotation_text="Attention")
+        figures['global'].update_layout(
+            xaxis_title="Date",
+            yaxis_title="Score de Récupération"
+        )
+
+        # Dernières valeurs par catégorie
+        latest_recovery = filtered_recovery.iloc[-1]
+        radar_df = pd.DataFrame({
+            'category': [cat.replace('_', ' ').title() for cat in RECOVERY_CATEGORIES],
+            'composite': [latest_recovery[f'{cat}_composite'] for cat in RECOVERY_CATEGORIES],
+            'completeness': [latest_recovery[f'{cat}_completeness'] for cat in RECOVERY_CATEGORIES],
+        })
+
+        figures['composite'] = px.bar(
+            radar_df,
+            x='category',
+            y='composite',
+            title="Scores Composites par Catégorie (Dernière Mesure)",
+            color='composite',
+            color_continuous_scale='RdYlGn'
+        )
+        figures['composite'].add_hline(y=0, line_dash="dash", line_color="gray")
+        figures['composite'].update_layout(
+            xaxis_title="Catégorie",
+            yaxis_title="Score Composite",
+            xaxis_tickangle=-45
+        )
+
+        figures['completeness'] = px.bar(
+            radar_df,
+            x='category',
+            y='completeness',
+            title="Complétude des Tests par Catégorie",
+            color_discrete_sequence=['#1f5f99']
+        )
+        figures['completeness'].update_layout(
+            xaxis_title="Catégorie",
+            yaxis_title="Complétude (%)",
+            xaxis_tickangle=-45,
+            yaxis=dict(range=[0, 1])
+        )
+
+        figures['evolution'] = None
+        if key_categories:
+            recovery_evolution = period_means(CHART_WIDTH_FULL)[['date'] + list(key_categories)].melt(
+                id_vars=['date'],
+                var_name='category',
+                value_name='score'
+            )
+            recovery_evolution['category'] = recovery_evolution['category'].map(format_category)
+            figures['evolution'] = charts.line(
+                recovery_evolution,
+                x='date',
+                y='score',
+                color='category',
+                title="Évolution des Scores de Récupération par Catégorie"
+            )
+            figures['evolution'].add_hline(y=0, line_dash="dash", line_color="gray")
+            figures['evolution'].update_layout(
+                xaxis_title="Date",
+                yaxis_title="Score Composite"
+            )
+
+        current_score = latest_recovery['emboss_baseline_score']
+        metrics = {'current_score': current_score, 'status': recovery_status(current_score)[0]}
+        return metrics, figures
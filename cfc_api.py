@@ -0,0 +1,248 @@
+import argparse
+import hashlib
+import json
+import math
+import threading
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlsplit
+
+import numpy as np
+import pandas as pd
+
+from cfc_data import PHYSICAL_CAPABILITY_CSV, source_fingerprint
+from cfc_export import EXPORT_FORMATS, TableView, iter_export
+from cfc_filters import LRUViewCache
+from cfc_priorities import PriorityStore
+from cfc_report import load_dashboard
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8765
+MAX_AGE = 60
+EXPORT_ROUTE = '/api/export'
+# Jeux exportables et leur colonne de date
+EXPORT_DATASETS = {'gps': 'date', 'recovery': 'date', 'capability': 'testDate'}
+
+
+class APIError(Exception):
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+def _jsonable(value):
+    if isinstance(value, pd.DataFrame):
+        return [_jsonable(record) for record in value.to_dict(orient='records')]
+    if isinstance(value, dict):
+        return {str(k): _jsonable(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_jsonable(v) for v in value]
+    if isinstance(value, (pd.Timestamp, np.datetime64)):
+        return pd.Timestamp(value).isoformat()
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, float) and not math.isfinite(value):
+        return None
+    if value is pd.NA or value is pd.NaT:
+        return None
+    return value
+
+
+# API JSON des agrégats du tableau de bord. Les réponses sérialisées sont mises en cache
+# (clé : route, paramètres, empreinte des données) avec un ETag calculé sur le corps.
+class DashboardAPI:
+
+    def __init__(self, dashboard, cache=None, version=None):
+        self.dashboard = dashboard
+        self.cache = cache if cache is not None else LRUViewCache(max_entries=256)
+        self.version = version if version is not None else source_fingerprint(PHYSICAL_CAPABILITY_CSV)
+        self._players = {}
+        self._views = {}
+        self._lock = threading.Lock()
+        self.routes = {
+            '/api/overview': self.overview,
+            '/api/capability': self.capability,
+            '/api/recovery': self.recovery,
+            '/api/hr-zones': self.hr_zones,
+            '/api/priorities': self.priorities,
+        }
+
+    def _dashboard(self, params):
+        player = params.get('player')
+        if player is None:
+            return self.dashboard
+        if player not in self.dashboard.players():
+            raise APIError(HTTPStatus.NOT_FOUND, f"Joueur inconnu : {player}")
+        with self._lock:
+            if player not in self._players:
+                self._players[player] = self.dashboard.for_player(player)
+            return self._players[player]
+
+    def _date_range(self, params, dashboard):
+        try:
+            start = pd.Timestamp(params['start']) if 'start' in params else dashboard.gps_data['date'].min()
+            end = pd.Timestamp(params['end']) if 'end' in params else dashboard.gps_data['date'].max()
+        except ValueError as exc:
+            raise APIError(HTTPStatus.BAD_REQUEST, f"Date invalide : {exc}")
+        return start.normalize(), end.normalize()
+
+    def _seasons(self, params, dashboard):
+        if 'seasons' in params:
+            return params['seasons'].split(',')
+        return list(dashboard.gps_data['season'].unique())
+
+    def overview(self, params):
+        metrics, _ = self._dashboard(params).overview()
+        return metrics
+
+    def capability(self, params):
+        level = params.get('level', 'movement')
+        if level not in ('expression', 'movement', 'quality'):
+            raise APIError(HTTPStatus.BAD_REQUEST, f"Niveau inconnu : {level}")
+        return self.dashboard.capability_performance(self._date_range(params, self.dashboard), level)
+
+    def recovery(self, params):
+        dashboard = self._dashboard(params)
+        return dashboard.recovery_composites(self._date_range(params, dashboard))
+
+    def hr_zones(self, params):
+        dashboard = self._dashboard(params)
+        return dashboard.hr_zone_totals(self._date_range(params, dashboard), self._seasons(params, dashboard))
+
+    def priorities(self, params):
+        categories = params['category'].split(',') if 'category' in params else None
+        priorities = self.dashboard.priorities(params.get('player'), categories)
+        return priorities[['Priority', 'Category', 'Area', 'Target', 'Review Date', 'Tracking', 'Progress']]
+
+    def _view(self, dataset):
+        with self._lock:
+            if dataset not in self._views:
+                frames = {
+                    'gps': lambda: self.dashboard.gps_data,
+                    'recovery': lambda: self.dashboard.recovery_data,
+                    'capability': lambda: self.dashboard.cube.frame(),
+                }
+                self._views[dataset] = TableView(frames[dataset]())
+            return self._views[dataset]
+
+    # Export brut filtré (joueur, période, tri) : type, nom de fichier et blocs CSV ou Parquet,
+    # produits au fil de l'envoi
+    def export(self, params):
+        dataset = params.get('dataset', 'gps')
+        if dataset not in EXPORT_DATASETS:
+            raise APIError(HTTPStatus.BAD_REQUEST, f"Jeu de données inconnu : {dataset}")
+        fmt = params.get('format', 'csv')
+        if fmt not in EXPORT_FORMATS:
+            raise APIError(HTTPStatus.BAD_REQUEST, f"Format inconnu : {fmt}")
+        view = self._view(dataset)
+
+        filters = {}
+        if 'start' in params or 'end' in params:
+            try:
+                bounds = tuple(pd.Timestamp(params[key]) if key in params else None for key in ('start', 'end'))
+            except ValueError as exc:
+                raise APIError(HTTPStatus.BAD_REQUEST, f"Date invalide : {exc}")
+            filters[EXPORT_DATASETS[dataset]] = bounds
+        if 'player' in params and 'player_id' in view.columns:
+            filters['player_id'] = [params['player']]
+        sort_by = params.get('sort')
+        if sort_by is not None and sort_by not in view.columns:
+            raise APIError(HTTPStatus.BAD_REQUEST, f"Colonne inconnue : {sort_by}")
+        ascending = params.get('order', 'asc') != 'desc'
+
+        # Sélection calculée avant l'envoi des en-têtes (erreurs renvoyées en JSON), blocs ensuite
+        view.positions(filters, sort_by, ascending)
+        chunks = iter_export(view.iter_chunks(filters, sort_by, ascending), fmt)
+        return EXPORT_FORMATS[fmt], f'{dataset}.{fmt}', chunks
+
+    # Corps JSON et ETag d'une route ; la sérialisation n'est faite qu'une fois par clé
+    def response(self, path, params):
+        route = self.routes.get(path.rstrip('/'))
+        if route is None:
+            if path.rstrip('/') in ('', '/api'):
+                return self.cache.get_or_compute(('index',), lambda: self._encode({'routes': sorted([*self.routes, EXPORT_ROUTE])}))
+            raise APIError(HTTPStatus.NOT_FOUND, f"Route inconnue : {path}")
+        key = (path.rstrip('/'), tuple(sorted(params.items())), self.version)
+        if route == self.priorities:
+            # Les priorités changent à chaque ajout : la révision de la base fait partie de la clé
+            key += (self.dashboard.priorities_revision(),)
+        return self.cache.get_or_compute(key, lambda: self._encode(route(params)))
+
+    def _encode(self, payload):
+        body = json.dumps(_jsonable(payload), ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        return body, f'"{hashlib.sha1(body).hexdigest()}"'
+
+
+def make_handler(api):
+
+    class Handler(BaseHTTPRequestHandler):
+
+        def do_GET(self):
+            url = urlsplit(self.path)
+            params = {k: v[-1] for k, v in parse_qs(url.query).items()}
+            try:
+                if url.path.rstrip('/') == EXPORT_ROUTE:
+                    return self._stream(*api.export(params))
+                body, etag = api.response(url.path, params)
+            except APIError as exc:
+                return self._send(exc.status, json.dumps({'error': str(exc)}, ensure_ascii=False).encode('utf-8'))
+
+            if etag in [tag.strip() for tag in self.headers.get('If-None-Match', '').split(',')]:
+                return self._send(HTTPStatus.NOT_MODIFIED, b'', etag)
+            self._send(HTTPStatus.OK, body, etag)
+
+        def _send(self, status, body, etag=None):
+            self.send_response(status)
+            if etag is not None:
+                self.send_header('ETag', etag)
+                self.send_header('Cache-Control', f'max-age={MAX_AGE}')
+            if status != HTTPStatus.NOT_MODIFIED:
+                self.send_header('Content-Type', 'application/json; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            if body:
+                self.wfile.write(body)
+
+        # Corps envoyé bloc par bloc, sans Content-Length : la fermeture de la connexion marque la fin (HTTP/1.0)
+        def _stream(self, content_type, filename, chunks):
+            self.send_response(HTTPStatus.OK)
+            self.send_header('Content-Type', content_type)
+            self.send_header('Content-Disposition', f'attachment; filename="{filename}"')
+            self.end_headers()
+            for data in chunks:
+                self.wfile.write(data)
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+
+def serve(api, host=DEFAULT_HOST, port=DEFAULT_PORT):
+    return ThreadingHTTPServer((host, port), make_handler(api))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="API JSON locale des agrégats du tableau de bord.")
+    parser.add_argument('--data', type=Path, default=Path('synthetic_data'),
+                        help="Dossier gps_sessions / recovery_days (.parquet ou .csv ; sinon données simulées)")
+    parser.add_argument('--host', default=DEFAULT_HOST)
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    args = parser.parse_args(argv)
+
+    dashboard = load_dashboard(args.data)
+    dashboard.priority_store = PriorityStore()
+    server = serve(DashboardAPI(dashboard), args.host, args.port)
+    print(f"API disponible sur http://{args.host}:{server.server_port}/api")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
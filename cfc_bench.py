@@ -0,0 +1,186 @@
+import argparse
+import json
+import platform
+import statistics
+import subprocess
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+import pandas as pd
+import plotly
+
+import cfc_charts as charts
+from cfc_analytics import Dashboard
+from cfc_correlation import CorrelationService
+from cfc_cube import CapabilityCube
+from cfc_data import add_hr_zone_seconds, parse_physical_capability_csv
+from cfc_events import PeakDropDetector
+from cfc_heatmap import HeatmapEngine, correlation_figure
+from cfc_synthetic import generate_gps_sessions, generate_recovery_days
+
+SCALES = [1, 10, 100]
+APPS = {'cfc': 'cfc_streamlit_app.py', 'peakmotion': 'PeakMotion_app1.py'}
+END_DATE = '2025-03-15'
+
+
+# Capacités physiques à l'échelle k : l'historique est prolongé vers le passé (k copies décalées),
+# le nombre de séries reste celui du CSV
+def scaled_capability_frame(scale):
+    tests = parse_physical_capability_csv()
+    span = tests['testDate'].max() - tests['testDate'].min() + pd.Timedelta(days=1)
+    copies = [tests.assign(testDate=tests['testDate'] - i * span) for i in range(scale)]
+    return pd.concat(copies, ignore_index=True).sort_values('testDate', kind='stable').reset_index(drop=True)
+
+
+# GPS et récupération à l'échelle k : k joueurs sur les deux saisons du tableau de bord
+def scaled_sessions(scale):
+    gps_data = generate_gps_sessions(n_players=scale, sessions_per_week=3.5, end_date=END_DATE)
+    return add_hr_zone_seconds(gps_data), generate_recovery_days(n_players=scale, end_date=END_DATE)
+
+
+class Timer:
+
+    def __init__(self):
+        self.timings = {}
+
+    def time(self, section, step, func, *args, **kwargs):
+        start = time.perf_counter()
+        result = func(*args, **kwargs)
+        self.timings.setdefault((section, step), []).append(time.perf_counter() - start)
+        return result
+
+    def serialize(self, section, figures):
+        figures = [fig for fig in figures.values() if fig is not None]
+        self.time(section, 'serialize', lambda: [fig.to_json() for fig in figures])
+
+
+# Une exécution complète (données froides) des sections de cfc_streamlit_app
+def run_cfc(timer, scale, physical_data):
+    (gps_data, hr_zone_malformed), recovery_data = timer.time('data', 'load', scaled_sessions, scale)
+    dashboard = timer.time('data', 'build', Dashboard.from_frames, gps_data, recovery_data, physical_data, hr_zone_malformed)
+
+    date_range = (gps_data['date'].min(), gps_data['date'].max())
+    seasons = list(gps_data['season'].unique())
+    timer.time('gps', 'filter', dashboard.filter_service.gps, date_range, seasons)
+    timer.time('recovery', 'filter', dashboard.filter_service.recovery, date_range)
+    timer.time('physical', 'filter', dashboard.cube.frame, *date_range)
+    timer.time('physical', 'build', lambda: dashboard.trend_curves)
+
+    for section, build in [
+        ('overview', dashboard.overview),
+        ('gps', lambda: dashboard.gps(date_range, seasons)),
+        ('physical', lambda: dashboard.physical(date_range)),
+        ('recovery', lambda: dashboard.recovery(date_range)),
+    ]:
+        _, figures = timer.time(section, 'figures', build)
+        timer.serialize(section, figures)
+
+
+# Même découpage pour PeakMotion_app1 (sélection par défaut des widgets)
+def run_peakmotion(timer, physical_data):
+    cube = timer.time('data', 'build', CapabilityCube.from_frame, physical_data)
+    movement = cube.levels('movement')[0]
+    quality = [cube.levels('quality')[0]]
+    expression = [cube.levels('expression')[0]]
+
+    df_filtered = timer.time('trend', 'filter', cube.frame, movement=movement, quality=quality, expression=expression)
+    fig = timer.time('trend', 'figures', charts.line, df_filtered, x='testDate', y='benchmarkPct', color='quality')
+    timer.serialize('trend', {'trend': fig})
+
+    heatmap_engine = HeatmapEngine(cube)
+    fig = timer.time('heatmap', 'figures', heatmap_engine.figure, 'quality')
+    timer.serialize('heatmap', {'heatmap': fig})
+
+    detector = timer.time('events', 'build', PeakDropDetector.from_frame, physical_data)
+    events = timer.time('events', 'filter', detector.events)
+    timer.time('events', 'aggregate', lambda: events.groupby(
+        ['expression', 'movement', 'quality', 'event'], observed=True).size().unstack(fill_value=0))
+
+    correlation_service = CorrelationService(None, None, cube)
+    corr = timer.time('correlation', 'aggregate', correlation_service.quality_corr)
+    fig = timer.time('correlation', 'figures', correlation_figure, *corr)
+    timer.serialize('correlation', {'correlation': fig})
+
+
+# Exécution complète de chaque script sous AppTest (données réelles, échelle 1 uniquement)
+def run_apptest(timer, app, path):
+    from streamlit.testing.v1 import AppTest
+
+    at = AppTest.from_file(str(Path(path).resolve()), default_timeout=600)
+    timer.time('apptest', 'first_run', at.run)
+    timer.time('apptest', 'rerun', at.run)
+    if at.exception:
+        raise RuntimeError(f"{app} : {at.exception[0].value}")
+
+
+def _results(app, scale, timer):
+    return [{
+        'app': app,
+        'scale': scale,
+        'section': section,
+        'step': step,
+        'min_s': min(runs),
+        'median_s': statistics.median(runs),
+        'repeats': len(runs),
+    } for (section, step), runs in timer.timings.items()]
+
+
+def _git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(scales=SCALES, repeats=3, apptest=False):
+    results = []
+    for scale in scales:
+        physical_data = scaled_capability_frame(scale)
+        for app, runner in [('cfc', lambda t: run_cfc(t, scale, physical_data)),
+                            ('peakmotion', lambda t: run_peakmotion(t, physical_data))]:
+            timer = Timer()
+            for _ in range(repeats):
+                runner(timer)
+            results += _results(app, scale, timer)
+
+    if apptest:
+        for app, path in APPS.items():
+            timer = Timer()
+            run_apptest(timer, app, path)
+            results += _results(app, 1, timer)
+
+    return {
+        'meta': {
+            'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'commit': _git_commit(),
+            'python': platform.python_version(),
+            'pandas': pd.__version__,
+            'plotly': plotly.__version__,
+            'machine': platform.machine(),
+            'repeats': repeats,
+        },
+        'results': results,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Mesure chaque section des tableaux de bord à plusieurs échelles de données.")
+    parser.add_argument('--scales', type=int, nargs='+', default=SCALES)
+    parser.add_argument('--repeats', type=int, default=3)
+    parser.add_argument('--apptest', action='store_true', help="Ajoute une exécution complète de chaque script sous AppTest")
+    parser.add_argument('--out', type=Path, default=Path('bench_results.json'))
+    args = parser.parse_args(argv)
+
+    report = run(args.scales, args.repeats, args.apptest)
+    args.out.write_text(json.dumps(report, indent=2), encoding='utf-8')
+
+    table = pd.DataFrame(report['results']).pivot_table(
+        index=['app', 'section', 'step'], columns='scale', values='median_s'
+    )
+    print(table.round(4).to_string())
+    print(f"Résultats écrits dans {args.out}")
+
+
+if __name__ == '__main__':
+    main()
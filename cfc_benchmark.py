@@ -0,0 +1,104 @@
+import numpy as np
+import pandas as pd
+
+from cfc_data import CAPABILITY_KEYS
+
+# Distributions de référence : tout l'effectif, ou la catégorie d'âge du joueur
+REFERENCES = ['squad', 'age_group']
+# Les ajouts sont tamponnés (tableau trié) puis fusionnés quand le tampon dépasse
+# max(MERGE_MIN, √n) valeurs : une fusion O(n) pour √n ajouts
+MERGE_MIN = 64
+
+
+def _sorted(values):
+    values = np.asarray(values, dtype='float64')
+    return np.sort(values[~np.isnan(values)])
+
+
+# Fusion de deux tableaux triés en O(len(a) + len(b))
+def _merge_sorted(a, b):
+    if not len(b):
+        return a
+    return np.insert(a, np.searchsorted(a, b, side='right'), b)
+
+
+# Échantillon trié d'une distribution : ajouts incrémentaux, rang d'une valeur en O(log n)
+# (recherche dichotomique dans le tableau principal et dans le tampon des derniers ajouts)
+class SortedSample:
+
+    def __init__(self, values=()):
+        self.values = _sorted(values)
+        self.pending = np.empty(0)
+
+    def __len__(self):
+        return len(self.values) + len(self.pending)
+
+    def add(self, values):
+        self.pending = _merge_sorted(self.pending, _sorted(values))
+        if len(self.pending) > max(MERGE_MIN, int(np.sqrt(len(self.values)))):
+            self.values = _merge_sorted(self.values, self.pending)
+            self.pending = np.empty(0)
+        return self
+
+    # Échantillons de deux équipes (ou deux sources) réunis, sans retri
+    def merge(self, other):
+        merged = SortedSample()
+        merged.values = _merge_sorted(_merge_sorted(self.values, self.pending), _merge_sorted(other.values, other.pending))
+        return merged
+
+    def _count(self, values, side):
+        return np.searchsorted(self.values, values, side=side) + np.searchsorted(self.pending, values, side=side)
+
+    # Rang centile (ex aequo comptés pour moitié), entre 0 et 1 ; NaN si l'échantillon est vide
+    def percentile(self, values):
+        values = np.asarray(values, dtype='float64')
+        if not len(self):
+            return np.full(values.shape, np.nan)
+        rank = (self._count(values, 'left') + self._count(values, 'right')) / 2
+        return np.where(np.isnan(values), np.nan, rank / len(self))
+
+
+# Percentiles des résultats bruts des tests face à la distribution de l'effectif ou de la catégorie
+# d'âge, pour chaque série (expression, mouvement, qualité). Un échantillon trié par (référence, série) :
+# les nouveaux tests y sont ajoutés sans relire l'historique.
+class BenchmarkEngine:
+
+    def __init__(self, value_col='result', group_col='age_group'):
+        self.value_col = value_col
+        self.group_col = group_col
+        self.samples = {}
+
+    @classmethod
+    def from_tests(cls, tests, **kwargs):
+        return cls(**kwargs).add(tests)
+
+    def _keys(self, reference):
+        if reference not in REFERENCES:
+            raise ValueError(f"Référence inconnue : {reference}")
+        return ([self.group_col] if reference == 'age_group' else []) + CAPABILITY_KEYS
+
+    def _groups(self, tests, reference):
+        return tests.groupby(self._keys(reference), observed=True, sort=False).indices.items()
+
+    def add(self, tests):
+        values = tests[self.value_col].to_numpy(dtype='float64', na_value=np.nan)
+        for reference in REFERENCES:
+            for key, rows in self._groups(tests, reference):
+                self.samples.setdefault((reference, *key), SortedSample()).add(values[rows])
+        return self
+
+    # Percentile de chaque test (Series alignée sur tests) ; NaN pour une série sans référence
+    def percentiles(self, tests, reference='squad'):
+        values = tests[self.value_col].to_numpy(dtype='float64', na_value=np.nan)
+        out = np.full(len(tests), np.nan)
+        for key, rows in self._groups(tests, reference):
+            sample = self.samples.get((reference, *key))
+            if sample is not None:
+                out[rows] = sample.percentile(values[rows])
+        return pd.Series(out, index=tests.index, name='percentile')
+
+    # Effectif de chaque distribution de référence
+    def sizes(self, reference='squad'):
+        keys = self._keys(reference)
+        rows = [(*key[1:], len(sample)) for key, sample in self.samples.items() if key[0] == reference]
+        return pd.DataFrame(rows, columns=keys + ['n'])
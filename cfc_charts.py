@@ -0,0 +1,40 @@
+import os
+
+import plotly.express as px
+
+# Au-delà de ce nombre de points dans une trace, on passe en rendu WebGL (scattergl)
+WEBGL_POINT_THRESHOLD = int(os.environ.get("CFC_WEBGL_THRESHOLD", 1000))
+
+# Arguments plotly express qui découpent les données en plusieurs traces
+_TRACE_SPLITTERS = ('color', 'symbol', 'line_dash', 'line_group', 'facet_row', 'facet_col')
+
+
+# Taille de la plus grande trace que plotly express va produire pour ces arguments
+def largest_trace(df, **kwargs):
+    if df is None or len(df) == 0:
+        return 0
+    columns = [
+        kwargs[arg] for arg in _TRACE_SPLITTERS
+        if isinstance(kwargs.get(arg), str) and kwargs[arg] in df.columns
+        and not (arg == 'color' and df[kwargs[arg]].dtype.kind in 'fiu')
+    ]
+    if not columns:
+        return len(df)
+    return int(df.groupby(list(dict.fromkeys(columns)), observed=True, sort=False).size().max())
+
+
+def render_mode(df, threshold=None, **kwargs):
+    threshold = WEBGL_POINT_THRESHOLD if threshold is None else threshold
+    return 'webgl' if largest_trace(df, **kwargs) > threshold else 'svg'
+
+
+# Nuage de points : mêmes couleurs, symboles et survols que px.scatter, en WebGL si besoin
+def scatter(data_frame, webgl_threshold=None, **kwargs):
+    kwargs.setdefault('render_mode', render_mode(data_frame, webgl_threshold, **kwargs))
+    return px.scatter(data_frame, **kwargs)
+
+
+# Courbe : idem pour px.line
+def line(data_frame, webgl_threshold=None, **kwargs):
+    kwargs.setdefault('render_mode', render_mode(data_frame, webgl_threshold, **kwargs))
+    return px.line(data_frame, **kwargs)
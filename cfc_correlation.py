@@ -0,0 +1,129 @@
+import numpy as np
+import pandas as pd
+
+from cfc_data import RECOVERY_CATEGORIES
+from cfc_filters import LRUViewCache
+from cfc_profiling import profiled
+from cfc_workload import LOAD_COLUMNS
+
+# Grille temporelle commune : semaines commençant le lundi
+GRID_FREQ = 'W-MON'
+MIN_PERIODS = 8
+COMPOSITE_COLUMNS = [f'{cat}_composite' for cat in RECOVERY_CATEGORIES]
+
+
+def _as_matrix(frame):
+    values = frame.to_numpy(dtype='float64', na_value=np.nan)
+    present = ~np.isnan(values)
+    return np.where(present, values, 0.0), present.astype('float64')
+
+
+# Corrélations de Pearson sur les paires complètes entre les colonnes de `left` et de `right`
+# (mêmes index). Toutes les paires sont calculées par produits matriciels, avec leurs effectifs.
+def pairwise_corr(left, right=None, min_periods=MIN_PERIODS):
+    right = left if right is None else right
+    x, mx = _as_matrix(left)
+    y, my = _as_matrix(right)
+
+    n = mx.T @ my
+    sum_x = x.T @ my
+    sum_y = mx.T @ y
+    sum_xx = (x ** 2).T @ my
+    sum_yy = mx.T @ (y ** 2)
+    sum_xy = x.T @ y
+    with np.errstate(invalid='ignore', divide='ignore'):
+        cov = sum_xy - sum_x * sum_y / n
+        var_x = sum_xx - sum_x ** 2 / n
+        var_y = sum_yy - sum_y ** 2 / n
+        r = cov / np.sqrt(var_x * var_y)
+    r = np.where((n >= min_periods) & (var_x > 1e-12) & (var_y > 1e-12), np.clip(r, -1, 1), np.nan)
+
+    corr = pd.DataFrame(r, index=left.columns, columns=right.columns)
+    counts = pd.DataFrame(n.astype('int64'), index=left.columns, columns=right.columns)
+    return corr, counts
+
+
+# Corrélations décalées : `drivers` à la semaine t - lag contre `targets` à la semaine t
+def lagged_corr(drivers, targets, lags=range(0, 5), min_periods=MIN_PERIODS):
+    frames = []
+    for lag in lags:
+        corr, counts = pairwise_corr(drivers.shift(lag), targets, min_periods)
+        frames.append(pd.DataFrame({
+            'driver': np.repeat(corr.index.to_numpy(), corr.shape[1]),
+            'target': np.tile(corr.columns.to_numpy(), corr.shape[0]),
+            'lag': lag,
+            'r': corr.to_numpy().ravel(),
+            'n': counts.to_numpy().ravel(),
+        }))
+    return pd.concat(frames, ignore_index=True)
+
+
+# Service de corrélation : séries GPS, récupération et capacités alignées sur une grille
+# hebdomadaire, résultats mis en cache par fenêtre de dates
+class CorrelationService:
+
+    def __init__(self, gps_data, recovery_data, capability_cube, cache=None):
+        self.gps_data = gps_data
+        self.recovery_data = recovery_data
+        self.cube = capability_cube
+        self.cache = cache if cache is not None else LRUViewCache(max_entries=64)
+
+    def _window(self, date_range):
+        if date_range is None:
+            return self.cube.dates[0], self.cube.dates[-1]
+        return tuple(pd.Timestamp(d) for d in date_range)
+
+    def _weekly_capability(self, start, end):
+        dates, labels, sums, counts = self.cube.group_totals('quality', start, end)
+        weekly_sums = pd.DataFrame(sums, index=dates, columns=labels).resample(GRID_FREQ).sum()
+        weekly_counts = pd.DataFrame(counts, index=dates, columns=labels).resample(GRID_FREQ).sum()
+        return weekly_sums / weekly_counts.where(weekly_counts > 0)
+
+    def _weekly_gps(self, start, end):
+        if self.gps_data is None:
+            return pd.DataFrame(columns=LOAD_COLUMNS, dtype='float64')
+        gps = self.gps_data[(self.gps_data['date'] >= start) & (self.gps_data['date'] <= end)]
+        # Charge hebdomadaire par joueur (somme), puis moyenne de l'effectif
+        weekly = gps.groupby(
+            ['player_id', pd.Grouper(key='date', freq=GRID_FREQ)], observed=True
+        )[LOAD_COLUMNS].sum(min_count=1)
+        return weekly.groupby(level='date').mean()
+
+    def _weekly_recovery(self, start, end):
+        if self.recovery_data is None:
+            return pd.DataFrame(columns=COMPOSITE_COLUMNS, dtype='float64')
+        recovery = self.recovery_data[(self.recovery_data['date'] >= start) & (self.recovery_data['date'] <= end)]
+        return recovery.set_index('date')[COMPOSITE_COLUMNS].resample(GRID_FREQ).mean()
+
+    # Grille hebdomadaire commune (une colonne par indicateur)
+    def grid(self, date_range=None):
+        start, end = self._window(date_range)
+
+        def build():
+            grid = pd.concat([
+                self._weekly_gps(start, end),
+                self._weekly_recovery(start, end),
+                self._weekly_capability(start, end),
+            ], axis=1)
+            return grid.asfreq(GRID_FREQ)
+        return self.cache.get_or_compute(('grid', start, end), build)
+
+    @profiled('aggregate', 'quality_corr')
+    def quality_corr(self, date_range=None, min_periods=MIN_PERIODS):
+        start, end = self._window(date_range)
+        qualities = [str(q) for q in self.cube.levels('quality')]
+        return self.cache.get_or_compute(
+            ('quality_corr', start, end, min_periods),
+            lambda: pairwise_corr(self.grid(date_range)[qualities], min_periods=min_periods)
+        )
+
+    # Charge et récupération des semaines précédentes contre les tests de capacité
+    @profiled('aggregate', 'lagged_corr')
+    def lagged(self, date_range=None, lags=range(0, 5), min_periods=MIN_PERIODS):
+        start, end = self._window(date_range)
+        qualities = [str(q) for q in self.cube.levels('quality')]
+
+        def build():
+            grid = self.grid(date_range)
+            return lagged_corr(grid[LOAD_COLUMNS + COMPOSITE_COLUMNS], grid[qualities], lags, min_periods)
+        return self.cache.get_or_compute(('lagged', start, end, tuple(lags), min_periods), build)
@@ -0,0 +1,124 @@
+import numpy as np
+import pandas as pd
+
+from cfc_data import CAPABILITY_KEYS
+from cfc_shared import read_only
+
+
+# Cube dense date × série (expression, movement, quality) des benchmarkPct.
+# Toute sélection de la sidebar devient un découpage direct : colonnes via l'index
+# des séries, lignes via une recherche dichotomique sur les dates triées.
+class CapabilityCube:
+
+    def __init__(self, dates, series, sums, counts, present):
+        self.dates = dates
+        self.series = series
+        self.counts = counts
+        self.present = present
+        self._sums = sums
+        with np.errstate(invalid='ignore', divide='ignore'):
+            self.values = np.where(counts > 0, sums / counts, np.nan).astype('float32')
+        self._levels = {key: series[key].to_numpy() for key in CAPABILITY_KEYS}
+        self._position = {key: i for i, key in enumerate(series.itertuples(index=False, name=None))}
+        self._groups = {}
+
+    @classmethod
+    def from_frame(cls, df, date_col='testDate', value_col='benchmarkPct'):
+        series_codes, series_index = pd.MultiIndex.from_frame(df[CAPABILITY_KEYS]).factorize(sort=True)
+        date_codes, dates = pd.factorize(df[date_col], sort=True)
+        shape = (len(dates), len(series_index))
+
+        values = df[value_col].to_numpy(dtype='float64', na_value=np.nan)
+        valid = ~np.isnan(values)
+        sums = np.zeros(shape, dtype='float64')
+        counts = np.zeros(shape, dtype='int32')
+        present = np.zeros(shape, dtype=bool)
+        # np.add.at agrège les éventuels doublons (même série, même date) comme pivot_table
+        np.add.at(sums, (date_codes[valid], series_codes[valid]), values[valid])
+        np.add.at(counts, (date_codes[valid], series_codes[valid]), 1)
+        present[date_codes, series_codes] = True
+
+        series = series_index.to_frame(index=False, name=CAPABILITY_KEYS)
+        for key in CAPABILITY_KEYS:
+            series[key] = series[key].astype(df[key].dtype)
+        return cls(pd.DatetimeIndex(dates, name=date_col), series, sums, counts, present)
+
+    # Tableaux verrouillés en écriture pour un cube partagé entre sessions
+    def freeze(self):
+        read_only(self.values, self._sums, self.counts, self.present)
+        return self
+
+    def levels(self, level):
+        return self.series[level].drop_duplicates().tolist()
+
+    def date_slice(self, start=None, end=None):
+        lo = 0 if start is None else self.dates.searchsorted(pd.Timestamp(start), side='left')
+        hi = len(self.dates) if end is None else self.dates.searchsorted(pd.Timestamp(end), side='right')
+        return slice(lo, hi)
+
+    def series_positions(self, expression=None, movement=None, quality=None):
+        selection = {'expression': expression, 'movement': movement, 'quality': quality}
+        if all(isinstance(value, str) for value in selection.values()):
+            position = self._position.get((expression, movement, quality))
+            return np.array([] if position is None else [position], dtype='intp')
+
+        mask = np.ones(len(self.series), dtype=bool)
+        for key, value in selection.items():
+            if value is not None:
+                mask &= np.isin(self._levels[key], np.atleast_1d(value))
+        return np.flatnonzero(mask)
+
+    # Vue longue (une ligne par test) limitée aux séries et à la période demandées
+    def frame(self, start=None, end=None, **selection):
+        rows = self.date_slice(start, end)
+        cols = self.series_positions(**selection)
+        date_idx, series_idx = np.nonzero(self.present[rows][:, cols])
+
+        out = {self.dates.name: self.dates[rows][date_idx]}
+        selected = self.series.iloc[cols]
+        for key in CAPABILITY_KEYS:
+            out[key] = selected[key].iloc[series_idx].to_numpy()
+        out['benchmarkPct'] = self.values[rows][:, cols][date_idx, series_idx]
+
+        df = pd.DataFrame(out)
+        for key in CAPABILITY_KEYS:
+            df[key] = df[key].astype(self.series[key].dtype)
+        return df
+
+    def _group_matrix(self, level):
+        if level not in self._groups:
+            codes, uniques = pd.factorize(self.series[level], sort=True)
+            matrix = np.zeros((len(self.series), len(uniques)), dtype='float64')
+            matrix[np.arange(len(self.series)), codes] = 1.0
+            self._groups[level] = (matrix, pd.Index(np.asarray(uniques), name=level))
+        return self._groups[level]
+
+    # Moyenne et nombre de tests par modalité d'un niveau (équivalent groupby().agg(['mean', 'count']))
+    def aggregate(self, level, start=None, end=None):
+        rows = self.date_slice(start, end)
+        matrix, labels = self._group_matrix(level)
+        sums = self._sums[rows].sum(axis=0) @ matrix
+        counts = self.counts[rows].sum(axis=0) @ matrix
+        observed = self.present[rows].any(axis=0) @ matrix > 0
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            means = np.where(counts > 0, sums / counts, np.nan)
+        result = pd.DataFrame({level: labels, 'mean': means, 'count': counts.astype('int64')})
+        return result[observed].reset_index(drop=True)
+
+    # Sommes et nombres de tests par date et par modalité d'un niveau, sur la période demandée
+    def group_totals(self, level, start=None, end=None, **selection):
+        rows = self.date_slice(start, end)
+        matrix, labels = self._group_matrix(level)
+        cols = self.series_positions(**selection)
+        sums = self._sums[rows][:, cols] @ matrix[cols]
+        counts = self.counts[rows][:, cols] @ matrix[cols]
+        return self.dates[rows], labels, sums, counts
+
+    # Tableau date × modalité (équivalent pivot_table(index=date, columns=level, aggfunc='mean'))
+    def pivot(self, level, start=None, end=None, **selection):
+        dates, labels, sums, counts = self.group_totals(level, start, end, **selection)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            means = np.where(counts > 0, sums / counts, np.nan)
+        pivot = pd.DataFrame(means, index=dates, columns=labels)
+        return pivot.dropna(how='all').dropna(axis=1, how='all')
@@ -0,0 +1,128 @@
+import os
+import threading
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# pyarrow est optionnel (voir requirements.txt) : sans lui, les sorties sont écrites en CSV
+try:
+    import pyarrow  # noqa: F401
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
+
+DATA_DIR = Path(__file__).resolve().parent
+PHYSICAL_CAPABILITY_CSV = DATA_DIR / "CFC Physical Capability Data_.csv"
+CACHE_DIR = Path(os.environ.get("CFC_CACHE_DIR", DATA_DIR / ".cfc_cache"))
+
+HR_ZONES = [1, 2, 3, 4, 5]
+HR_ZONE_HMS_COLUMNS = [f'hr_zone_{zone}_hms' for zone in HR_ZONES]
+HR_ZONE_SECONDS_COLUMNS = [f'hr_zone_{zone}_s' for zone in HR_ZONES]
+
+_HMS_PATTERN = r'^\s*(\d+):(\d{1,2}):(\d{1,2})\s*$'
+
+RECOVERY_CATEGORIES = ['bio', 'msk_joint_range', 'msk_load_tolerance', 'subjective', 'soreness', 'sleep']
+
+# Mesures brutes de chaque catégorie de récupération (colonne "{catégorie}_{mesure}")
+# et leur sens : +1 si une valeur plus haute signifie une meilleure récupération
+RECOVERY_INPUTS = {
+    'bio': {'hrv': 1, 'ck': -1},
+    'msk_joint_range': {'hip_rom': 1, 'ankle_rom': 1},
+    'msk_load_tolerance': {'adductor_squeeze': 1, 'hamstring_iso': 1},
+    'subjective': {'mood': 1, 'energy': 1, 'stress': -1},
+    'soreness': {'upper': -1, 'lower': -1},
+    'sleep': {'duration': 1, 'quality': 1},
+}
+RECOVERY_INPUT_COLUMNS = [f'{cat}_{name}' for cat in RECOVERY_CATEGORIES for name in RECOVERY_INPUTS[cat]]
+
+CAPABILITY_KEYS = ['expression', 'movement', 'quality']
+CAPABILITY_DTYPES = {
+    'expression': 'category',
+    'movement': 'category',
+    'quality': 'category',
+    'benchmarkPct': 'float32',
+}
+
+
+# Empreinte rapide (taille, date) du fichier source : clé des caches en mémoire et mémo du hachage de contenu
+def source_fingerprint(path):
+    stat = Path(path).stat()
+    return f"{stat.st_size:x}-{stat.st_mtime_ns:x}"
+
+
+# Saison "2023-24" pour chaque date (la saison commence le 1er juillet)
+def season_labels(dates):
+    dates = pd.DatetimeIndex(dates)
+    start_year = dates.year - (dates.month < 7)
+    years, codes = np.unique(start_year, return_inverse=True)
+    labels = np.array([f'{year}-{(year + 1) % 100:02d}' for year in years], dtype=object)
+    return labels[codes]
+
+
+# Lecture brute du CSV (BOM, dates jour/mois/année, colonnes typées)
+def parse_physical_capability_csv(path=PHYSICAL_CAPABILITY_CSV):
+    df = pd.read_csv(path, encoding='utf-8-sig', dtype=CAPABILITY_DTYPES)
+    df['testDate'] = pd.to_datetime(df['testDate'], format='%d/%m/%Y')
+    return df
+
+
+# Écriture atomique (fichier temporaire puis os.replace) pour ne jamais exposer un fichier partiel
+# à un autre processus ; `stale` (motifs glob) désigne les anciennes versions à supprimer ensuite
+def atomic_write(path, write, stale=()):
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(f'.{os.getpid()}.{threading.get_ident()}.tmp')
+    write(tmp)
+    os.replace(tmp, path)
+    for pattern in stale:
+        for old in path.parent.glob(pattern):
+            if old != path:
+                old.unlink(missing_ok=True)
+
+
+# Conversion vectorisée HH:MM:SS -> secondes entières (Int32, <NA> si la valeur est invalide).
+# Chemin rapide : les chaînes de 8 caractères sont lues comme un tableau de points de code ;
+# les autres formats (heures sur 1 ou 3 chiffres, espaces) passent par une regex vectorisée.
+def parse_hms_seconds(values):
+    text = pd.Series(values, copy=False).astype('string')
+    seconds = np.full(len(text), -1, dtype='int64')
+
+    fixed = (text.str.len() == 8).fillna(False).to_numpy(dtype=bool)
+    if fixed.any():
+        codes = text[fixed].to_numpy(dtype='U8').view(np.uint32).reshape(-1, 8).astype('int64')
+        digits = codes - ord('0')
+        well_formed = (
+            (codes[:, 2] == ord(':')) & (codes[:, 5] == ord(':'))
+            & ((digits[:, [0, 1, 3, 4, 6, 7]] >= 0) & (digits[:, [0, 1, 3, 4, 6, 7]] <= 9)).all(axis=1)
+        )
+        hours = digits[:, 0] * 10 + digits[:, 1]
+        minutes = digits[:, 3] * 10 + digits[:, 4]
+        secs = digits[:, 6] * 10 + digits[:, 7]
+        well_formed &= (minutes < 60) & (secs < 60)
+        parsed = np.where(well_formed, hours * 3600 + minutes * 60 + secs, -1)
+        seconds[np.flatnonzero(fixed)] = parsed
+        fixed[np.flatnonzero(fixed)[~well_formed]] = False
+
+    rest = ~fixed & text.notna().to_numpy(dtype=bool)
+    if rest.any():
+        parts = text[rest].str.extract(_HMS_PATTERN).astype('Int64')
+        minutes_ok = (parts[1] < 60) & (parts[2] < 60)
+        parsed = (parts[0] * 3600 + parts[1] * 60 + parts[2]).where(minutes_ok)
+        seconds[np.flatnonzero(rest)] = parsed.fillna(-1).to_numpy(dtype='int64')
+
+    result = pd.array(seconds, dtype='Int32')
+    result[seconds < 0] = pd.NA
+    return pd.Series(result, index=text.index, name=text.name)
+
+
+# Ajoute les durées des zones cardiaques en secondes (et leur total) une fois pour toutes au chargement.
+# Retourne aussi le nombre de valeurs invalides par colonne au lieu de les remplacer par 0.
+def add_hr_zone_seconds(gps_data):
+    converted = {}
+    malformed = {}
+    for hms_col, seconds_col in zip(HR_ZONE_HMS_COLUMNS, HR_ZONE_SECONDS_COLUMNS):
+        converted[seconds_col] = parse_hms_seconds(gps_data[hms_col])
+        malformed[hms_col] = int(converted[seconds_col].isna().sum())
+    converted['hr_zone_total_s'] = sum(converted[col] for col in HR_ZONE_SECONDS_COLUMNS)
+    return gps_data.assign(**converted), malformed
@@ -0,0 +1,58 @@
+import numpy as np
+
+# Largeur approximative (px) des graphiques en pleine largeur et en demi-colonne
+CHART_WIDTH_FULL = 1400
+CHART_WIDTH_HALF = 700
+
+
+# Nombre de points à conserver par trace pour une largeur de graphique donnée
+def target_points(width=CHART_WIDTH_FULL, points_per_pixel=1.0):
+    return max(int(width * points_per_pixel), 3)
+
+
+def _as_float(values):
+    values = np.asarray(values)
+    if np.issubdtype(values.dtype, np.datetime64):
+        return values.astype('datetime64[ns]').astype('int64').astype('float64')
+    return values.astype('float64')
+
+
+# Min-max par seau : garde le minimum et le maximum de chaque seau (pics et creux exacts)
+def minmax_indices(y, n_out):
+    y = _as_float(y)
+    n = len(y)
+    if n <= n_out:
+        return np.arange(n)
+
+    bucket = int(np.ceil(n / max(n_out // 2, 1)))
+    n_buckets = int(np.ceil(n / bucket))
+    padded = np.full(n_buckets * bucket, np.nan)
+    padded[:n] = y
+    padded = padded.reshape(n_buckets, bucket)
+    valid = ~np.isnan(padded)
+
+    offsets = np.arange(n_buckets) * bucket
+    lows = offsets + np.argmin(np.where(valid, padded, np.inf), axis=1)
+    highs = offsets + np.argmax(np.where(valid, padded, -np.inf), axis=1)
+    keep = np.concatenate(([0, n - 1], lows, highs))
+    return np.unique(keep[keep < n])
+
+
+# Réduit chaque trace (une par valeur de `color`) à n_out points (min-max par seau) avant l'envoi
+# au navigateur. Sous le seuil, les données sont renvoyées en pleine résolution.
+def downsample_frame(df, x, y, n_out=None, color=None):
+    n_out = n_out or target_points()
+    n_traces = df[color].nunique() if color else 1
+    if len(df) <= n_out * n_traces:
+        return df
+
+    ordered = df.sort_values(x, kind='stable')
+    y_values = ordered[y].to_numpy(dtype='float64', na_value=np.nan)
+    if color is None:
+        return ordered.iloc[minmax_indices(y_values, n_out)]
+
+    kept = [
+        rows[minmax_indices(y_values[rows], n_out)]
+        for rows in ordered.groupby(color, sort=False, observed=True).indices.values()
+    ]
+    return ordered.iloc[np.sort(np.concatenate(kept))] if kept else ordered
@@ -0,0 +1,151 @@
+from collections import deque
+
+import numpy as np
+import pandas as pd
+
+from cfc_data import CAPABILITY_KEYS
+
+# Fenêtre glissante (nombre de variations précédentes), seuil du z-score et écart-type plancher
+# (une série plate ne doit pas transformer une variation d'un point en z-score infini)
+WINDOW = 10
+MIN_PERIODS = 5
+Z_THRESHOLD = 2.0
+MIN_STD = 0.005
+
+EVENT_COLUMNS = ['testDate'] + CAPABILITY_KEYS + ['benchmarkPct', 'change', 'zscore', 'event']
+
+
+# Détection des pics et des chutes sur toutes les séries (expression, movement, quality) à la fois.
+# Chaque variation entre deux tests consécutifs d'une série est comparée, par z-score, aux
+# `window` variations précédentes de la même série. Les nouveaux tests sont ajoutés en O(window).
+class PeakDropDetector:
+
+    def __init__(self, window=WINDOW, min_periods=MIN_PERIODS, threshold=Z_THRESHOLD, min_std=MIN_STD):
+        self.window = window
+        self.min_periods = min_periods
+        self.threshold = threshold
+        self.min_std = min_std
+        self.states = {}
+        self._tests = pd.DataFrame(columns=['testDate'] + CAPABILITY_KEYS + ['benchmarkPct'])
+        self._event_frames = []
+        self._new_events = []
+        self._events = None
+
+    @classmethod
+    def from_frame(cls, tests, **kwargs):
+        detector = cls(**kwargs)
+        detector._tests = detector._clean(tests)
+        events, detector.states = detector._bulk(detector._tests)
+        detector._event_frames = [events]
+        return detector
+
+    def _clean(self, tests):
+        tests = tests[['testDate'] + CAPABILITY_KEYS + ['benchmarkPct']].dropna(subset=['benchmarkPct'])
+        return tests.sort_values(CAPABILITY_KEYS + ['testDate'], kind='stable').reset_index(drop=True)
+
+    def _bulk(self, tests):
+        if tests.empty:
+            return pd.DataFrame(columns=EVENT_COLUMNS), {}
+
+        series = tests.groupby(CAPABILITY_KEYS, observed=True, sort=False).ngroup().to_numpy()
+        values = tests['benchmarkPct'].to_numpy(dtype='float64')
+        n = len(values)
+        index = np.arange(n)
+
+        starts = np.r_[True, series[1:] != series[:-1]]
+        group_start = np.maximum.accumulate(np.where(starts, index, 0))
+        change = np.r_[np.nan, np.diff(values)]
+        change[starts] = np.nan
+
+        # Matrice (test × `window` variations précédentes de la même série), NaN hors de la série
+        previous = index[:, None] - np.arange(1, self.window + 1)[None, :]
+        in_series = previous >= (group_start + 1)[:, None]
+        windows = np.where(in_series, change[np.maximum(previous, 0)], np.nan)
+        zscore = self._zscore(change, windows)
+
+        events = self._event_frame(tests, change, zscore)
+
+        states = {}
+        ends = np.r_[np.flatnonzero(starts)[1:], n]
+        for first, last in zip(np.flatnonzero(starts), ends):
+            key = tuple(tests.loc[first, CAPABILITY_KEYS])
+            states[key] = {
+                'last_date': tests['testDate'].iat[last - 1],
+                'last_value': values[last - 1],
+                'changes': deque(change[max(first + 1, last - self.window):last], maxlen=self.window),
+            }
+        return events, states
+
+    def _zscore(self, change, windows):
+        count = np.sum(~np.isnan(windows), axis=1)
+        enough = count >= max(self.min_periods, 2)
+        mean = np.full(len(change), np.nan)
+        std = np.full(len(change), np.nan)
+        mean[enough] = np.nanmean(windows[enough], axis=1)
+        std[enough] = np.maximum(np.nanstd(windows[enough], axis=1, ddof=1), self.min_std)
+        return (change - mean) / std
+
+    def _event_frame(self, tests, change, zscore):
+        flagged = np.abs(np.nan_to_num(zscore)) >= self.threshold
+        events = tests.loc[flagged, ['testDate'] + CAPABILITY_KEYS + ['benchmarkPct']].copy()
+        events['benchmarkPct'] = events['benchmarkPct'].astype('float32')
+        events['change'] = change[flagged].astype('float32')
+        events['zscore'] = zscore[flagged].astype('float32')
+        events['event'] = pd.Categorical(np.where(zscore[flagged] > 0, 'peak', 'drop'), categories=['peak', 'drop'])
+        return events.reset_index(drop=True)
+
+    # Ajout incrémental de nouveaux tests ; une série reçoit un test plus ancien -> recalcul de cette série
+    def add_tests(self, tests):
+        tests = self._clean(tests)
+        self._tests = pd.concat([self._tests, tests], ignore_index=True)
+        self._events = None
+
+        rebuild = set()
+        for row in tests.itertuples(index=False):
+            key = tuple(getattr(row, k) for k in CAPABILITY_KEYS)
+            state = self.states.get(key)
+            if state is None:
+                self.states[key] = {'last_date': row.testDate, 'last_value': row.benchmarkPct,
+                                    'changes': deque(maxlen=self.window)}
+                continue
+            if key in rebuild or row.testDate < state['last_date']:
+                rebuild.add(key)
+                continue
+
+            change = row.benchmarkPct - state['last_value']
+            window = np.full((1, self.window), np.nan)
+            window[0, :len(state['changes'])] = state['changes']
+            zscore = self._zscore(np.array([change]), window)[0]
+            if abs(np.nan_to_num(zscore)) >= self.threshold:
+                self._new_events.append({
+                    'testDate': row.testDate, **dict(zip(CAPABILITY_KEYS, key)),
+                    'benchmarkPct': row.benchmarkPct, 'change': change, 'zscore': zscore,
+                    'event': 'peak' if zscore > 0 else 'drop',
+                })
+            state['changes'].append(change)
+            state['last_date'], state['last_value'] = row.testDate, row.benchmarkPct
+
+        for key in rebuild:
+            self._rebuild_series(key)
+
+    def _rebuild_series(self, key):
+        def in_series(frame):
+            return np.logical_and.reduce([(frame[k] == v).to_numpy() for k, v in zip(CAPABILITY_KEYS, key)])
+
+        events, states = self._bulk(self._clean(self._tests[in_series(self._tests)]))
+        self._event_frames = [frame[~in_series(frame)] for frame in self._event_frames] + [events]
+        self._new_events = [e for e in self._new_events if tuple(e[k] for k in CAPABILITY_KEYS) != key]
+        self.states.update(states)
+
+    # Table compacte des événements (une ligne par pic ou chute), triée par date
+    def events(self):
+        if self._events is None:
+            frames = [frame for frame in self._event_frames if not frame.empty]
+            if self._new_events:
+                frames.append(pd.DataFrame(self._new_events))
+            events = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=EVENT_COLUMNS)
+            for key in CAPABILITY_KEYS:
+                events[key] = events[key].astype('category')
+            events['event'] = pd.Categorical(events['event'], categories=['peak', 'drop'])
+            self._events = events.sort_values(['testDate'] + CAPABILITY_KEYS, kind='stable').reset_index(drop=True)
+        return self._events
@@ -0,0 +1,162 @@
+import io
+
+import numpy as np
+import pandas as pd
+
+from cfc_data import HAS_PYARROW
+from cfc_filters import LRUViewCache
+
+PAGE_SIZES = [25, 50, 100, 500]
+# Lignes sérialisées par bloc à l'export (mémoire bornée quelle que soit la sélection)
+EXPORT_CHUNK_ROWS = 50_000
+
+EXPORT_FORMATS = {'csv': 'text/csv'}
+if HAS_PYARROW:
+    EXPORT_FORMATS['parquet'] = 'application/vnd.apache.parquet'
+
+
+def _filter_key(filters):
+    if not filters:
+        return ()
+    return tuple(sorted(
+        (column, tuple(value) if isinstance(value, (list, set, tuple)) else value)
+        for column, value in filters.items()
+    ))
+
+
+# Masque d'un filtre de colonne : (min, max) bornes incluses, liste de valeurs, texte (contient,
+# sans casse) ou valeur exacte. Sur une colonne catégorielle, le texte est cherché dans les catégories.
+def _column_mask(series, value):
+    if isinstance(value, tuple) and len(value) == 2:
+        low, high = value
+        mask = np.ones(len(series), dtype=bool)
+        if low is not None:
+            mask &= (series >= low).to_numpy(dtype=bool, na_value=False)
+        if high is not None:
+            mask &= (series <= high).to_numpy(dtype=bool, na_value=False)
+        return mask
+    if isinstance(value, (list, set)):
+        return series.isin(list(value)).to_numpy()
+    if isinstance(value, str):
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            categories = series.cat.categories
+            matched = categories[categories.astype(str).str.contains(value, case=False, regex=False)]
+            return series.isin(matched).to_numpy()
+        return series.astype(str).str.contains(value, case=False, regex=False).to_numpy(dtype=bool, na_value=False)
+    return (series == value).to_numpy(dtype=bool, na_value=False)
+
+
+# Filtre sans effet : valeur absente ou texte vide (une liste vide ne retient aucune ligne)
+def _is_empty(value):
+    return value is None or (isinstance(value, str) and not value)
+
+
+# Navigateur de table côté serveur : filtres, tri et pagination calculés sur le jeu partagé, seule
+# la fenêtre demandée est renvoyée. L'ordre des lignes filtrées et triées est mis en cache par requête
+# (LRU) : changer de page ne coûte qu'un iloc sur page_size positions.
+class TableView:
+
+    def __init__(self, frame, cache=None):
+        self.frame = frame
+        self.cache = cache if cache is not None else LRUViewCache(max_entries=32)
+
+    @property
+    def columns(self):
+        return list(self.frame.columns)
+
+    # Positions (iloc) des lignes retenues, dans l'ordre du tri
+    def positions(self, filters=None, sort_by=None, ascending=True):
+        filters = {column: value for column, value in (filters or {}).items() if not _is_empty(value)}
+        key = (_filter_key(filters), sort_by, ascending)
+        return self.cache.get_or_compute(key, lambda: self._positions(filters, sort_by, ascending))
+
+    def _positions(self, filters, sort_by, ascending):
+        mask = np.ones(len(self.frame), dtype=bool)
+        for column, value in filters.items():
+            mask &= _column_mask(self.frame[column], value)
+        positions = np.flatnonzero(mask)
+        if sort_by is not None:
+            values = self.frame[sort_by].iloc[positions].reset_index(drop=True)
+            order = values.sort_values(ascending=ascending, kind='stable', na_position='last').index.to_numpy()
+            positions = positions[order]
+        return positions
+
+    # Page (numérotée à partir de 0) et nombre total de lignes retenues
+    def page(self, page=0, page_size=PAGE_SIZES[0], filters=None, sort_by=None, ascending=True):
+        positions = self.positions(filters, sort_by, ascending)
+        start = max(page, 0) * page_size
+        return self.frame.iloc[positions[start:start + page_size]], len(positions)
+
+    def iter_chunks(self, filters=None, sort_by=None, ascending=True, chunk_rows=EXPORT_CHUNK_ROWS):
+        positions = self.positions(filters, sort_by, ascending)
+        # Sélection vide : un bloc vide, pour que l'export garde l'en-tête (CSV) ou le schéma (Parquet)
+        for start in range(0, max(len(positions), 1), chunk_rows):
+            yield self.frame.iloc[positions[start:start + chunk_rows]]
+
+
+def n_pages(total, page_size):
+    return max((total + page_size - 1) // page_size, 1)
+
+
+def iter_csv(chunks):
+    header = True
+    for chunk in chunks:
+        yield chunk.to_csv(index=False, header=header).encode('utf-8')
+        header = False
+
+
+# Flux d'écriture qui ne conserve que les octets pas encore lus : la position (tell) reste celle du
+# fichier complet, dont le writer Parquet a besoin pour les offsets du pied de page
+class _ChunkSink(io.RawIOBase):
+
+    def __init__(self):
+        self.parts = []
+        self.position = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self.parts.append(bytes(data))
+        self.position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self.position
+
+    def drain(self):
+        data = b''.join(self.parts)
+        self.parts = []
+        return data
+
+
+# Un groupe de lignes Parquet par bloc, émis dès qu'il est écrit
+def iter_parquet(chunks):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    sink = _ChunkSink()
+    writer = None
+    for chunk in chunks:
+        if writer is None:
+            table = pa.Table.from_pandas(chunk, preserve_index=False)
+            writer = pq.ParquetWriter(sink, table.schema)
+        else:
+            table = pa.Table.from_pandas(chunk, schema=writer.schema, preserve_index=False)
+        writer.write_table(table)
+        yield sink.drain()
+    if writer is not None:
+        writer.close()
+        yield sink.drain()
+
+
+def iter_export(chunks, fmt):
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Format d'export inconnu : {fmt}")
+    return iter_parquet(chunks) if fmt == 'parquet' else iter_csv(chunks)
+
+
+# Octets du fichier d'export, sérialisé bloc par bloc (st.download_button garde de toute façon
+# le fichier entier en mémoire)
+def export_bytes(view, fmt, filters=None, sort_by=None, ascending=True):
+    return b''.join(iter_export(view.iter_chunks(filters, sort_by, ascending), fmt))
@@ -0,0 +1,133 @@
+import os
+import sys
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from cfc_profiling import profiled, section
+
+DEFAULT_MAX_MB = float(os.environ.get("CFC_FILTER_CACHE_MB", 256))
+
+
+# Estimation de l'empreinte mémoire d'une vue en cache (DataFrame, tableaux, conteneurs)
+def estimate_nbytes(value):
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        usage = value.memory_usage(deep=True, index=True)
+        return int(usage.sum() if isinstance(usage, pd.Series) else usage)
+    if isinstance(value, np.ndarray):
+        return int(value.nbytes)
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(estimate_nbytes(v) for v in value.values())
+    if isinstance(value, (list, tuple)):
+        return sys.getsizeof(value) + sum(estimate_nbytes(v) for v in value)
+    return sys.getsizeof(value)
+
+
+# Cache LRU borné en mémoire, partagé entre sessions (d'où le verrou)
+class LRUViewCache:
+
+    def __init__(self, max_bytes=int(DEFAULT_MAX_MB * 2**20), max_entries=None):
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.nbytes = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def get_or_compute(self, key, compute):
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key][0]
+            self.misses += 1
+
+        # Calcul hors verrou : les autres sessions ne sont pas bloquées pendant un filtrage
+        value = compute()
+        size = estimate_nbytes(value)
+        with self._lock:
+            if key in self._entries:
+                return self._entries[key][0]
+            if size <= self.max_bytes:
+                self._entries[key] = (value, size)
+                self.nbytes += size
+                self._evict()
+        return value
+
+    def _evict(self):
+        while self._entries and (
+            self.nbytes > self.max_bytes
+            or (self.max_entries is not None and len(self._entries) > self.max_entries)
+        ):
+            _, (_, size) = self._entries.popitem(last=False)
+            self.nbytes -= size
+            self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.nbytes = 0
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'evictions': self.evictions,
+            'entries': len(self._entries),
+            'nbytes': self.nbytes,
+            'max_bytes': self.max_bytes,
+        }
+
+
+# Clé de filtre normalisée : (début, fin, saisons triées)
+def filter_key(date_range, seasons=None):
+    start, end = (pd.Timestamp(d) for d in date_range)
+    return start, end, tuple(sorted(seasons)) if seasons is not None else None
+
+
+# Service de filtrage : vues filtrées et agrégats dérivés mis en cache par clé de filtre.
+# Les vues retournées sont partagées entre sessions et ne doivent pas être modifiées en place.
+class FilterService:
+
+    def __init__(self, gps_data, recovery_data, capability_cube=None, cache=None):
+        self.gps_data = gps_data
+        self.recovery_data = recovery_data
+        self.capability_cube = capability_cube
+        self.cache = cache if cache is not None else LRUViewCache()
+
+    @profiled('filter', 'gps')
+    def gps(self, date_range, seasons):
+        start, end, season_key = key = filter_key(date_range, seasons)
+        return self.cache.get_or_compute(('gps',) + key, lambda: self.gps_data[
+            (self.gps_data['date'] >= start)
+            & (self.gps_data['date'] <= end)
+            & (self.gps_data['season'].isin(season_key))
+        ])
+
+    @profiled('filter', 'recovery')
+    def recovery(self, date_range):
+        start, end, _ = key = filter_key(date_range)
+        return self.cache.get_or_compute(('recovery',) + key, lambda: self.recovery_data[
+            (self.recovery_data['date'] >= start)
+            & (self.recovery_data['date'] <= end)
+        ])
+
+    # Agrégat dérivé d'une vue filtrée, mis en cache sous (nom, clé de filtre)
+    def derived(self, name, date_range, seasons, compute):
+        with section(name, 'aggregate'):
+            return self.cache.get_or_compute((name,) + filter_key(date_range, seasons), compute)
+
+    def stats(self):
+        return self.cache.stats()
@@ -0,0 +1,100 @@
+import numpy as np
+import pandas as pd
+import plotly.express as px
+
+from cfc_data import season_labels
+from cfc_filters import LRUViewCache
+
+# Regroupement des dates selon l'étendue affichée (en jours)
+WEEKLY_MAX_DAYS = 182
+MONTHLY_MAX_DAYS = 2 * 365
+
+
+# Granularité lisible pour une période : semaine, mois ou saison
+def choose_bin(start, end):
+    span = (pd.Timestamp(end) - pd.Timestamp(start)).days
+    if span <= WEEKLY_MAX_DAYS:
+        return 'week'
+    if span <= MONTHLY_MAX_DAYS:
+        return 'month'
+    return 'season'
+
+
+# Étiquette de la classe de chaque date (les dates étant triées, les classes sont contiguës)
+def bin_labels(dates, freq):
+    dates = pd.DatetimeIndex(dates)
+    if freq == 'week':
+        return (dates - pd.to_timedelta(dates.dayofweek, unit='D')).strftime('%Y-%m-%d')
+    if freq == 'month':
+        return dates.strftime('%Y-%m')
+    if freq == 'season':
+        return pd.Index(season_labels(dates))
+    raise ValueError(f"Granularité inconnue : {freq}")
+
+
+# Moteur de heatmap : matrices modalité × période calculées depuis le cube et mises en cache
+class HeatmapEngine:
+
+    def __init__(self, cube, cache=None):
+        self.cube = cube
+        self.cache = cache if cache is not None else LRUViewCache(max_entries=64)
+
+    def matrix(self, level='quality', start=None, end=None, freq=None):
+        start = self.cube.dates[0] if start is None else pd.Timestamp(start)
+        end = self.cube.dates[-1] if end is None else pd.Timestamp(end)
+        freq = freq or choose_bin(start, end)
+        return self.cache.get_or_compute(
+            ('heatmap', level, start, end, freq),
+            lambda: self._binned_means(level, start, end, freq)
+        )
+
+    # Moyenne exacte par classe (somme des tests / nombre de tests), via reduceat sur les dates triées
+    def _binned_means(self, level, start, end, freq):
+        dates, labels, sums, counts = self.cube.group_totals(level, start, end)
+        if len(dates) == 0:
+            return pd.DataFrame(index=pd.Index(labels, name=level))
+
+        periods = bin_labels(dates, freq)
+        starts = np.flatnonzero(np.r_[True, periods[1:] != periods[:-1]])
+        bin_sums = np.add.reduceat(sums, starts, axis=0)
+        bin_counts = np.add.reduceat(counts, starts, axis=0)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            means = np.where(bin_counts > 0, bin_sums / bin_counts, np.nan)
+
+        matrix = pd.DataFrame(means.T, index=pd.Index(labels, name=level), columns=pd.Index(periods[starts], name=freq))
+        return matrix.dropna(how='all').dropna(axis=1, how='all')
+
+    def figure(self, level='quality', start=None, end=None, freq=None, title=None, labels=None):
+        matrix = self.matrix(level, start, end, freq)
+        freq = freq or choose_bin(
+            self.cube.dates[0] if start is None else start,
+            self.cube.dates[-1] if end is None else end
+        )
+        fig = px.imshow(
+            matrix,
+            color_continuous_scale='RdBu',
+            aspect='auto',
+            title=title,
+            labels=labels or {'x': freq, 'y': level, 'color': 'benchmarkPct'}
+        )
+        fig.update_xaxes(type='category')
+        return fig
+
+
+# Matrice de corrélation interactive (remplace sns.heatmap(annot=True)), effectifs au survol
+def correlation_figure(corr_matrix, counts=None, title=None):
+    fig = px.imshow(
+        corr_matrix,
+        text_auto='.2f',
+        color_continuous_scale='RdBu',
+        zmin=-1,
+        zmax=1,
+        aspect='auto',
+        title=title
+    )
+    if counts is not None:
+        fig.update_traces(
+            customdata=counts.reindex(index=corr_matrix.index, columns=corr_matrix.columns).to_numpy(),
+            hovertemplate="%{y} / %{x}<br>r = %{z:.2f}<br>n = %{customdata}<extra></extra>"
+        )
+    return fig
@@ -0,0 +1,224 @@
+import argparse
+import os
+import pickle
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from cfc_data import HAS_PYARROW, HR_ZONE_HMS_COLUMNS, add_hr_zone_seconds, season_labels
+from cfc_rollup import GPS_ROLLUP_COLUMNS, RollupTable
+from cfc_synthetic import format_hms
+
+# Colonnes d'un fichier de suivi brut (10 Hz) : temps (s), vitesse (m/s), fréquence cardiaque (bpm)
+TRACKING_COLUMNS = ['time', 'speed', 'heart_rate']
+# Nom de fichier : <joueur>_<AAAA-MM-JJ>[_suffixe].csv|.parquet
+SESSION_PATTERN = re.compile(r'^(?P<player_id>[^_]+)_(?P<date>\d{4}-\d{2}-\d{2})')
+
+SPEED_THRESHOLDS_KMH = [21, 24, 27]
+ACCEL_THRESHOLDS = [2.5, 3.5, 4.5]
+# Zones cardiaques en fraction de la FC max (bornes basses des zones 1 à 5)
+HR_ZONE_BOUNDS = [0.5, 0.6, 0.7, 0.8, 0.9]
+HR_MAX = 200
+# Accélération sur 0,5 s (5 échantillons à 10 Hz) pour lisser le bruit de la vitesse
+ACCEL_WINDOW = 5
+# Un effort compte quand |accélération| reste au-dessus du seuil pendant 0,5 s (évite les rebonds)
+MIN_EFFORT_SAMPLES = 5
+# Trou de signal : au-delà, l'intervalle n'est pas intégré
+MAX_GAP_S = 1.0
+CHUNK_SIZE = 500_000
+
+
+# Agrégats d'une session, mis à jour bloc par bloc. Les derniers échantillons du bloc précédent
+# sont conservés pour que les différences et les franchissements de seuil soient exacts aux jonctions.
+class SessionAccumulator:
+
+    def __init__(self, hr_max=HR_MAX):
+        self.hr_bounds = np.array(HR_ZONE_BOUNDS) * hr_max
+        self.speed_thresholds = np.array(SPEED_THRESHOLDS_KMH) / 3.6
+        self.accel_thresholds = np.array(ACCEL_THRESHOLDS)
+        self.distance = 0.0
+        self.band_distance = np.zeros(len(SPEED_THRESHOLDS_KMH))
+        self.efforts = np.zeros(len(ACCEL_THRESHOLDS), dtype='int64')
+        self.hr_seconds = np.zeros(len(HR_ZONE_BOUNDS))
+        self.peak_speed = 0.0
+        self.first_time = None
+        self.last_time = None
+        self.samples = 0
+        self._tail_t = np.empty(0)
+        self._tail_v = np.empty(0)
+        self._run = np.zeros(len(ACCEL_THRESHOLDS), dtype='int64')
+
+    def update(self, t, speed, hr):
+        t = np.asarray(t, dtype='float64')
+        speed = np.nan_to_num(np.asarray(speed, dtype='float64'), nan=0.0)
+        hr = np.asarray(hr, dtype='float64')
+        if len(t) == 0:
+            return self
+        n_prev = len(self._tail_t)
+        t_all = np.concatenate([self._tail_t, t])
+        v_all = np.concatenate([self._tail_v, speed])
+
+        # Intervalle depuis l'échantillon précédent (0 pour le tout premier, borné en cas de trou)
+        dt = np.clip(np.diff(t_all, prepend=t_all[0])[n_prev:], 0, MAX_GAP_S)
+        step = speed * dt
+        self.distance += step.sum()
+        self.band_distance += (step[None, :] * (speed[None, :] > self.speed_thresholds[:, None])).sum(axis=1)
+        self.peak_speed = max(self.peak_speed, float(speed.max()))
+
+        # Temps par zone cardiaque (sous la zone 1 ou FC manquante : non compté)
+        zone = np.searchsorted(self.hr_bounds, hr, side='right') - 1
+        valid = (zone >= 0) & ~np.isnan(hr)
+        self.hr_seconds += np.bincount(zone[valid], weights=dt[valid], minlength=len(HR_ZONE_BOUNDS))
+
+        # Efforts : |accélération| au-dessus de chaque seuil pendant MIN_EFFORT_SAMPLES échantillons.
+        # Longueur de la série en cours à chaque échantillon (cumsum remis à zéro à chaque sortie),
+        # la série ouverte au bloc précédent se prolongeant jusqu'à la première sortie du bloc.
+        accel = np.full(len(t_all), np.nan)
+        if len(t_all) > ACCEL_WINDOW:
+            with np.errstate(invalid='ignore', divide='ignore'):
+                accel[ACCEL_WINDOW:] = (v_all[ACCEL_WINDOW:] - v_all[:-ACCEL_WINDOW]) / (
+                    t_all[ACCEL_WINDOW:] - t_all[:-ACCEL_WINDOW])
+        magnitude = np.abs(accel[n_prev:])
+        above = magnitude[None, :] >= self.accel_thresholds[:, None]
+        counts = np.cumsum(above, axis=1)
+        resets = np.maximum.accumulate(np.where(above, 0, counts), axis=1)
+        run = counts - resets + np.where(resets == 0, self._run[:, None], 0) * np.cumprod(above, axis=1)
+        self.efforts += (run == MIN_EFFORT_SAMPLES).sum(axis=1)
+        self._run = run[:, -1]
+
+        self._tail_t = t_all[-ACCEL_WINDOW:]
+        self._tail_v = v_all[-ACCEL_WINDOW:]
+        if self.first_time is None:
+            self.first_time = float(t[0])
+        self.last_time = float(t[-1])
+        self.samples += len(t)
+        return self
+
+    def result(self):
+        seconds = np.rint(self.hr_seconds).astype('int64')
+        hms = format_hms(seconds // 3600, seconds // 60 % 60, seconds % 60)
+        duration = 0.0 if self.first_time is None else self.last_time - self.first_time
+        return {
+            'distance': self.distance,
+            **{f'distance_over_{kmh}': value for kmh, value in zip(SPEED_THRESHOLDS_KMH, self.band_distance)},
+            **{f"accel_decel_over_{str(th).replace('.', '_')}": int(count)
+               for th, count in zip(ACCEL_THRESHOLDS, self.efforts)},
+            'day_duration': int(round(duration / 60)),
+            'peak_speed': self.peak_speed * 3.6,
+            **dict(zip(HR_ZONE_HMS_COLUMNS, hms)),
+        }
+
+
+# Lecture par blocs (mémoire bornée par chunk_size lignes, quelle que soit la taille du fichier)
+def read_chunks(path, chunk_size=CHUNK_SIZE):
+    path = Path(path)
+    if path.suffix == '.parquet':
+        if not HAS_PYARROW:
+            raise RuntimeError(f"pyarrow est requis pour lire {path.name}")
+        import pyarrow.parquet as pq
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_size, columns=TRACKING_COLUMNS):
+            yield batch.to_pandas()
+    else:
+        yield from pd.read_csv(path, usecols=TRACKING_COLUMNS, dtype='float64', chunksize=chunk_size)
+
+
+def session_metadata(path):
+    match = SESSION_PATTERN.match(Path(path).stem)
+    if match is None:
+        raise ValueError(f"Nom de fichier inattendu (joueur_AAAA-MM-JJ) : {Path(path).name}")
+    return match['player_id'], pd.Timestamp(match['date'])
+
+
+# Une session : blocs lus et agrégés l'un après l'autre
+def ingest_session(path, hr_max=HR_MAX, chunk_size=CHUNK_SIZE):
+    player_id, date = session_metadata(path)
+    accumulator = SessionAccumulator(hr_max)
+    for chunk in read_chunks(path, chunk_size):
+        accumulator.update(chunk['time'].to_numpy(), chunk['speed'].to_numpy(), chunk['heart_rate'].to_numpy())
+    return {'player_id': player_id, 'date': date, 'samples': accumulator.samples, **accumulator.result()}
+
+
+# Sessions réparties sur un pool de processus ; résultat au format de gps_sessions
+def ingest(paths, workers=None, hr_max=HR_MAX, chunk_size=CHUNK_SIZE):
+    paths = sorted(Path(path) for path in paths)
+    job = partial(ingest_session, hr_max=hr_max, chunk_size=chunk_size)
+    if workers == 1 or len(paths) <= 1:
+        rows = [job(path) for path in paths]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            rows = list(pool.map(job, paths))
+
+    sessions = pd.DataFrame(rows)
+    if sessions.empty:
+        return sessions
+    sessions = sessions.sort_values(['date', 'player_id'], kind='stable').reset_index(drop=True)
+    sessions['player_id'] = sessions['player_id'].astype('category')
+    # Le suivi brut ne contient pas le contexte de la session : valeurs d'entraînement par défaut
+    sessions.insert(2, 'opposition_code', 'TRAINING')
+    sessions.insert(3, 'opposition_full', 'Training Session')
+    sessions.insert(4, 'md_plus_code', '')
+    sessions.insert(5, 'md_minus_code', '')
+    sessions.insert(6, 'season', season_labels(sessions['date']))
+    return sessions
+
+
+def tracking_files(directory):
+    directory = Path(directory)
+    return sorted(p for p in directory.iterdir() if p.suffix in ('.csv', '.parquet') and SESSION_PATTERN.match(p.stem))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Calcule les agrégats des sessions GPS à partir des fichiers de suivi bruts (10 Hz).")
+    parser.add_argument('raw', type=Path, help="Dossier des fichiers <joueur>_<AAAA-MM-JJ>.csv|.parquet")
+    parser.add_argument('--out', type=Path, default=Path('ingested'))
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    parser.add_argument('--hr-max', type=float, default=HR_MAX, help="Fréquence cardiaque maximale (bpm)")
+    parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE, help="Lignes lues par bloc")
+    args = parser.parse_args(argv)
+
+    # Sessions déjà agrégées dans --out : seules les nouvelles sont lues
+    args.out.mkdir(parents=True, exist_ok=True)
+    path = args.out / ('gps_sessions.parquet' if HAS_PYARROW else 'gps_sessions.csv')
+    rollup_path = args.out / 'gps_rollups.pkl'
+    existing = None
+    if path.exists():
+        existing = pd.read_parquet(path) if HAS_PYARROW else pd.read_csv(path, parse_dates=['date'])
+    known = set() if existing is None else set(zip(existing['player_id'].astype(str), existing['date']))
+    paths = [p for p in tracking_files(args.raw) if session_metadata(p) not in known]
+
+    start = time.perf_counter()
+    sessions = ingest(paths, args.workers, args.hr_max, args.chunk_size)
+    elapsed = time.perf_counter() - start
+    if sessions.empty:
+        print(f"Aucune nouvelle session dans {args.raw}")
+        return
+
+    # Tables d'agrégats jour/semaine/mois/saison : seules les périodes des nouvelles sessions sont fusionnées
+    if existing is not None and rollup_path.exists():
+        with open(rollup_path, 'rb') as f:
+            rollup = pickle.load(f)
+        rollup.add(add_hr_zone_seconds(sessions)[0])
+    else:
+        rollup = RollupTable(GPS_ROLLUP_COLUMNS)
+        for frame in [existing, sessions]:
+            if frame is not None:
+                rollup.add(add_hr_zone_seconds(frame)[0])
+
+    combined = pd.concat([existing, sessions], ignore_index=True) if existing is not None else sessions
+    combined['player_id'] = combined['player_id'].astype(str).astype('category')
+    if HAS_PYARROW:
+        combined.to_parquet(path, index=False)
+    else:
+        combined.to_csv(path, index=False)
+    with open(rollup_path, 'wb') as f:
+        pickle.dump(rollup, f, protocol=pickle.HIGHEST_PROTOCOL)
+    print(f"{len(sessions)} sessions ({int(sessions['samples'].sum())} échantillons) agrégées en {elapsed:.1f} s dans {path}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,193 @@
+import html
+import os
+import sqlite3
+import threading
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from cfc_data import CACHE_DIR
+
+PRIORITIES_DB = Path(os.environ.get("CFC_PRIORITIES_DB", Path(CACHE_DIR) / "priorities.sqlite3"))
+
+# Colonnes stockées -> colonnes affichées par l'onglet et l'API
+COLUMNS = {
+    'id': 'id',
+    'player_id': 'Player',
+    'priority': 'Priority',
+    'category': 'Category',
+    'area': 'Area',
+    'target': 'Target',
+    'performance_type': 'Performance Type',
+    'target_set': 'Target Set',
+    'review_date': 'Review Date',
+    'tracking': 'Tracking',
+    'progress': 'Progress',
+}
+FIELDS = [column for column in COLUMNS if column != 'id']
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS priorities (
+    id INTEGER PRIMARY KEY,
+    player_id TEXT NOT NULL,
+    priority INTEGER NOT NULL,
+    category TEXT NOT NULL,
+    area TEXT NOT NULL,
+    target TEXT NOT NULL,
+    performance_type TEXT NOT NULL,
+    target_set TEXT NOT NULL,
+    review_date TEXT NOT NULL,
+    tracking TEXT NOT NULL DEFAULT 'On Track',
+    progress INTEGER NOT NULL DEFAULT 0 CHECK (progress BETWEEN 0 AND 100)
+);
+CREATE INDEX IF NOT EXISTS priorities_player_category_review ON priorities (player_id, category, review_date);
+CREATE INDEX IF NOT EXISTS priorities_review ON priorities (review_date);
+CREATE TABLE IF NOT EXISTS revision (id INTEGER PRIMARY KEY CHECK (id = 1), value INTEGER NOT NULL);
+INSERT OR IGNORE INTO revision (id, value) VALUES (1, 0);
+"""
+
+
+def _iso_date(value):
+    if isinstance(value, str) and '/' in value:
+        return pd.to_datetime(value, format='%d/%m/%Y').date().isoformat()
+    return pd.Timestamp(value).date().isoformat()
+
+
+# Priorités individuelles dans une base SQLite locale, indexée par (joueur, catégorie, date de révision).
+# Une connexion partagée entre sessions, protégée par un verrou ; écritures groupées en une transaction.
+class PriorityStore:
+
+    def __init__(self, path=PRIORITIES_DB):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.executescript(SCHEMA)
+
+    # Ajout groupé : dictionnaires aux clés stockées (player_id, category...) ou affichées (Category...)
+    def add_many(self, records):
+        display = {label: column for column, label in COLUMNS.items()}
+        rows = []
+        for record in records:
+            record = {display.get(key, key): value for key, value in record.items()}
+            record['target_set'] = _iso_date(record.get('target_set', pd.Timestamp.today()))
+            record['review_date'] = _iso_date(record['review_date'])
+            record.setdefault('tracking', 'On Track')
+            record.setdefault('progress', 0)
+            rows.append(record)
+
+        with self._lock, self._conn:
+            next_priority = {}
+            for record in rows:
+                if record.get('priority') is None:
+                    player = record['player_id']
+                    if player not in next_priority:
+                        next_priority[player] = self._conn.execute(
+                            'SELECT COALESCE(MAX(priority), 0) + 1 FROM priorities WHERE player_id = ?', (player,)
+                        ).fetchone()[0]
+                    record['priority'] = next_priority[player]
+                    next_priority[player] += 1
+            self._conn.executemany(
+                f"INSERT INTO priorities ({', '.join(FIELDS)}) VALUES ({', '.join('?' * len(FIELDS))})",
+                [tuple(record[field] for field in FIELDS) for record in rows]
+            )
+            self._conn.execute('UPDATE revision SET value = value + 1 WHERE id = 1')
+        return len(rows)
+
+    def add(self, **record):
+        return self.add_many([record])
+
+    # Première utilisation : priorités d'exemple pour un joueur
+    def seed(self, records, player_id):
+        with self._lock:
+            empty = self._conn.execute('SELECT NOT EXISTS (SELECT 1 FROM priorities)').fetchone()[0]
+        if empty:
+            self.add_many([{**record, 'player_id': player_id} for record in records])
+
+    def query(self, player_id=None, categories=None, review_from=None, review_to=None):
+        clauses, params = [], []
+        if player_id is not None:
+            clauses.append('player_id = ?')
+            params.append(player_id)
+        if categories:
+            clauses.append(f"category IN ({', '.join('?' * len(categories))})")
+            params.extend(categories)
+        if review_from is not None:
+            clauses.append('review_date >= ?')
+            params.append(_iso_date(review_from))
+        if review_to is not None:
+            clauses.append('review_date <= ?')
+            params.append(_iso_date(review_to))
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ''
+
+        with self._lock:
+            cursor = self._conn.execute(
+                f"SELECT {', '.join(COLUMNS)} FROM priorities {where} ORDER BY player_id, priority", params
+            )
+            frame = pd.DataFrame(cursor.fetchall(), columns=list(COLUMNS.values()))
+        return with_display_columns(frame)
+
+    # Numéro incrémenté à chaque écriture (tous processus confondus) : sert de clé de cache aux lecteurs
+    def revision(self):
+        with self._lock:
+            return self._conn.execute('SELECT value FROM revision WHERE id = 1').fetchone()[0]
+
+    def categories(self):
+        with self._lock:
+            return [row[0] for row in self._conn.execute('SELECT DISTINCT category FROM priorities ORDER BY category')]
+
+    def close(self):
+        self._conn.close()
+
+
+# Statut et dates au format de l'onglet (jj/mm/aaaa), calculés sur toute la colonne
+def with_display_columns(frame):
+    frame = frame.copy()
+    progress = frame['Progress'].astype('int64')
+    frame['Status'] = np.select(
+        [(frame['Tracking'] == 'Achieved') | (progress >= 80), progress >= 50],
+        ['🟢', '🟡'],
+        '🔴'
+    )
+    for column in ('Target Set', 'Review Date'):
+        frame[column] = pd.to_datetime(frame[column]).dt.strftime('%d/%m/%Y')
+    return frame
+
+
+# Grille de cartes (4 blocs par priorité) générée en une passe sur le résultat de la requête
+def cards_html(priorities):
+    if priorities.empty:
+        return ''
+    text = {column: priorities[column].astype(str).map(html.escape)
+            for column in ['Category', 'Area', 'Target', 'Performance Type', 'Tracking', 'Target Set', 'Review Date']}
+    progress = priorities['Progress'].astype('int64')
+    progress_color = pd.Series(
+        np.select([progress == 100, progress > 50], ['#4CAF50', '#FF9800'], '#F44336'), index=priorities.index
+    )
+    progress = progress.astype(str)
+
+    cards = (
+        '<div style="background-color: #f8f9fa; padding: 15px; border-radius: 10px; text-align: center;">'
+        '<h2>' + priorities['Status'] + '</h2>'
+        '<p><strong>Priorité ' + priorities['Priority'].astype(str) + '</strong></p></div>'
+        '<div style="background-color: #034694; color: white; padding: 15px; border-radius: 10px;">'
+        '<h4>' + text['Category'] + ' - ' + text['Area'] + '</h4>'
+        '<p><strong>Objectif:</strong> ' + text['Target'] + '</p>'
+        '<p><strong>Type:</strong> ' + text['Performance Type'] + '</p></div>'
+        '<div style="background-color: #1f5f99; color: white; padding: 15px; border-radius: 10px;">'
+        '<p><strong>Statut:</strong> ' + text['Tracking'] + '</p>'
+        '<p><strong>Défini le:</strong> ' + text['Target Set'] + '</p>'
+        '<p><strong>Révision:</strong> ' + text['Review Date'] + '</p></div>'
+        '<div style="background-color: #f8f9fa; padding: 15px; border-radius: 10px; text-align: center;">'
+        '<p><strong>Progrès</strong></p>'
+        '<div style="background-color: #e0e0e0; border-radius: 10px; padding: 3px;">'
+        '<div style="background-color: ' + progress_color + '; width: ' + progress + '%; height: 20px; border-radius: 7px;"></div>'
+        '</div><p>' + progress + '%</p></div>'
+        '<hr style="grid-column: 1 / -1; margin: 0;">'
+    )
+    return (
+        '<div style="display: grid; grid-template-columns: 1fr 2fr 2fr 1fr; gap: 1rem; align-items: stretch;">'
+        + ''.join(cards) + '</div>'
+    )
@@ -0,0 +1,194 @@
+import contextvars
+import functools
+import json
+import logging
+import os
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+
+import pandas as pd
+
+from cfc_data import CACHE_DIR
+
+# Profilage désactivé par défaut ; CFC_PROFILE=1 l'active au démarrage (sinon via le panneau de la sidebar)
+PROFILE_DEFAULT = os.environ.get('CFC_PROFILE', '') not in ('', '0')
+PROFILE_LOG = Path(os.environ.get('CFC_PROFILE_LOG', str(Path(CACHE_DIR) / 'profile.jsonl')))
+
+_current = contextvars.ContextVar('cfc_profiler', default=None)
+_cache_counts = {}
+_cache_lock = threading.Lock()
+_tracing_users = 0
+logger = logging.getLogger('cfc.profile')
+
+
+# Mesures d'une exécution du script : temps, allocation nette et pic mémoire (tracemalloc) par section.
+# Les sections peuvent s'imbriquer ; le pic d'une section inclut celui de ses sous-sections.
+# tracemalloc est global au processus : avec plusieurs sessions profilées à la fois, la mémoire est approchée.
+class Profiler:
+
+    def __init__(self, app):
+        self.app = app
+        self.records = []
+        self._stack = []
+        self._started = time.perf_counter()
+        self.total_s = None
+
+    # start()/stop() pour un script Streamlit (pas de bloc with sur tout le module)
+    def start(self):
+        global _tracing_users
+        stale = _current.get()
+        if stale is not None:
+            # Exécution précédente interrompue (exception, st.stop, st.rerun) sans stop()
+            stale.stop()
+        with _cache_lock:
+            if _tracing_users == 0 and not tracemalloc.is_tracing():
+                tracemalloc.start()
+            _tracing_users += 1
+        _current.set(self)
+        self._started = time.perf_counter()
+        return self
+
+    def stop(self):
+        global _tracing_users
+        if _current.get() is self:
+            _current.set(None)
+        if self.total_s is not None:
+            return self
+        self.total_s = time.perf_counter() - self._started
+        with _cache_lock:
+            _tracing_users -= 1
+            if _tracing_users == 0:
+                tracemalloc.stop()
+        return self
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+        return False
+
+    @contextmanager
+    def section(self, name, kind):
+        peak_before = tracemalloc.get_traced_memory()[1]
+        if self._stack:
+            self._stack[-1]['peak'] = max(self._stack[-1]['peak'], peak_before)
+        tracemalloc.reset_peak()
+        entry = {'peak': 0}
+        self._stack.append(entry)
+        current = tracemalloc.get_traced_memory()[0]
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            now, peak = tracemalloc.get_traced_memory()
+            peak = max(peak, entry['peak'])
+            self._stack.pop()
+            if self._stack:
+                self._stack[-1]['peak'] = max(self._stack[-1]['peak'], peak)
+            self.records.append({
+                'name': name,
+                'kind': kind,
+                'depth': len(self._stack),
+                'ms': elapsed * 1000,
+                'alloc_mb': (now - current) / 2 ** 20,
+                'peak_mb': (peak - current) / 2 ** 20,
+            })
+
+    def frame(self):
+        return pd.DataFrame(self.records, columns=['name', 'kind', 'depth', 'ms', 'alloc_mb', 'peak_mb'])
+
+    def log(self, caches=None):
+        _ensure_handler()
+        logger.info(json.dumps({
+            'timestamp': datetime.now(timezone.utc).isoformat(timespec='milliseconds'),
+            'app': self.app,
+            'total_ms': self.total_s * 1000,
+            'sections': self.records,
+            'caches': caches or {},
+        }, default=float))
+
+
+# Section mesurée si un profileur est actif dans le contexte courant (sinon sans effet)
+@contextmanager
+def section(name, kind):
+    profiler = _current.get()
+    if profiler is None:
+        yield
+        return
+    with profiler.section(name, kind):
+        yield
+
+
+def profiled(kind, name=None):
+    def decorate(func):
+        label = name or func.__name__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with section(label, kind):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+# Enveloppe un décorateur de cache Streamlit (st.cache_data, st.cache_resource) pour compter appels
+# et recalculs : le corps de la fonction ne s'exécute qu'en cas d'absence dans le cache.
+def counted_cache(cache_decorator):
+    def decorate(func):
+        name = func.__qualname__
+
+        @functools.wraps(func)
+        def compute(*args, **kwargs):
+            _count(name, 'misses')
+            return func(*args, **kwargs)
+
+        cached = cache_decorator(compute)
+
+        @functools.wraps(func)
+        def call(*args, **kwargs):
+            _count(name, 'calls')
+            with section(name, 'load'):
+                return cached(*args, **kwargs)
+        call.clear = getattr(cached, 'clear', None)
+        return call
+    return decorate
+
+
+def _count(name, field):
+    with _cache_lock:
+        counts = _cache_counts.setdefault(name, {'calls': 0, 'misses': 0})
+        counts[field] += 1
+
+
+# Taux de succès des fonctions mises en cache (compteurs du processus, partagés entre sessions)
+def cache_stats():
+    with _cache_lock:
+        return {
+            name: {
+                **counts,
+                'hits': counts['calls'] - counts['misses'],
+                'hit_rate': 1 - counts['misses'] / counts['calls'] if counts['calls'] else 0.0,
+            }
+            for name, counts in _cache_counts.items()
+        }
+
+
+def _ensure_handler():
+    with _cache_lock:
+        if not logger.handlers:
+            _add_handler()
+
+
+def _add_handler():
+    PROFILE_LOG.parent.mkdir(parents=True, exist_ok=True)
+    handler = logging.FileHandler(PROFILE_LOG, encoding='utf-8')
+    handler.setFormatter(logging.Formatter('%(message)s'))
+    logger.addHandler(handler)
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
@@ -0,0 +1,206 @@
+import numpy as np
+import pandas as pd
+
+from cfc_data import RECOVERY_CATEGORIES, RECOVERY_INPUT_COLUMNS, RECOVERY_INPUTS
+
+BASELINE_DAYS = 28
+MIN_BASELINE_DAYS = 7
+# Composite exprimé en fraction de ±3 écarts-types de la référence personnelle, borné à [-1, 1]
+Z_SCALE = 3.0
+
+SCORE_COLUMNS = (
+    [f'{cat}_completeness' for cat in RECOVERY_CATEGORIES]
+    + [f'{cat}_composite' for cat in RECOVERY_CATEGORIES]
+    + ['emboss_baseline_score']
+)
+
+DIRECTIONS = np.array([RECOVERY_INPUTS[cat][name] for cat in RECOVERY_CATEGORIES for name in RECOVERY_INPUTS[cat]],
+                      dtype='float64')
+_CATEGORY_SLICES = []
+_offset = 0
+for _cat in RECOVERY_CATEGORIES:
+    _CATEGORY_SLICES.append(slice(_offset, _offset + len(RECOVERY_INPUTS[_cat])))
+    _offset += len(RECOVERY_INPUTS[_cat])
+
+DAY = pd.Timedelta(days=1)
+
+
+# Scores d'un jour à partir des mesures et de la référence (mêmes formules en calcul complet et
+# incrémental). Dernier axe : mesures ; référence NaN si moins de MIN_BASELINE_DAYS valeurs.
+def _scores(values, mean, std):
+    with np.errstate(invalid='ignore', divide='ignore'):
+        z = np.where(std > 1e-9, (values - mean) / std, np.nan) * DIRECTIONS
+        completeness, composites = [], []
+        for cols in _CATEGORY_SLICES:
+            completeness.append((~np.isnan(values[..., cols])).mean(axis=-1))
+            n = (~np.isnan(z[..., cols])).sum(axis=-1)
+            composites.append(np.clip(np.where(n > 0, np.nansum(z[..., cols], axis=-1) / n, np.nan) / Z_SCALE, -1, 1))
+        completeness = np.stack(completeness, axis=-1)
+        composites = np.stack(composites, axis=-1)
+
+        # Score global : composites pondérés par la complétude de leur catégorie
+        weights = np.where(np.isnan(composites), 0.0, completeness)
+        total = weights.sum(axis=-1)
+        emboss = np.where(total > 0, (weights * np.nan_to_num(composites)).sum(axis=-1) / total, np.nan)
+    return completeness, composites, emboss
+
+
+# Référence personnelle glissante : BASELINE_DAYS derniers jours de mesures (NaN si absentes).
+# Chaque nouveau jour met l'état à jour en coût constant.
+class PlayerBaseline:
+
+    def __init__(self, n_inputs):
+        self.ring = np.full((BASELINE_DAYS, n_inputs), np.nan)
+        self.pos = BASELINE_DAYS - 1
+        self.last_date = None
+
+    def baseline(self):
+        present = ~np.isnan(self.ring)
+        count = present.sum(axis=0)
+        values = np.where(present, self.ring, 0.0)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            mean = values.sum(axis=0) / count
+            variance = (np.where(present, self.ring - mean, 0.0) ** 2).sum(axis=0) / (count - 1)
+        enough = count >= MIN_BASELINE_DAYS
+        return np.where(enough, mean, np.nan), np.where(enough, np.sqrt(variance), np.nan)
+
+    def _push(self, values):
+        self.pos = (self.pos + 1) % BASELINE_DAYS
+        self.ring[self.pos] = values
+
+    # Mesures d'un jour : scores calculés contre la référence des jours précédents, puis ajout
+    def add(self, date, values):
+        if self.last_date is not None:
+            missing = (date - self.last_date) // DAY - 1
+            if missing >= BASELINE_DAYS:
+                self.ring[:] = np.nan
+            else:
+                for _ in range(missing):
+                    self._push(np.full(self.ring.shape[1], np.nan))
+        scores = _scores(values, *self.baseline())
+        self._push(values)
+        self.last_date = date
+        return scores
+
+
+# Moteur des scores de récupération. Les composites de chaque catégorie sont calculés à partir des
+# mesures brutes (RECOVERY_INPUTS) contre la référence glissante du joueur ; le calcul initial est
+# vectorisé sur tous les joueurs, chaque nouveau jour ne met à jour que la référence du joueur concerné.
+class RecoveryEngine:
+
+    def __init__(self, player_col='player_id', date_col='date'):
+        self.player_col = player_col
+        self.date_col = date_col
+        self.states = {}
+        self._history = self._empty_scores()
+        self._updates = {}
+        self._days = []
+        self._day_rows = []
+        self._scores = None
+
+    @classmethod
+    def from_days(cls, days, **kwargs):
+        engine = cls(**kwargs)
+        engine._days = [engine._day_frame(days)]
+        engine._history, engine.states = engine._bulk(engine._days[0])
+        return engine
+
+    def _day_frame(self, days):
+        frame = days.reindex(columns=[self.player_col, self.date_col] + RECOVERY_INPUT_COLUMNS)
+        frame[self.date_col] = pd.to_datetime(frame[self.date_col]).dt.normalize()
+        frame[RECOVERY_INPUT_COLUMNS] = frame[RECOVERY_INPUT_COLUMNS].astype('float64')
+        return frame
+
+    def _empty_scores(self):
+        return pd.DataFrame(columns=[self.player_col, self.date_col] + RECOVERY_INPUT_COLUMNS + SCORE_COLUMNS)
+
+    def _bulk(self, days):
+        if days.empty:
+            return self._empty_scores(), {}
+
+        player_codes, players = pd.factorize(days[self.player_col], sort=True)
+        first_day = days[self.date_col].min()
+        day_codes = ((days[self.date_col] - first_day) // DAY).to_numpy()
+        n_days = int(day_codes.max()) + 1
+        n_players, n_inputs = len(players), len(RECOVERY_INPUT_COLUMNS)
+
+        # Mesures jour × joueur × mesure (NaN sans mesure ; un doublon remplace la valeur précédente)
+        values = np.full((n_days, n_players, n_inputs), np.nan)
+        values[day_codes, player_codes] = days[RECOVERY_INPUT_COLUMNS].to_numpy(dtype='float64', na_value=np.nan)
+
+        # Référence des BASELINE_DAYS jours précédents : fenêtres glissantes de pandas sur toutes les
+        # colonnes (joueur × mesure) à la fois, décalées d'un jour pour exclure le jour évalué
+        flat = pd.DataFrame(values.reshape(n_days, n_players * n_inputs))
+        rolling = flat.rolling(BASELINE_DAYS, min_periods=MIN_BASELINE_DAYS)
+        mean = rolling.mean().shift(1).to_numpy().reshape(values.shape)
+        std = rolling.std().shift(1).to_numpy().reshape(values.shape)
+
+        completeness, composites, emboss = _scores(values[day_codes, player_codes],
+                                                   mean[day_codes, player_codes], std[day_codes, player_codes])
+        history = days.reset_index(drop=True)
+        scores = np.column_stack([completeness, composites, emboss])
+        history = pd.concat([history, pd.DataFrame(scores, columns=SCORE_COLUMNS)], axis=1)
+
+        states = {}
+        for p, player in enumerate(players):
+            state = PlayerBaseline(n_inputs)
+            window = values[max(n_days - BASELINE_DAYS, 0):, p]
+            state.ring[BASELINE_DAYS - len(window):] = window
+            state.last_date = first_day + (n_days - 1) * DAY
+            states[player] = state
+        return history, states
+
+    # Mesures d'un nouveau jour (dict ou Series : joueur, date et mesures disponibles) ; le matin
+    # même, seul l'état du joueur est mis à jour
+    def add_day(self, day):
+        player = day.get(self.player_col, 'P001')
+        date = pd.Timestamp(day[self.date_col]).normalize()
+        values = np.array([np.nan if day.get(col) is None else float(day[col]) for col in RECOVERY_INPUT_COLUMNS])
+        self._day_rows.append({self.player_col: player, self.date_col: date, **dict(zip(RECOVERY_INPUT_COLUMNS, values))})
+        self._scores = None
+
+        state = self.states.setdefault(player, PlayerBaseline(len(RECOVERY_INPUT_COLUMNS)))
+        if state.last_date is not None and date <= state.last_date:
+            # Jour déjà connu ou antérieur : on recalcule ce joueur uniquement
+            self._rebuild_player(player)
+            return self.latest(player)
+
+        completeness, composites, emboss = state.add(date, values)
+        self._updates[(player, date)] = self._score_row(player, date, values, completeness, composites, emboss)
+        return self._updates[(player, date)]
+
+    def _score_row(self, player, date, values, completeness, composites, emboss):
+        return {
+            self.player_col: player,
+            self.date_col: date,
+            **dict(zip(RECOVERY_INPUT_COLUMNS, values)),
+            **dict(zip(SCORE_COLUMNS, np.concatenate([completeness, composites, [emboss]]))),
+        }
+
+    def _rebuild_player(self, player):
+        days = pd.concat(self._days + [pd.DataFrame(self._day_rows)], ignore_index=True)
+        days = days[days[self.player_col] == player].drop_duplicates(self.date_col, keep='last')
+        history, states = self._bulk(days.sort_values(self.date_col, kind='stable'))
+        others = self._history[self._history[self.player_col] != player]
+        self._history = pd.concat([others, history], ignore_index=True)
+        self._updates = {key: row for key, row in self._updates.items() if key[0] != player}
+        self.states.update(states)
+
+    def latest(self, player):
+        return self.scores().loc[lambda df: df[self.player_col] == player].iloc[-1].to_dict()
+
+    # Dernier jour noté de chaque joueur (pour les métriques de synthèse)
+    def latest_frame(self):
+        return self.scores().drop_duplicates(self.player_col, keep='last').reset_index(drop=True)
+
+    # Mesures et scores quotidiens (une ligne par joueur et par jour mesuré), triés par date
+    def scores(self):
+        if self._scores is None:
+            frames = [f for f in [self._history, pd.DataFrame(list(self._updates.values()))] if not f.empty]
+            scores = pd.concat(frames, ignore_index=True) if frames else self._empty_scores()
+            self._scores = (
+                scores.drop_duplicates([self.player_col, self.date_col], keep='last')
+                .sort_values([self.date_col, self.player_col], kind='stable')
+                .reset_index(drop=True)
+            )
+        return self._scores
@@ -0,0 +1,213 @@
+import argparse
+import html
+import os
+import pickle
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import pandas as pd
+from plotly.offline import get_plotlyjs
+
+import cfc_store as store
+from cfc_analytics import Dashboard
+from cfc_data import HAS_PYARROW, add_hr_zone_seconds, atomic_write, season_labels
+from cfc_priorities import PriorityStore, cards_html
+
+# Tableau de bord de chaque processus de travail (chargé une seule fois par processus)
+_DASHBOARD = None
+
+
+# Table écrite par cfc_synthetic ou cfc_ingest : Parquet (si pyarrow est installé) ou CSV ; None si absente
+def find_table(data_dir, name):
+    for suffix in (['.parquet'] if HAS_PYARROW else []) + ['.csv']:
+        path = Path(data_dir) / f'{name}{suffix}'
+        if path.exists():
+            return path
+    return None
+
+
+def read_table(path):
+    if path.suffix == '.parquet':
+        return pd.read_parquet(path)
+    frame = pd.read_csv(path, parse_dates=['date'], dtype={'player_id': 'category'}, float_precision='round_trip')
+    # Le CSV relit les textes vides (ex. codes MD hors match) comme manquants
+    text = frame.select_dtypes(include=['object', 'string']).columns
+    return frame.fillna({column: '' for column in text})
+
+
+# Données du rapport : fichiers de cfc_synthetic si disponibles, sinon les données du tableau de bord
+# (cache disque cfc_store)
+def load_dashboard(data_dir=None):
+    gps_path = find_table(data_dir, 'gps_sessions') if data_dir is not None else None
+    if gps_path is None:
+        (gps_data, hr_zone_malformed), recovery_data = store.gps_sessions(), store.recovery_days()
+        return Dashboard(gps_data, recovery_data, store.capability_cube(), hr_zone_malformed,
+                         workload_engine=store.workload_engine(), trend_curves=store.trend_curves())
+
+    gps_data, hr_zone_malformed = add_hr_zone_seconds(read_table(gps_path))
+    recovery_data = read_table(find_table(data_dir, 'recovery_days'))
+    # Tables d'agrégats maintenues par cfc_ingest à côté des sessions
+    rollups = {}
+    rollup_path = Path(data_dir) / 'gps_rollups.pkl'
+    if rollup_path.exists():
+        with open(rollup_path, 'rb') as f:
+            rollups['gps'] = pickle.load(f)
+    return Dashboard.from_frames(gps_data, recovery_data, store.physical_capability(), hr_zone_malformed, rollups)
+
+
+def _init_worker(data_dir):
+    global _DASHBOARD
+    _DASHBOARD = load_dashboard(data_dir)
+    # Une connexion SQLite par processus de travail
+    _DASHBOARD.priority_store = PriorityStore()
+
+
+# Fenêtres "AAAA-MM-JJ:AAAA-MM-JJ" ou "28" (derniers jours des données)
+def parse_window(text, last_date):
+    if ':' in text:
+        start, end = text.split(':', 1)
+        return pd.Timestamp(start), pd.Timestamp(end)
+    return last_date - pd.Timedelta(days=int(text) - 1), last_date
+
+
+def window_label(window):
+    return f"{window[0]:%Y%m%d}-{window[1]:%Y%m%d}"
+
+
+def _fmt(value):
+    if isinstance(value, float):
+        return f"{value:.2f}"
+    return html.escape(str(value))
+
+
+# plotly.js de la version de plotly installée, une copie par dossier de rapports (lisibles hors ligne)
+def write_plotlyjs(directory):
+    def dump(tmp):
+        Path(tmp).write_text(get_plotlyjs(), encoding='utf-8')
+
+    atomic_write(Path(directory) / 'plotly.min.js', dump)
+
+
+# Sections : (métriques, figures) ou (métriques, figures, HTML affiché avant les figures).
+# La première figure charge le plotly.min.js du dossier du rapport, les suivantes le réutilisent.
+def render_html(title, sections):
+    parts = [
+        '<!DOCTYPE html><html><head><meta charset="utf-8">',
+        f'<title>{html.escape(title)}</title>',
+        '</head><body style="font-family: sans-serif; margin: 2rem;">',
+        f'<h1>{html.escape(title)}</h1>',
+    ]
+    include_plotlyjs = 'directory'
+    for name, (metrics, figures, *body) in sections.items():
+        parts.append(f'<h2>{html.escape(name)}</h2>')
+        if metrics:
+            rows = ''.join(f'<tr><th align="left">{html.escape(k)}</th><td>{_fmt(v)}</td></tr>' for k, v in metrics.items())
+            parts.append(f'<table>{rows}</table>')
+        parts.extend(body)
+        for fig in figures.values():
+            if fig is not None:
+                parts.append(fig.to_html(full_html=False, include_plotlyjs=include_plotlyjs))
+                include_plotlyjs = False
+    parts.append('</body></html>')
+    return '\n'.join(parts)
+
+
+def _seasons(window):
+    return list(pd.unique(season_labels(pd.date_range(window[0], window[1], freq='D'))))
+
+
+# Priorités du joueur : cartes et suivi des progrès, comme l'onglet du tableau de bord
+def _priorities_section(dashboard, player_id):
+    priorities = dashboard.priorities(player_id)
+    if priorities.empty:
+        return {'count': 0}, {}, '<p>Aucune priorité définie pour ce joueur.</p>'
+    metrics, figures = dashboard.priority_progress(priorities)
+    return metrics, figures, cards_html(priorities)
+
+
+# Rapport d'un joueur sur une fenêtre : vue d'ensemble, GPS, récupération et priorités
+def player_report(player_id, window, out_dir):
+    dashboard = _DASHBOARD.for_player(player_id)
+    sections = {
+        "Vue d'ensemble": dashboard.overview(),
+        'Données GPS': dashboard.gps(window, _seasons(window)),
+        'Statut de Récupération': dashboard.recovery(window),
+        'Zones Prioritaires': _priorities_section(dashboard, player_id),
+    }
+    path = Path(out_dir) / window_label(window) / f'{player_id}.html'
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(render_html(f"{player_id} — {window[0]:%d/%m/%Y} au {window[1]:%d/%m/%Y}", sections), encoding='utf-8')
+
+    summary = {'player_id': player_id, 'start': window[0], 'end': window[1], 'report': str(path)}
+    prefixes = {
+        "Vue d'ensemble": 'overview', 'Données GPS': 'gps', 'Statut de Récupération': 'recovery',
+        'Zones Prioritaires': 'priorities',
+    }
+    for section, (metrics, *_) in sections.items():
+        prefix = prefixes[section]
+        summary.update({f'{prefix}_{k}': v for k, v in metrics.items()})
+    return summary
+
+
+# Capacités physiques (communes à l'effectif) : une figure de tendance par qualité
+def squad_report(window, out_dir):
+    dashboard = _DASHBOARD
+    metrics, figures = dashboard.physical(window)
+    figures.pop('quality_trend')
+    for quality in dashboard.cube.levels('quality'):
+        figures[f'trend_{quality}'] = dashboard.quality_trend(quality, *window)
+    path = Path(out_dir) / window_label(window) / 'squad_physical.html'
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(render_html(f"Capacité Physique — {window[0]:%d/%m/%Y} au {window[1]:%d/%m/%Y}",
+                                {'Capacité Physique': (metrics, figures)}), encoding='utf-8')
+    return str(path)
+
+
+def _run_job(job):
+    kind, args = job
+    return kind, (player_report if kind == 'player' else squad_report)(*args)
+
+
+def write_summary(summary, out_dir):
+    if HAS_PYARROW:
+        path = Path(out_dir) / 'summary.parquet'
+        summary.to_parquet(path, index=False)
+    else:
+        path = Path(out_dir) / 'summary.csv'
+        summary.to_csv(path, index=False)
+    return path
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Génère les rapports HTML/Parquet du tableau de bord sans serveur Streamlit.")
+    parser.add_argument('--data', type=Path, default=Path('synthetic_data'),
+                        help="Dossier gps_sessions / recovery_days (.parquet ou .csv ; sinon données simulées)")
+    parser.add_argument('--players', nargs='*', help="Joueurs à inclure (tous par défaut)")
+    parser.add_argument('--window', action='append',
+                        help="Fenêtre AAAA-MM-JJ:AAAA-MM-JJ ou nombre de derniers jours (répétable ; défaut : 7 et 28)")
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    parser.add_argument('--out', type=Path, default=Path('reports'))
+    args = parser.parse_args(argv)
+
+    dashboard = load_dashboard(args.data)
+    last_date = dashboard.gps_data['date'].max().normalize()
+    windows = [parse_window(text, last_date) for text in (args.window or ['7', '28'])]
+    players = args.players or dashboard.players()
+
+    for window in windows:
+        write_plotlyjs(args.out / window_label(window))
+    jobs = [('squad', (window, args.out)) for window in windows]
+    jobs += [('player', (player, window, args.out)) for window in windows for player in players]
+
+    summaries = []
+    with ProcessPoolExecutor(max_workers=args.workers, initializer=_init_worker, initargs=(args.data,)) as pool:
+        for kind, result in pool.map(_run_job, jobs):
+            if kind == 'player':
+                summaries.append(result)
+
+    summary_path = write_summary(pd.DataFrame(summaries), args.out)
+    print(f"{len(jobs)} rapports écrits dans {args.out} ; synthèse : {summary_path}")
+
+
+if __name__ == '__main__':
+    main()
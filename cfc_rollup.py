@@ -0,0 +1,136 @@
+import numpy as np
+import pandas as pd
+
+from cfc_data import HR_ZONE_SECONDS_COLUMNS, RECOVERY_CATEGORIES, season_labels
+from cfc_workload import LOAD_COLUMNS
+
+GRAINS = ['day', 'week', 'month', 'season']
+# Durée moyenne (jours) d'une période de chaque grain, pour estimer le nombre de points d'une plage
+GRAIN_DAYS = {'day': 1, 'week': 7, 'month': 30.44, 'season': 365.25}
+# Stockées : somme, effectif, min, max ; la moyenne en est déduite à la lecture
+STATS = ['mean', 'sum', 'count', 'min', 'max']
+# Une période au moins tous les 10 px de graphique
+PX_PER_PERIOD = 10
+
+# Colonnes des tables d'agrégats utilisées par les graphiques du tableau de bord
+GPS_ROLLUP_COLUMNS = LOAD_COLUMNS + ['peak_speed', 'day_duration'] + HR_ZONE_SECONDS_COLUMNS
+RECOVERY_ROLLUP_COLUMNS = (
+    [f'{cat}_composite' for cat in RECOVERY_CATEGORIES]
+    + [f'{cat}_completeness' for cat in RECOVERY_CATEGORIES]
+    + ['emboss_baseline_score']
+)
+
+
+# Début de période (lundi, 1er du mois, 1er juillet de la saison) de chaque date, vectorisé
+def period_start(dates, grain):
+    dates = pd.DatetimeIndex(dates).normalize()
+    if grain == 'day':
+        return dates
+    if grain == 'week':
+        return dates - pd.to_timedelta(dates.dayofweek, unit='D')
+    months = dates.values.astype('datetime64[M]')
+    if grain == 'season':
+        index = months.astype('int64')
+        months = (index - (index % 12 - 6) % 12).astype('datetime64[M]')
+    elif grain != 'month':
+        raise ValueError(f"Grain inconnu : {grain}")
+    return pd.DatetimeIndex(months.astype(dates.dtype))
+
+
+def max_periods(width):
+    return max(int(width // PX_PER_PERIOD), 1)
+
+
+# Grain le plus fin dont le nombre de périodes sur la plage tient dans la largeur du graphique
+def grain_for(start, end, width):
+    days = (pd.Timestamp(end) - pd.Timestamp(start)).days + 1
+    for grain in GRAINS:
+        if days / GRAIN_DAYS[grain] <= max_periods(width):
+            return grain
+    return GRAINS[-1]
+
+
+# Tables d'agrégats matérialisées (jour, semaine, mois, saison) d'une ou plusieurs colonnes,
+# éventuellement par clés (ex. mouvement). add() ne fusionne que les périodes touchées par les
+# nouvelles lignes : les tables se maintiennent à l'ingestion sans relire l'historique.
+class RollupTable:
+
+    def __init__(self, columns, keys=(), date_col='date'):
+        self.columns = list(columns)
+        self.keys = list(keys)
+        self.date_col = date_col
+        self.tables = {grain: None for grain in GRAINS}
+
+    @classmethod
+    def from_frame(cls, frame, columns, keys=(), date_col='date'):
+        return cls(columns, keys, date_col).add(frame)
+
+    def _aggregate(self, frame, grain):
+        periods = pd.Index(period_start(frame[self.date_col], grain), name='period')
+        values = frame[self.columns].astype('float64')
+        grouped = values.groupby([frame[key].to_numpy() for key in self.keys] + [periods], sort=True)
+        parts = pd.concat({
+            'sum': grouped.sum(),
+            'count': grouped.count(),
+            'min': grouped.min(),
+            'max': grouped.max(),
+        }, axis=1)
+        parts.index.names = self.keys + ['period']
+        return parts
+
+    def add(self, frame):
+        if frame.empty:
+            return self
+        for grain in GRAINS:
+            self.tables[grain] = _merge(self.tables[grain], self._aggregate(frame, grain))
+        return self
+
+    # Une ligne par (clés, période) entre start et end ; colonnes "<colonne>" (statistique demandée)
+    # ou "<colonne>_<stat>" pour plusieurs statistiques
+    def query(self, grain, start=None, end=None, stats=('mean',), seasons=None, **selection):
+        table = self.tables[grain]
+        if table is None:
+            return pd.DataFrame(columns=self.keys + [self.date_col] + self.columns)
+
+        periods = table.index.get_level_values('period')
+        mask = np.ones(len(table), dtype=bool)
+        if start is not None:
+            mask &= periods >= period_start([start], grain)[0]
+        if end is not None:
+            mask &= periods <= pd.Timestamp(end)
+        if seasons is not None:
+            mask &= pd.Index(season_labels(periods)).isin(seasons)
+        for key, value in selection.items():
+            if value is not None:
+                values = [value] if isinstance(value, str) else value
+                mask &= table.index.get_level_values(key).isin(values)
+        table = table[mask]
+
+        out = {}
+        for stat in stats:
+            values = table['sum'] / table['count'].replace(0, np.nan) if stat == 'mean' else table[stat]
+            for column in self.columns:
+                out[column if len(stats) == 1 else f'{column}_{stat}'] = values[column].to_numpy()
+        result = pd.DataFrame(out, index=table.index).reset_index().rename(columns={'period': self.date_col})
+        return result
+
+    def nrows(self):
+        return {grain: 0 if table is None else len(table) for grain, table in self.tables.items()}
+
+
+# Fusion de deux tables d'agrégats : sommes et effectifs additionnés, min/max combinés (NaN ignorés)
+def _merge(old, new):
+    if old is None or old.empty:
+        return new
+    overlap = new.index.intersection(old.index)
+    if len(overlap):
+        before, after = old.loc[overlap], new.loc[overlap]
+        old = old.copy()
+        old.loc[overlap, 'sum'] = (before['sum'] + after['sum']).to_numpy()
+        old.loc[overlap, 'count'] = (before['count'] + after['count']).to_numpy()
+        old.loc[overlap, 'min'] = np.fmin(before['min'].to_numpy(), after['min'].to_numpy())
+        old.loc[overlap, 'max'] = np.fmax(before['max'].to_numpy(), after['max'].to_numpy())
+    fresh = new.drop(overlap)
+    if fresh.empty:
+        return old
+    return pd.concat([old, fresh]).sort_index()
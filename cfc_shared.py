@@ -0,0 +1,45 @@
+import threading
+
+import numpy as np
+import pandas as pd
+
+_registry = {}
+_lock = threading.Lock()
+
+
+# Jeu de données chargé une fois par processus et partagé en lecture seule entre les sessions.
+# view() renvoie un DataFrame sans copie des colonnes. Avec Copy-on-Write (par défaut depuis pandas 3,
+# activé par l'application sur pandas 2), une session peut l'enrichir ou le filtrer sans jamais
+# modifier les données des autres sessions.
+class SharedFrame:
+
+    def __init__(self, name, frame):
+        self.name = name
+        self._frame = frame
+        self.nbytes = int(frame.memory_usage(deep=True).sum())
+        with _lock:
+            _registry[name] = self
+
+    def __len__(self):
+        return len(self._frame)
+
+    def view(self):
+        return self._frame.copy(deep=False)
+
+
+# Tableaux NumPy partagés (cube, matrices) verrouillés en écriture
+def read_only(*arrays):
+    for array in arrays:
+        if isinstance(array, np.ndarray):
+            array.flags.writeable = False
+    return arrays
+
+
+# Mémoire des jeux partagés du processus (une seule copie quel que soit le nombre de sessions)
+def shared_memory():
+    with _lock:
+        frames = list(_registry.values())
+    return pd.DataFrame(
+        [{'dataset': shared.name, 'rows': len(shared), 'mb': shared.nbytes / 2 ** 20} for shared in frames],
+        columns=['dataset', 'rows', 'mb']
+    )
@@ -0,0 +1,116 @@
+import numpy as np
+import pandas as pd
+
+from cfc_data import CAPABILITY_KEYS
+
+# Mêmes paramètres par défaut que statsmodels (et donc que trendline='lowess' de plotly)
+LOWESS_FRAC = 2 / 3
+LOWESS_ITERATIONS = 3
+MAX_FIT_POINTS = 200
+CHUNK_SIZE = 256
+
+
+def _tricube(u):
+    u = np.clip(np.abs(u), 0, 1)
+    return (1 - u ** 3) ** 3
+
+
+def _bisquare(u):
+    u = np.clip(np.abs(u), 0, 1)
+    return (1 - u ** 2) ** 2
+
+
+# Distance au k-ième plus proche voisin de chaque point `xi`, sur `x` trié : les k voisins forment
+# une fenêtre contiguë x[lo:lo + k], dont le début se trouve par recherche dichotomique
+def _neighbour_radius(x, xi, k):
+    lo = np.clip(np.searchsorted(x[k - 1:] + x[:len(x) - k + 1], 2 * xi), 0, len(x) - k)
+    before = np.maximum(lo - 1, 0)
+    return np.minimum(
+        np.maximum(xi - x[lo], x[lo + k - 1] - xi),
+        np.maximum(xi - x[before], x[before + k - 1] - xi)
+    )
+
+
+# Une passe de régression linéaire locale pondérée aux points `points`, vectorisée par blocs.
+# Moins de deux voisins de poids non nul : la valeur `fallback` du point (y, comme statsmodels).
+def _local_fit(x, y, k, robustness, points, fallback, chunk):
+    fitted = np.empty(len(points))
+    for lo in range(0, len(points), chunk):
+        xi = points[lo:lo + chunk, None]
+        radius = _neighbour_radius(x, xi[:, 0], k)[:, None]
+        radius = np.where(radius > 0, radius, 1.0)
+        w = _tricube((x[None, :] - xi) / radius) * robustness[None, :]
+
+        sw = w.sum(axis=1)
+        sx = w @ x
+        sy = w @ y
+        sxx = w @ (x ** 2)
+        sxy = w @ (x * y)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            mean_x, mean_y = sx / sw, sy / sw
+            var = sxx / sw - mean_x ** 2
+            slope = np.where(var > 1e-12 * np.maximum(mean_x ** 2, 1), (sxy / sw - mean_x * mean_y) / var, 0.0)
+        fit = mean_y + slope * (xi[:, 0] - mean_x)
+        fitted[lo:lo + chunk] = np.where((w > 1e-12).sum(axis=1) >= 2, fit, fallback[lo:lo + chunk])
+    return fitted
+
+
+# LOWESS (Cleveland 1979) en NumPy, retourne la courbe aux abscisses de `x`. Au-delà de `max_points`
+# points, la régression locale n'est évaluée qu'en `max_points` points d'appui répartis sur la série
+# et interpolée linéairement entre eux (même principe que le paramètre delta de statsmodels).
+def lowess(x, y, frac=LOWESS_FRAC, iterations=LOWESS_ITERATIONS, max_points=MAX_FIT_POINTS, chunk=CHUNK_SIZE):
+    x = np.asarray(x, dtype='float64')
+    y = np.asarray(y, dtype='float64')
+    n = len(x)
+    if n < 3:
+        return y.copy()
+
+    order = np.argsort(x, kind='stable')
+    x, y = x[order], y[order]
+    # Nombre de voisins tronqué comme statsmodels (int(frac * n), et non arrondi au supérieur)
+    k = min(max(int(frac * n + 1e-10), 2), n)
+    anchors = x if n <= max_points else np.unique(x[np.linspace(0, n - 1, max_points).round().astype(int)])
+    fallback = y if anchors is x else np.interp(anchors, x, y)
+
+    def fit(robustness):
+        fitted = _local_fit(x, y, k, robustness, anchors, fallback, chunk)
+        return fitted if anchors is x else np.interp(x, anchors, fitted)
+
+    fitted = fit(np.ones(n))
+    for _ in range(iterations):
+        residuals = np.abs(y - fitted)
+        scale = np.median(residuals)
+        # Résidu médian nul : seuls les points exactement ajustés gardent leur poids (comme statsmodels)
+        fitted = fit(_bisquare(residuals / (6 * scale)) if scale > 0 else (residuals == 0).astype('float64'))
+
+    result = np.empty(n)
+    result[order] = fitted
+    return result
+
+
+# Courbes de tendance de toutes les séries (expression, movement, quality), calculées une fois.
+# Changer de qualité affichée ne fait qu'une sélection dans la table.
+class TrendCurves:
+
+    def __init__(self, curves):
+        self.curves = curves
+
+    @classmethod
+    def from_frame(cls, tests, frac=LOWESS_FRAC, iterations=LOWESS_ITERATIONS):
+        tests = tests.dropna(subset=['benchmarkPct']).sort_values(CAPABILITY_KEYS + ['testDate'], kind='stable')
+        frames = []
+        for key, series in tests.groupby(CAPABILITY_KEYS, observed=True, sort=True):
+            days = (series['testDate'] - series['testDate'].iloc[0]) / pd.Timedelta(days=1)
+            trend = lowess(days.to_numpy(), series['benchmarkPct'].to_numpy(), frac, iterations)
+            frames.append(series[['testDate'] + CAPABILITY_KEYS].assign(trend=trend.astype('float32')))
+        curves = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(
+            columns=['testDate'] + CAPABILITY_KEYS + ['trend'])
+        return cls(curves)
+
+    def for_quality(self, quality, start=None, end=None):
+        curves = self.curves[self.curves['quality'] == quality]
+        if start is not None:
+            curves = curves[curves['testDate'] >= pd.Timestamp(start)]
+        if end is not None:
+            curves = curves[curves['testDate'] <= pd.Timestamp(end)]
+        return curves
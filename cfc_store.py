@@ -0,0 +1,264 @@
+import argparse
+import hashlib
+import os
+import pickle
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pandas as pd
+
+import cfc_benchmark
+import cfc_cube
+import cfc_data
+import cfc_recovery
+import cfc_smoothing
+import cfc_synthetic
+import cfc_workload
+from cfc_benchmark import BenchmarkEngine
+from cfc_cube import CapabilityCube
+from cfc_data import (
+    CACHE_DIR, HAS_PYARROW, PHYSICAL_CAPABILITY_CSV, add_hr_zone_seconds, atomic_write, parse_physical_capability_csv,
+    source_fingerprint
+)
+from cfc_recovery import RecoveryEngine
+from cfc_smoothing import TrendCurves
+from cfc_synthetic import generate_gps_sessions, generate_recovery_inputs, generate_squad_tests
+from cfc_workload import WorkloadEngine
+
+STORE_DIR = Path(os.environ.get("CFC_STORE_DIR", Path(CACHE_DIR) / "store"))
+
+# Paramètres des données simulées du tableau de bord
+GPS_PARAMS = {'sessions_per_week': 3.5, 'end_date': '2025-03-15'}
+RECOVERY_PARAMS = {'end_date': '2025-03-15'}
+
+# Tables (DataFrame) en Parquet si pyarrow est installé, autres objets en pickle
+SUFFIXES = ['.parquet', '.pkl']
+
+_hash_memo = {}
+_hash_lock = threading.Lock()
+
+
+# Empreinte SHA-256 du contenu d'un fichier, recalculée seulement si sa taille ou sa date changent
+def content_hash(path):
+    path = Path(path)
+    memo_key = (str(path), source_fingerprint(path))
+    with _hash_lock:
+        if memo_key in _hash_memo:
+            return _hash_memo[memo_key]
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    with _hash_lock:
+        _hash_memo[memo_key] = digest.hexdigest()
+    return _hash_memo[memo_key]
+
+
+# Empreinte du code qui produit une donnée : modifier le module invalide les entrées
+def code_hash(*modules):
+    return [content_hash(module.__file__) for module in modules]
+
+
+# Cache disque partagé entre processus et redémarrages. Une entrée est nommée d'après la donnée et
+# la clé de contenu (fichiers sources, paramètres, code) ; une nouvelle entrée remplace les anciennes
+# versions de la même donnée. Les tables sont écrites en Parquet, lisible hors de Python et stable
+# d'une version de pandas à l'autre ; seuls les pickles dépendent des versions de pandas et de Python.
+class DiskCache:
+
+    def __init__(self, root=STORE_DIR):
+        self.root = Path(root)
+        self.hits = 0
+        self.misses = 0
+
+    def key(self, parts, suffix='.pkl'):
+        if suffix == '.pkl':
+            parts = [parts, pd.__version__, sys.version_info[:2]]
+        return hashlib.sha256(repr(parts).encode('utf-8')).hexdigest()[:24]
+
+    def path(self, name, parts, suffix='.pkl'):
+        return self.root / f"{name}-{self.key(parts, suffix)}{suffix}"
+
+    def get_or_compute(self, name, parts, compute):
+        for suffix in SUFFIXES if HAS_PYARROW else ['.pkl']:
+            path = self.path(name, parts, suffix)
+            if path.exists():
+                try:
+                    value = self._read(path)
+                except Exception:
+                    # Entrée illisible (version de bibliothèque, écriture interrompue) : recalcul
+                    path.unlink(missing_ok=True)
+                    continue
+                self.hits += 1
+                if suffix == '.pkl' and HAS_PYARROW and isinstance(value, pd.DataFrame):
+                    # Table mise en cache sans pyarrow : réécrite en Parquet
+                    self._store(name, parts, value)
+                return value
+
+        self.misses += 1
+        value = compute()
+        self._store(name, parts, value)
+        return value
+
+    def _store(self, name, parts, value):
+        suffix = '.parquet' if HAS_PYARROW and isinstance(value, pd.DataFrame) else '.pkl'
+        try:
+            self._write(self.path(name, parts, suffix), value)
+        except OSError:
+            # Répertoire en lecture seule : on sert quand même la donnée
+            pass
+
+    def _read(self, path):
+        if path.suffix == '.parquet':
+            return pd.read_parquet(path)
+        with open(path, 'rb') as f:
+            return pickle.load(f)
+
+    def _write(self, path, value):
+        # Une nouvelle entrée remplace les anciennes versions de la même donnée, quel que soit leur format
+        prefix = path.name.rsplit('-', 1)[0]
+
+        def dump(tmp):
+            if path.suffix == '.parquet':
+                value.to_parquet(tmp)
+                return
+            with open(tmp, 'wb') as f:
+                pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+        atomic_write(path, dump, stale=[f"{prefix}-*{suffix}" for suffix in SUFFIXES])
+
+    def entries(self):
+        if not self.root.exists():
+            return []
+        return sorted(path for suffix in SUFFIXES for path in self.root.glob(f'*{suffix}'))
+
+    def clear(self):
+        for path in self.entries():
+            path.unlink(missing_ok=True)
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'entries': len(self.entries()),
+            'nbytes': sum(path.stat().st_size for path in self.entries()),
+        }
+
+
+DEFAULT_STORE = DiskCache()
+
+
+# Données du tableau de bord, servies depuis le cache disque
+
+def gps_sessions(store=None):
+    return (store or DEFAULT_STORE).get_or_compute(
+        'gps_sessions', [GPS_PARAMS, code_hash(cfc_synthetic, cfc_data)],
+        lambda: add_hr_zone_seconds(generate_gps_sessions(**GPS_PARAMS))
+    )
+
+
+# Moteur de récupération (références glissantes par joueur) ; recovery_days en est la table des scores
+def recovery_engine(store=None):
+    return (store or DEFAULT_STORE).get_or_compute(
+        'recovery_engine', [RECOVERY_PARAMS, code_hash(cfc_synthetic, cfc_data, cfc_recovery)],
+        lambda: RecoveryEngine.from_days(generate_recovery_inputs(**RECOVERY_PARAMS))
+    )
+
+
+def recovery_days(store=None):
+    return recovery_engine(store).scores()
+
+
+# Seul cache du CSV de capacité physique (Parquet typé) : relu tant que le contenu du CSV ne change pas
+def physical_capability(path=PHYSICAL_CAPABILITY_CSV, store=None):
+    return (store or DEFAULT_STORE).get_or_compute(
+        'physical_capability', [content_hash(path), code_hash(cfc_data)],
+        lambda: parse_physical_capability_csv(path)
+    )
+
+
+def capability_cube(path=PHYSICAL_CAPABILITY_CSV, store=None):
+    return (store or DEFAULT_STORE).get_or_compute(
+        'capability_cube', [content_hash(path), code_hash(cfc_data, cfc_cube)],
+        lambda: CapabilityCube.from_frame(physical_capability(path, store))
+    )
+
+
+def trend_curves(path=PHYSICAL_CAPABILITY_CSV, store=None):
+    return (store or DEFAULT_STORE).get_or_compute(
+        'trend_curves', [content_hash(path), code_hash(cfc_data, cfc_smoothing)],
+        lambda: TrendCurves.from_frame(physical_capability(path, store))
+    )
+
+
+# Résultats bruts des tests de l'effectif et distributions triées servant au calcul des percentiles
+def squad_tests(path=PHYSICAL_CAPABILITY_CSV, store=None):
+    return (store or DEFAULT_STORE).get_or_compute(
+        'squad_tests', [content_hash(path), code_hash(cfc_synthetic, cfc_data)],
+        lambda: generate_squad_tests(physical_capability(path, store))
+    )
+
+
+def benchmark_engine(path=PHYSICAL_CAPABILITY_CSV, store=None):
+    return (store or DEFAULT_STORE).get_or_compute(
+        'benchmark_engine', [content_hash(path), code_hash(cfc_synthetic, cfc_data, cfc_benchmark)],
+        lambda: BenchmarkEngine.from_tests(squad_tests(path, store))
+    )
+
+
+def workload_engine(store=None):
+    return (store or DEFAULT_STORE).get_or_compute(
+        'workload_engine', [GPS_PARAMS, code_hash(cfc_synthetic, cfc_data, cfc_workload)],
+        lambda: WorkloadEngine.from_sessions(gps_sessions(store)[0])
+    )
+
+
+DATASETS = {
+    'gps_sessions': gps_sessions,
+    'recovery_engine': recovery_engine,
+    'physical_capability': physical_capability,
+    'capability_cube': capability_cube,
+    'trend_curves': trend_curves,
+    'workload_engine': workload_engine,
+    'squad_tests': squad_tests,
+    'benchmark_engine': benchmark_engine,
+}
+
+
+# Pré-chauffage au déploiement : calcule (ou relit) chaque donnée et affiche le temps de chargement
+def warm(store=None):
+    store = store or DEFAULT_STORE
+    timings = {}
+    for name, load in DATASETS.items():
+        start = time.perf_counter()
+        load(store=store)
+        timings[name] = time.perf_counter() - start
+    return timings
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Cache disque des données du tableau de bord.")
+    parser.add_argument('command', choices=['warm', 'clear', 'stats'])
+    parser.add_argument('--dir', type=Path, default=STORE_DIR)
+    args = parser.parse_args(argv)
+
+    store = DiskCache(args.dir)
+    if args.command == 'warm':
+        for name, seconds in warm(store).items():
+            print(f"{name:<22} {seconds * 1000:8.1f} ms")
+        print(f"{store.misses} entrées calculées, {store.hits} déjà présentes dans {store.root}")
+    elif args.command == 'clear':
+        count = len(store.entries())
+        store.clear()
+        print(f"{count} entrées supprimées de {store.root}")
+    else:
+        for path in store.entries():
+            print(f"{path.name:<50} {path.stat().st_size / 2 ** 20:8.2f} Mo")
+        print(f"{len(store.entries())} entrées dans {store.root}")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,11 +1,21 @@
 import streamlit as st
 import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
-import numpy as np
-from datetime import datetime, timedelta
-import io
+
+import cfc_store as store
+from cfc_analytics import DEFAULT_RECOVERY_CATEGORIES, PRIORITIES, Dashboard, format_category, recovery_status
+from cfc_correlation import CorrelationService
+from cfc_data import PHYSICAL_CAPABILITY_CSV, RECOVERY_CATEGORIES, source_fingerprint
+from cfc_export import EXPORT_FORMATS, PAGE_SIZES, TableView, n_pages, export_bytes
+from cfc_filters import FilterService, LRUViewCache
+from cfc_priorities import PriorityStore, cards_html
+from cfc_profiling import PROFILE_DEFAULT, Profiler, cache_stats, counted_cache, section
+from cfc_shared import SharedFrame, shared_memory
+from cfc_workload import LOAD_COLUMNS
+
+# Copy-on-Write (par défaut depuis pandas 3), activé pour tout le processus de l'application : les vues
+# sans copie des jeux partagés (cfc_shared) ne copient une colonne qu'au moment où une session l'écrit
+if int(pd.__version__.split('.')[0]) < 3:
+    pd.set_option('mode.copy_on_write', True)
 
 # Configuration de la page
 st.set_page_config(
@@ -55,109 +65,106 @@ st.markdown("""
 </div>
 """, unsafe_allow_html=True)
 
+# Mode profilage (optionnel) : temps et mémoire par section, taux de succès des caches
+profiler = Profiler('cfc_streamlit_app').start() if st.session_state.get('profiling', PROFILE_DEFAULT) else None
+cache_resource = counted_cache(st.cache_resource)
+
+# Données chargées depuis le cache disque (cfc_store, pré-rempli par `python cfc_store.py warm`) :
+# un redémarrage ne recalcule rien tant que les sources et le code n'ont pas changé.
+# Une seule copie par processus (cache_resource, sans copie par appel comme cache_data) ;
+# chaque session et chaque service en reçoivent une vue sans copie (cfc_shared).
+
 # Fonction pour générer des données GPS simulées
-@st.cache_data
+@cache_resource
 def generate_gps_data():
-    np.random.seed(42)
-    dates = pd.date_range(start='2023-07-01', end='2025-03-15', freq='D')
-    
-    # Filtrer pour avoir environ 3-4 sessions par semaine
-    training_dates = []
-    for date in dates:
-        if np.random.random() < 0.5:  # 50% de chance d'avoir une session
-            training_dates.append(date)
-    
-    n_sessions = len(training_dates)
-    
-    data = {
-        'date': training_dates,
-        'opposition_code': [f'OPP{np.random.randint(1, 20):02d}' if np.random.random() < 0.3 else 'TRAINING' for _ in range(n_sessions)],
-        'opposition_full': ['Arsenal', 'Liverpool', 'Manchester City', 'Tottenham', 'Training Session'][np.random.choice(5, n_sessions)],
-        'md_plus_code': [f'MD+{np.random.randint(1, 4)}' if np.random.random() < 0.3 else '' for _ in range(n_sessions)],
-        'md_minus_code': [f'MD-{np.random.randint(1, 4)}' if np.random.random() < 0.3 else '' for _ in range(n_sessions)],
-        'season': ['2023-24' if date < pd.Timestamp('2024-07-01') else '2024-25' for date in training_dates],
-        'distance': np.random.normal(8500, 1500, n_sessions),
-        'distance_over_21': np.random.normal(1200, 300, n_sessions),
-        'distance_over_24': np.random.normal(800, 200, n_sessions),
-        'distance_over_27': np.random.normal(400, 100, n_sessions),
-        'accel_decel_over_2_5': np.random.randint(40, 120, n_sessions),
-        'accel_decel_over_3_5': np.random.randint(20, 80, n_sessions),
-        'accel_decel_over_4_5': np.random.randint(5, 40, n_sessions),
-        'day_duration': np.random.randint(60, 120, n_sessions),
-        'peak_speed': np.random.normal(32, 3, n_sessions),
-        'hr_zone_1_hms': [f'{np.random.randint(5, 20):02d}:{np.random.randint(0, 59):02d}:{np.random.randint(0, 59):02d}' for _ in range(n_sessions)],
-        'hr_zone_2_hms': [f'{np.random.randint(10, 30):02d}:{np.random.randint(0, 59):02d}:{np.random.randint(0, 59):02d}' for _ in range(n_sessions)],
-        'hr_zone_3_hms': [f'{np.random.randint(15, 40):02d}:{np.random.randint(0, 59):02d}:{np.random.randint(0, 59):02d}' for _ in range(n_sessions)],
-        'hr_zone_4_hms': [f'{np.random.randint(5, 25):02d}:{np.random.randint(0, 59):02d}:{np.random.randint(0, 59):02d}' for _ in range(n_sessions)],
-        'hr_zone_5_hms': [f'{np.random.randint(0, 10):02d}:{np.random.randint(0, 59):02d}:{np.random.randint(0, 59):02d}' for _ in range(n_sessions)]
-    }
-    
-    return pd.DataFrame(data)
-
-# Fonction pour charger les données de capacité physique
-@st.cache_data
-def load_physical_capability_data():
-    # Simuler le chargement du CSV
-    data = """testDate,expression,movement,quality,benchmarkPct
-12/11/2024,isometric,agility,rotate,0.6795
-18/06/2024,isometric,agility,rotate,
-19/12/2024,isometric,jump,take off,0.4
-08/07/2023,isometric,jump,take off,
-19/05/2024,isometric,jump,pre-load,0.49
-11/02/2024,dynamic,agility,deceleration,0.89
-28/03/2024,dynamic,upper body,push,0.4345
-12/01/2024,dynamic,jump,take off,0.625
-28/12/2024,isometric,upper body,pull,0.46
-20/03/2024,dynamic,sprint,acceleration,0.4445
-22/11/2024,isometric,agility,deceleration,0.86
-29/10/2024,dynamic,sprint,max velocity,0.652
-28/07/2024,isometric,agility,rotate,0.278
-23/02/2024,isometric,agility,acceleration,0.52
-08/01/2024,isometric,agility,rotate,
-27/06/2024,dynamic,sprint,acceleration,0.436
-10/11/2023,isometric,agility,deceleration,1.038
-26/12/2023,dynamic,jump,pre-load,0.484
-02/02/2025,dynamic,agility,acceleration,0.4965
-30/01/2024,dynamic,upper body,push,0.4345"""
-    
-    return pd.read_csv(io.StringIO(data))
+    # Environ 3-4 sessions par semaine ; zones cardiaques converties en secondes dès le chargement
+    gps_data, hr_zone_malformed = store.gps_sessions()
+    return SharedFrame('gps_sessions', gps_data), hr_zone_malformed
+
+# Fonction pour charger les données de capacité physique (clé : empreinte du CSV)
+@cache_resource
+def load_physical_capability_data(fingerprint):
+    return SharedFrame('physical_capability', store.physical_capability())
+
+# Cube date × série des capacités physiques (sélections et agrégats sans balayage complet)
+@cache_resource
+def load_capability_cube(fingerprint):
+    return store.capability_cube().freeze()
 
 # Fonction pour générer des données de récupération simulées
-@st.cache_data
+@cache_resource
 def generate_recovery_data():
-    np.random.seed(42)
-    dates = pd.date_range(start='2023-07-01', end='2025-03-15', freq='D')
-    
-    n_days = len(dates)
-    
-    data = {
-        'date': dates,
-        'bio_completeness': np.random.uniform(0.7, 1.0, n_days),
-        'bio_composite': np.random.normal(0, 0.2, n_days),
-        'msk_joint_range_completeness': np.random.uniform(0.8, 1.0, n_days),
-        'msk_joint_range_composite': np.random.normal(0, 0.15, n_days),
-        'msk_load_tolerance_completeness': np.random.uniform(0.75, 1.0, n_days),
-        'msk_load_tolerance_composite': np.random.normal(0, 0.18, n_days),
-        'subjective_completeness': np.random.uniform(0.85, 1.0, n_days),
-        'subjective_composite': np.random.normal(0, 0.25, n_days),
-        'soreness_completeness': np.random.uniform(0.9, 1.0, n_days),
-        'soreness_composite': np.random.normal(0, 0.2, n_days),
-        'sleep_completeness': np.random.uniform(0.8, 1.0, n_days),
-        'sleep_composite': np.random.normal(0, 0.3, n_days),
-        'emboss_baseline_score': np.random.normal(0, 0.15, n_days)
+    return SharedFrame('recovery_days', store.recovery_days())
+
+# Service de filtrage partagé entre sessions : vues filtrées et agrégats en cache LRU borné
+@cache_resource
+def get_filter_service(fingerprint):
+    return FilterService(
+        generate_gps_data()[0].view(), generate_recovery_data().view(), load_capability_cube(fingerprint), LRUViewCache()
+    )
+
+# Moteur de charge aiguë:chronique (état glissant par joueur, mis à jour session par session)
+@cache_resource
+def get_workload_engine():
+    return store.workload_engine()
+
+# Corrélations (simples et décalées) sur une grille hebdomadaire commune
+@cache_resource
+def get_correlation_service(fingerprint):
+    return CorrelationService(generate_gps_data()[0].view(), generate_recovery_data().view(), load_capability_cube(fingerprint))
+
+# Courbes de tendance LOWESS de toutes les séries, recalculées seulement si le CSV change
+@cache_resource
+def get_trend_curves(fingerprint):
+    return store.trend_curves()
+
+# Base SQLite des priorités, partagée entre sessions (priorités d'exemple à la première utilisation)
+@cache_resource
+def get_priority_store():
+    priority_store = PriorityStore()
+    priority_store.seed(PRIORITIES, player_id=generate_gps_data()[0].view()['player_id'].iloc[0])
+    return priority_store
+
+# Résultats bruts des tests de l'effectif et distributions triées des percentiles (par série et catégorie d'âge)
+@cache_resource
+def load_squad_tests(fingerprint):
+    return SharedFrame('squad_tests', store.squad_tests())
+
+@cache_resource
+def get_benchmark_engine(fingerprint):
+    return store.benchmark_engine()
+
+# Calculs et figures des onglets (cfc_analytics, partagé avec le générateur de rapports)
+@cache_resource
+def get_dashboard(fingerprint):
+    gps_data, hr_zone_malformed = generate_gps_data()
+    return Dashboard(
+        gps_data.view(), generate_recovery_data().view(), load_capability_cube(fingerprint), hr_zone_malformed,
+        get_filter_service(fingerprint), get_workload_engine(), get_correlation_service(fingerprint),
+        get_trend_curves(fingerprint), get_priority_store(),
+        squad_tests=load_squad_tests(fingerprint).view(), benchmark_engine=get_benchmark_engine(fingerprint)
+    )
+
+# Navigateur des données brutes : filtres, tri et pages calculés côté serveur sur le jeu partagé
+@cache_resource
+def get_table_view(name, fingerprint):
+    datasets = {
+        'GPS': generate_gps_data()[0],
+        'Capacité Physique': load_physical_capability_data(fingerprint),
+        'Récupération': generate_recovery_data(),
     }
-    
-    return pd.DataFrame(data)
+    return TableView(datasets[name].view())
 
-# Chargement des données
-gps_data = generate_gps_data()
-physical_data = load_physical_capability_data()
-recovery_data = generate_recovery_data()
+RAW_DATE_COLUMNS = {'GPS': 'date', 'Capacité Physique': 'testDate', 'Récupération': 'date'}
 
-# Conversion des dates
-gps_data['date'] = pd.to_datetime(gps_data['date'])
-physical_data['testDate'] = pd.to_datetime(physical_data['testDate'])
-recovery_data['date'] = pd.to_datetime(recovery_data['date'])
+# Chargement des données (dates déjà typées datetime64 à la génération et à la lecture du CSV) :
+# vues en lecture des jeux partagés, jamais modifiées en place
+fingerprint = source_fingerprint(PHYSICAL_CAPABILITY_CSV)
+gps_data = generate_gps_data()[0].view()
+physical_data = load_physical_capability_data(fingerprint).view()
+capability_cube = load_capability_cube(fingerprint)
+recovery_data = generate_recovery_data().view()
+dashboard = get_dashboard(fingerprint)
 
 # Sidebar pour les filtres
 st.sidebar.markdown("## 🎛️ Filtres et Contrôles")
@@ -177,543 +184,248 @@ seasons = st.sidebar.multiselect(
     default=gps_data['season'].unique()
 )
 
-# Onglets principaux
-tab1, tab2, tab3, tab4, tab5 = st.tabs([
-    "📊 Vue d'ensemble", 
-    "🏃‍♂️ Données GPS", 
-    "💪 Capacité Physique", 
-    "😴 Statut de Récupération",
-    "🎯 Zones Prioritaires"
-])
+# Mode de calcul à la demande : seul l'onglet affiché est calculé
+lazy_tabs = st.sidebar.toggle(
+    "Calcul à la demande",
+    value=True,
+    help="Ne calcule que l'onglet affiché ; les widgets d'un onglet ne relancent que cet onglet."
+)
+
+# Affichage d'une figure, mesuré en mode profilage
+def plotly_chart(fig, name=None, **kwargs):
+    with section(name or fig.layout.title.text or 'figure', 'chart'):
+        st.plotly_chart(fig, **kwargs)
+
+# Les fragments (st.fragment) limitent la réexécution à l'onglet dont un widget a changé
 
 # TAB 1: Vue d'ensemble
-with tab1:
+@st.fragment
+def render_overview_tab():
     st.markdown("### 📈 Tableau de Bord Performance")
     
+    metrics, figures = dashboard.overview()
+    
     # Métriques principales
-    col1, col2, col3, col4 = st.columns(4)
+    col1, col2, col3, col4, col5 = st.columns(5)
     
     with col1:
-        avg_distance = gps_data['distance'].mean()
         st.metric(
             label="Distance Moyenne",
-            value=f"{avg_distance:.0f} m",
-            delta=f"{(avg_distance - 8000):.0f} vs objectif"
+            value=f"{metrics['avg_distance']:.0f} m",
+            delta=f"{(metrics['avg_distance'] - 8000):.0f} vs objectif"
         )
     
     with col2:
-        avg_peak_speed = gps_data['peak_speed'].mean()
         st.metric(
             label="Vitesse de Pointe Moy.",
-            value=f"{avg_peak_speed:.1f} km/h",
-            delta=f"{(avg_peak_speed - 30):.1f} vs référence"
+            value=f"{metrics['avg_peak_speed']:.1f} km/h",
+            delta=f"{(metrics['avg_peak_speed'] - 30):.1f} vs référence"
         )
     
     with col3:
-        recent_recovery = recovery_data['emboss_baseline_score'].tail(7).mean()
-        recovery_status = "Excellent" if recent_recovery > 0.1 else "Bon" if recent_recovery > -0.1 else "Attention"
         st.metric(
             label="Score de Récupération",
-            value=recovery_status,
-            delta=f"{recent_recovery:.2f}"
+            value=metrics['recovery_status'],
+            delta=f"{metrics['recent_recovery']:.2f}"
         )
     
     with col4:
-        physical_tests = physical_data['benchmarkPct'].dropna().count()
         st.metric(
             label="Tests Physiques",
-            value=physical_tests,
+            value=metrics['physical_tests'],
             delta="Total effectués"
         )
     
+    with col5:
+        st.metric(
+            label="Ratio Aigu:Chronique",
+            value=f"{metrics['acwr']:.2f}",
+            delta=f"{(metrics['acwr'] - 1):+.2f} vs 1.0",
+            delta_color="off"
+        )
+    
     # Graphiques overview
     col1, col2 = st.columns(2)
     
     with col1:
-        # Évolution de la charge d'entraînement
-        fig_load = px.line(
-            gps_data, 
-            x='date', 
-            y='distance',
-            title="Évolution de la Distance Parcourue",
-            color_discrete_sequence=['#034694']
-        )
-        fig_load.update_layout(
-            xaxis_title="Date",
-            yaxis_title="Distance (m)",
-            hovermode='x unified'
-        )
-        st.plotly_chart(fig_load, use_container_width=True)
+        plotly_chart(figures['load'], use_container_width=True)
     
     with col2:
-        # Score de récupération
-        fig_recovery = px.line(
-            recovery_data.tail(30), 
-            x='date', 
-            y='emboss_baseline_score',
-            title="Score de Récupération (30 derniers jours)",
-            color_discrete_sequence=['#1f5f99']
-        )
-        fig_recovery.add_hline(y=0, line_dash="dash", line_color="gray")
-        fig_recovery.update_layout(
-            xaxis_title="Date",
-            yaxis_title="Score de Récupération",
-            hovermode='x unified'
-        )
-        st.plotly_chart(fig_recovery, use_container_width=True)
+        plotly_chart(figures['recovery'], use_container_width=True)
 
 # TAB 2: Données GPS
-with tab2:
+@st.fragment
+def render_gps_tab():
     st.markdown("### 🏃‍♂️ Analyse des Données GPS")
     
-    # Filtrage des données GPS
-    filtered_gps = gps_data[
-        (gps_data['date'] >= pd.Timestamp(date_range[0])) & 
-        (gps_data['date'] <= pd.Timestamp(date_range[1])) &
-        (gps_data['season'].isin(seasons))
-    ]
+    # Les graphiques sont remplis après lecture du sélecteur de charge, placé plus bas
+    charts_area = st.container()
     
-    col1, col2 = st.columns(2)
+    # Charge aiguë (7 j) / chronique (28 j)
+    st.markdown("#### Charge Aiguë:Chronique")
     
-    with col1:
-        # Distribution des distances
-        fig_dist = px.histogram(
-            filtered_gps, 
-            x='distance',
-            nbins=20,
-            title="Distribution des Distances Parcourues",
-            color_discrete_sequence=['#034694']
-        )
-        fig_dist.update_layout(
-            xaxis_title="Distance (m)",
-            yaxis_title="Fréquence"
-        )
-        st.plotly_chart(fig_dist, use_container_width=True)
+    load_column = st.selectbox(
+        "Indicateur de charge:",
+        options=LOAD_COLUMNS,
+        format_func=lambda x: x.replace('_', ' ').replace('accel decel', 'accél/décél').title()
+    )
+    metrics, figures = dashboard.gps(date_range, seasons, load_column)
     
-    with col2:
-        # Vitesses élevées par session
-        fig_speed = px.scatter(
-            filtered_gps,
-            x='date',
-            y='peak_speed',
-            size='distance_over_27',
-            color='opposition_code',
-            title="Vitesse de Pointe vs Distance >27 km/h",
-            hover_data=['distance', 'day_duration']
-        )
-        fig_speed.update_layout(
-            xaxis_title="Date",
-            yaxis_title="Vitesse de Pointe (km/h)"
-        )
-        st.plotly_chart(fig_speed, use_container_width=True)
+    col1, col2 = st.columns([2, 1])
     
-    # Analyse des accélérations/décélérations
-    st.markdown("#### Analyse des Accélérations/Décélérations")
+    with col1:
+        plotly_chart(figures['acwr'], use_container_width=True)
     
-    accel_data = filtered_gps[['date', 'accel_decel_over_2_5', 'accel_decel_over_3_5', 'accel_decel_over_4_5']].melt(
-        id_vars=['date'], 
-        var_name='threshold', 
-        value_name='count'
-    )
+    with col2:
+        if 'strain' in metrics:
+            st.metric("Monotonie (7 j)", f"{metrics['monotony']:.2f}")
+            st.metric("Contrainte (7 j)", f"{metrics['strain']:.0f}")
     
-    fig_accel = px.line(
-        accel_data,
-        x='date',
-        y='count',
-        color='threshold',
-        title="Évolution des Accélérations/Décélérations par Seuil"
-    )
-    fig_accel.update_layout(
-        xaxis_title="Date",
-        yaxis_title="Nombre d'Accélérations/Décélérations"
-    )
-    st.plotly_chart(fig_accel, use_container_width=True)
-    
-    # Zones de fréquence cardiaque
-    st.markdown("#### Analyse des Zones de Fréquence Cardiaque")
-    
-    # Convertir les temps HMS en minutes pour l'analyse
-    def hms_to_minutes(hms_str):
-        try:
-            h, m, s = map(int, hms_str.split(':'))
-            return h * 60 + m + s / 60
-        except:
-            return 0
-    
-    hr_cols = ['hr_zone_1_hms', 'hr_zone_2_hms', 'hr_zone_3_hms', 'hr_zone_4_hms', 'hr_zone_5_hms']
-    for col in hr_cols:
-        filtered_gps[f'{col}_minutes'] = filtered_gps[col].apply(hms_to_minutes)
-    
-    hr_data = filtered_gps[['date'] + [f'{col}_minutes' for col in hr_cols]].melt(
-        id_vars=['date'],
-        var_name='zone',
-        value_name='minutes'
-    )
-    hr_data['zone'] = hr_data['zone'].str.replace('_hms_minutes', '').str.replace('hr_zone_', 'Zone ')
-    
-    fig_hr = px.area(
-        hr_data,
-        x='date',
-        y='minutes',
-        color='zone',
-        title="Temps Passé dans les Zones de Fréquence Cardiaque"
-    )
-    fig_hr.update_layout(
-        xaxis_title="Date",
-        yaxis_title="Temps (minutes)"
-    )
-    st.plotly_chart(fig_hr, use_container_width=True)
+    with charts_area:
+        col1, col2 = st.columns(2)
+        
+        with col1:
+            plotly_chart(figures['distance'], use_container_width=True)
+        
+        with col2:
+            plotly_chart(figures['speed'], use_container_width=True)
+        
+        # Analyse des accélérations/décélérations
+        st.markdown("#### Analyse des Accélérations/Décélérations")
+        plotly_chart(figures['accel'], use_container_width=True)
+        
+        # Zones de fréquence cardiaque
+        st.markdown("#### Analyse des Zones de Fréquence Cardiaque")
+        
+        if metrics['hr_zone_malformed']:
+            st.caption(f"⚠️ {metrics['hr_zone_malformed']} durées de zone cardiaque invalides ignorées")
+        plotly_chart(figures['hr_zones'], use_container_width=True)
 
 # TAB 3: Capacité Physique
-with tab3:
+@st.fragment
+def render_physical_tab():
     st.markdown("### 💪 Analyse de la Capacité Physique")
     
-    # Filtrage des données physiques
-    filtered_physical = physical_data[
-        (physical_data['testDate'] >= pd.Timestamp(date_range[0])) & 
-        (physical_data['testDate'] <= pd.Timestamp(date_range[1]))
-    ]
-    
-    col1, col2 = st.columns(2)
-    
-    with col1:
-        # Performance par mouvement
-        movement_perf = filtered_physical.groupby('movement')['benchmarkPct'].agg(['mean', 'count']).reset_index()
-        movement_perf = movement_perf[movement_perf['count'] >= 3]  # Au moins 3 tests
-        
-        fig_movement = px.bar(
-            movement_perf,
-            x='movement',
-            y='mean',
-            title="Performance Moyenne par Type de Mouvement",
-            color='mean',
-            color_continuous_scale='RdYlGn'
-        )
-        fig_movement.add_hline(y=0.65, line_dash="dash", line_color="green", annotation_text="Objectif: 65%")
-        fig_movement.update_layout(
-            xaxis_title="Type de Mouvement",
-            yaxis_title="Performance Moyenne (%)",
-            xaxis_tickangle=-45
-        )
-        st.plotly_chart(fig_movement, use_container_width=True)
-    
-    with col2:
-        # Performance par expression
-        expression_perf = filtered_physical.groupby('expression')['benchmarkPct'].agg(['mean', 'count']).reset_index()
-        
-        fig_expression = px.pie(
-            expression_perf,
-            values='count',
-            names='expression',
-            title="Répartition des Tests par Expression"
-        )
-        st.plotly_chart(fig_expression, use_container_width=True)
+    # Emplacements remplis une fois les widgets de l'onglet lus
+    overview_area = st.container()
     
     # Évolution temporelle des performances
     st.markdown("#### Évolution Temporelle des Performances")
     
     # Sélection de la qualité à analyser
-    available_qualities = filtered_physical['quality'].unique()
-    selected_quality = st.selectbox("Sélectionnez une qualité à analyser:", available_qualities)
-    
-    quality_data = filtered_physical[filtered_physical['quality'] == selected_quality]
-    
-    if not quality_data.empty:
-        fig_quality_trend = px.scatter(
-            quality_data,
-            x='testDate',
-            y='benchmarkPct',
-            color='movement',
-            symbol='expression',
-            title=f"Évolution de la Performance - {selected_quality.title()}",
-            hover_data=['movement', 'expression']
-        )
-        
-        # Ajouter une ligne de tendance
-        if len(quality_data.dropna()) > 2:
-            fig_quality_trend.add_traces(
-                px.scatter(quality_data.dropna(), x='testDate', y='benchmarkPct', trendline='lowess').data[1]
-            )
-        
-        fig_quality_trend.update_layout(
-            xaxis_title="Date",
-            yaxis_title="Performance (%)"
-        )
-        st.plotly_chart(fig_quality_trend, use_container_width=True)
+    selected_quality = st.selectbox("Sélectionnez une qualité à analyser:", capability_cube.levels('quality'))
+    trend_area = st.container()
+    
+    # Percentiles calculés à partir des résultats bruts de l'effectif
+    st.markdown("#### Percentiles face à l'Effectif")
+    reference = st.radio(
+        "Distribution de référence",
+        ['squad', 'age_group'],
+        format_func={'squad': "Effectif", 'age_group': "Catégorie d'âge"}.get,
+        horizontal=True
+    )
+    percentile_area = st.container()
     
     # Matrice de corrélation des performances
     st.markdown("#### Analyse Comparative des Qualités")
+    correlation_area = st.container()
     
-    pivot_data = filtered_physical.pivot_table(
-        values='benchmarkPct',
-        index='testDate',
-        columns='quality',
-        aggfunc='mean'
-    )
+    # Corrélations décalées : charge et récupération des semaines précédentes vs tests
+    st.markdown("#### Charge des Semaines Précédentes vs Tests")
     
-    if not pivot_data.empty:
-        correlation_matrix = pivot_data.corr()
-        
-        fig_corr = px.imshow(
-            correlation_matrix,
-            title="Matrice de Corrélation entre les Qualités Physiques",
-            color_continuous_scale='RdBu',
-            aspect='auto'
-        )
-        st.plotly_chart(fig_corr, use_container_width=True)
-
-# TAB 4: Statut de Récupération
-with tab4:
-    st.markdown("### 😴 Analyse du Statut de Récupération")
-    
-    # Filtrage des données de récupération
-    filtered_recovery = recovery_data[
-        (recovery_data['date'] >= pd.Timestamp(date_range[0])) & 
-        (recovery_data['date'] <= pd.Timestamp(date_range[1]))
-    ]
+    lag = st.slider("Décalage (semaines)", min_value=0, max_value=4, value=1)
+    _, figures = dashboard.physical(date_range, selected_quality, lag, reference)
     
-    # Score global de récupération
-    col1, col2 = st.columns([2, 1])
-    
-    with col1:
-        fig_global_recovery = px.line(
-            filtered_recovery,
-            x='date',
-            y='emboss_baseline_score',
-            title="Score Global de Récupération",
-            color_discrete_sequence=['#034694']
-        )
-        fig_global_recovery.add_hline(y=0, line_dash="dash", line_color="gray")
-        fig_global_recovery.add_hline(y=0.2, line_dash="dash", line_color="green", annotation_text="Excellent")
-        fig_global_recovery.add_hline(y=-0.2, line_dash="dash", line_color="red", annotation_text="Attention")
-        fig_global_recovery.update_layout(
-            xaxis_title="Date",
-            yaxis_title="Score de Récupération"
-        )
-        st.plotly_chart(fig_global_recovery, use_container_width=True)
+    if figures['lagged'] is not None:
+        plotly_chart(figures['lagged'], use_container_width=True)
+    else:
+        st.info("Pas assez de semaines communes pour estimer les corrélations sur cette période.")
     
-    with col2:
-        # Statut actuel
-        current_score = filtered_recovery['emboss_baseline_score'].iloc[-1]
-        if current_score > 0.1:
-            status = "🟢 Excellent"
-            color = "green"
-        elif current_score > -0.1:
-            status = "🟡 Bon"
-            color = "orange"
-        else:
-            status = "🔴 Attention"
-            color = "red"
+    with overview_area:
+        col1, col2 = st.columns(2)
         
-        st.markdown(f"""
-        <div style="background-color: {color}20; padding: 20px; border-radius: 10px; text-align: center;">
-            <h3>Statut Actuel</h3>
-            <h2>{status}</h2>
-            <p>Score: {current_score:.2f}</p>
-        </div>
-        """, unsafe_allow_html=True)
-    
-    # Analyse détaillée par catégorie
-    st.markdown("#### Analyse Détaillée par Catégorie de Récupération")
-    
-    categories = ['bio', 'msk_joint_range', 'msk_load_tolerance', 'subjective', 'soreness', 'sleep']
-    
-    # Créer un graphique en radar pour les dernières valeurs
-    latest_recovery = filtered_recovery.iloc[-1]
-    
-    radar_data = []
-    for cat in categories:
-        composite_col = f'{cat}_composite'
-        completeness_col = f'{cat}_completeness'
+        with col1:
+            plotly_chart(figures['movement'], use_container_width=True)
         
-        radar_data.append({
-            'category': cat.replace('_', ' ').title(),
-            'composite': latest_recovery[composite_col],
-            'completeness': latest_recovery[completeness_col]
-        })
+        with col2:
+            plotly_chart(figures['expression'], use_container_width=True)
     
-    radar_df = pd.DataFrame(radar_data)
+    with trend_area:
+        if figures['quality_trend'] is not None:
+            plotly_chart(figures['quality_trend'], use_container_width=True)
     
-    col1, col2 = st.columns(2)
+    with percentile_area:
+        if figures['percentiles'] is not None:
+            plotly_chart(figures['percentiles'], use_container_width=True)
+        else:
+            st.info("Aucun résultat de l'effectif pour cette qualité sur la période.")
     
-    with col1:
-        # Graphique en barres pour les scores composites
-        fig_composite = px.bar(
-            radar_df,
-            x='category',
-            y='composite',
-            title="Scores Composites par Catégorie (Dernière Mesure)",
-            color='composite',
-            color_continuous_scale='RdYlGn'
-        )
-        fig_composite.add_hline(y=0, line_dash="dash", line_color="gray")
-        fig_composite.update_layout(
-            xaxis_title="Catégorie",
-            yaxis_title="Score Composite",
-            xaxis_tickangle=-45
-        )
-        st.plotly_chart(fig_composite, use_container_width=True)
+    with correlation_area:
+        if figures['correlation'] is not None:
+            plotly_chart(figures['correlation'], use_container_width=True)
+
+# TAB 4: Statut de Récupération
+@st.fragment
+def render_recovery_tab():
+    st.markdown("### 😴 Analyse du Statut de Récupération")
     
-    with col2:
-        # Graphique en barres pour la complétude
-        fig_completeness = px.bar(
-            radar_df,
-            x='category',
-            y='completeness',
-            title="Complétude des Tests par Catégorie",
-            color_discrete_sequence=['#1f5f99']
-        )
-        fig_completeness.update_layout(
-            xaxis_title="Catégorie",
-            yaxis_title="Complétude (%)",
-            xaxis_tickangle=-45,
-            yaxis=dict(range=[0, 1])
-        )
-        st.plotly_chart(fig_completeness, use_container_width=True)
+    # Emplacement rempli une fois les catégories clés sélectionnées (plus bas)
+    summary_area = st.container()
     
     # Évolution des catégories importantes
     st.markdown("#### Évolution des Catégories Clés")
     
     key_categories = st.multiselect(
         "Sélectionnez les catégories à analyser:",
-        options=[f'{cat}_composite' for cat in categories],
-        default=['sleep_composite', 'subjective_composite', 'soreness_composite'],
-        format_func=lambda x: x.replace('_composite', '').replace('_', ' ').title()
+        options=[f'{cat}_composite' for cat in RECOVERY_CATEGORIES],
+        default=DEFAULT_RECOVERY_CATEGORIES,
+        format_func=format_category
     )
+    metrics, figures = dashboard.recovery(date_range, key_categories)
     
-    if key_categories:
-        recovery_evolution = filtered_recovery[['date'] + key_categories].melt(
-            id_vars=['date'],
-            var_name='category',
-            value_name='score'
-        )
-        recovery_evolution['category'] = recovery_evolution['category'].str.replace('_composite', '').str.replace('_', ' ').str.title()
-        
-        fig_evolution = px.line(
-            recovery_evolution,
-            x='date',
-            y='score',
-            color='category',
-            title="Évolution des Scores de Récupération par Catégorie"
-        )
-        fig_evolution.add_hline(y=0, line_dash="dash", line_color="gray")
-        fig_evolution.update_layout(
-            xaxis_title="Date",
-            yaxis_title="Score Composite"
-        )
-        st.plotly_chart(fig_evolution, use_container_width=True)
-
-# TAB 5: Zones Prioritaires
-with tab5:
-    st.markdown("### 🎯 Zones Prioritaires Individuelles")
+    if figures['evolution'] is not None:
+        plotly_chart(figures['evolution'], use_container_width=True)
     
-    # Données des priorités (simulées basées sur le document)
-    priorities_data = [
-        {
-            'Priority': 1,
-            'Category': 'Recovery',
-            'Area': 'Sleep',
-            'Target': 'Increase average sleep by 1hr per night',
-            'Performance Type': 'Habit',
-            'Target Set': '07/03/2025',
-            'Review Date': '07/05/2025',
-            'Tracking': 'On Track',
-            'Progress': 75,
-            'Status': '🟡'
-        },
-        {
-            'Priority': 2,
-            'Category': 'Recovery',
-            'Area': 'Nutrition',
-            'Target': '45g of carbohydrate every half time',
-            'Performance Type': 'Habit',
-            'Target Set': '07/03/2025',
-            'Review Date': '07/05/2025',
-            'Tracking': 'On Track',
-            'Progress': 80,
-            'Status': '🟢'
-        },
-        {
-            'Priority': 3,
-            'Category': 'Performance',
-            'Area': 'Sprint',
-            'Target': '>65% in max velocity score',
-            'Performance Type': 'Outcome',
-            'Target Set': '07/03/2025',
-            'Review Date': '07/05/2025',
-            'Tracking': 'Achieved',
-            'Progress': 100,
-            'Status': '🟢'
-        }
-    ]
-    
-    priorities_df = pd.DataFrame(priorities_data)
-    
-    # Affichage des priorités sous forme de cartes
-    st.markdown("#### Priorités Actuelles")
-    
-    for _, priority in priorities_df.iterrows():
-        col1, col2, col3, col4 = st.columns([1, 2, 2, 1])
+    with summary_area:
+        # Score global de récupération
+        col1, col2 = st.columns([2, 1])
         
         with col1:
-            st.markdown(f"""
-            <div style="background-color: #f8f9fa; padding: 15px; border-radius: 10px; text-align: center;">
-                <h2>{priority['Status']}</h2>
-                <p><strong>Priorité {priority['Priority']}</strong></p>
-            </div>
-            """, unsafe_allow_html=True)
+            plotly_chart(figures['global'], use_container_width=True)
         
         with col2:
+            # Statut actuel
+            status, color = recovery_status(metrics['current_score'])
             st.markdown(f"""
-            <div style="background-color: #034694; color: white; padding: 15px; border-radius: 10px;">
-                <h4>{priority['Category']} - {priority['Area']}</h4>
-                <p><strong>Objectif:</strong> {priority['Target']}</p>
-                <p><strong>Type:</strong> {priority['Performance Type']}</p>
+            <div style="background-color: {color}20; padding: 20px; border-radius: 10px; text-align: center;">
+                <h3>Statut Actuel</h3>
+                <h2>{status}</h2>
+                <p>Score: {metrics['current_score']:.2f}</p>
             </div>
             """, unsafe_allow_html=True)
         
-        with col3:
-            st.markdown(f"""
-            <div style="background-color: #1f5f99; color: white; padding: 15px; border-radius: 10px;">
-                <p><strong>Statut:</strong> {priority['Tracking']}</p>
-                <p><strong>Défini le:</strong> {priority['Target Set']}</p>
-                <p><strong>Révision:</strong> {priority['Review Date']}</p>
-            </div>
-            """, unsafe_allow_html=True)
+        # Analyse détaillée par catégorie
+        st.markdown("#### Analyse Détaillée par Catégorie de Récupération")
         
-        with col4:
-            # Barre de progression
-            progress_color = "#4CAF50" if priority['Progress'] == 100 else "#FF9800" if priority['Progress'] > 50 else "#F44336"
-            st.markdown(f"""
-            <div style="background-color: #f8f9fa; padding: 15px; border-radius: 10px; text-align: center;">
-                <p><strong>Progrès</strong></p>
-                <div style="background-color: #e0e0e0; border-radius: 10px; padding: 3px;">
-                    <div style="background-color: {progress_color}; width: {priority['Progress']}%; height: 20px; border-radius: 7px;"></div>
-                </div>
-                <p>{priority['Progress']}%</p>
-            </div>
-            """, unsafe_allow_html=True)
+        col1, col2 = st.columns(2)
         
-        st.markdown("---")
-    
-    # Graphique de suivi des priorités
-    st.markdown("#### Suivi des Progrès")
-    
-    fig_priorities = px.bar(
-        priorities_df,
-        x='Area',
-        y='Progress',
-        color='Category',
-        title="Progression des Zones Prioritaires",
-        color_discrete_map={'Recovery': '#034694', 'Performance': '#1f5f99'}
-    )
-    fig_priorities.add_hline(y=100, line_dash="dash", line_color="green", annotation_text="Objectif")
-    fig_priorities.update_layout(
-        xaxis_title="Zone Prioritaire",
-        yaxis_title="Progression (%)",
-        yaxis=dict(range=[0, 110])
-    )
-    st.plotly_chart(fig_priorities, use_container_width=True)
+        with col1:
+            plotly_chart(figures['composite'], use_container_width=True)
+        
+        with col2:
+            plotly_chart(figures['completeness'], use_container_width=True)
+
+# TAB 5: Zones Prioritaires
+@st.fragment
+def render_priorities_tab():
+    st.markdown("### 🎯 Zones Prioritaires Individuelles")
+    
+    players = dashboard.players()
+    player_id = players[0] if len(players) == 1 else st.selectbox("Joueur", players, key="priorities_player")
+    
+    # Emplacements remplis après le formulaire d'ajout, pour afficher une priorité dès son enregistrement
+    cards_container = st.container()
+    progress_container = st.container()
     
     # Recommandations basées sur les données
     st.markdown("#### 💡 Recommandations Basées sur les Données")
@@ -762,8 +474,96 @@ with tab5:
             new_review_date = st.date_input("Date de révision")
             
         if st.button("Ajouter la Priorité"):
-            st.success("Nouvelle priorité ajoutée avec succès!")
-            st.info("Cette fonctionnalité serait intégrée à la base de données en production.")
+            if not new_area.strip() or not new_target.strip():
+                st.warning("Renseignez la zone et l'objectif de la priorité.")
+            else:
+                dashboard.priority_store.add(
+                    player_id=player_id,
+                    category=new_category,
+                    area=new_area.strip(),
+                    target=new_target.strip(),
+                    performance_type=new_type,
+                    review_date=new_review_date
+                )
+                st.success("Nouvelle priorité ajoutée avec succès!")
+    
+    # Une requête indexée (joueur) et une grille de cartes générée en une passe
+    priorities_df = dashboard.priorities(player_id)
+    
+    with cards_container:
+        # Affichage des priorités sous forme de cartes
+        st.markdown("#### Priorités Actuelles")
+        if priorities_df.empty:
+            st.info("Aucune priorité définie pour ce joueur.")
+        else:
+            st.markdown(cards_html(priorities_df), unsafe_allow_html=True)
+    
+    with progress_container:
+        # Graphique de suivi des priorités
+        st.markdown("#### Suivi des Progrès")
+        
+        _, figures = dashboard.priority_progress(priorities_df)
+        plotly_chart(figures['progress'], use_container_width=True)
+
+# Données brutes : seule la page affichée est envoyée au navigateur ; l'export est écrit bloc par bloc
+@st.fragment
+def render_raw_data(dataset_choice):
+    view = get_table_view(dataset_choice, fingerprint)
+    date_col = RAW_DATE_COLUMNS[dataset_choice]
+    # Colonnes, tri et page propres à chaque dataset
+    key = f'raw_{dataset_choice}'
+
+    filters = {}
+    if st.checkbox("Limiter à la période d'analyse", True, key='raw_in_range') and len(date_range) == 2:
+        filters[date_col] = (pd.Timestamp(date_range[0]), pd.Timestamp(date_range[1]))
+    search_col = st.selectbox("Rechercher dans", view.columns, key=f'{key}_search_col')
+    filters[search_col] = st.text_input("Valeur contenue", key=f'{key}_search')
+
+    col1, col2 = st.columns(2)
+    with col1:
+        sort_by = st.selectbox("Trier par", view.columns, index=view.columns.index(date_col), key=f'{key}_sort')
+    with col2:
+        ascending = st.radio("Ordre", ["↑", "↓"], horizontal=True, key='raw_order') == "↑"
+    page_size = st.selectbox("Lignes par page", PAGE_SIZES, key='raw_page_size')
+
+    with section('raw data page', 'filter'):
+        total = len(view.positions(filters, sort_by, ascending))
+        pages = n_pages(total, page_size)
+        # Moins de pages après un nouveau filtre : retour à la dernière page disponible
+        if st.session_state.get(f'{key}_page', 1) > pages:
+            st.session_state[f'{key}_page'] = pages
+        page = st.number_input(f"Page (sur {pages})", min_value=1, max_value=pages, key=f'{key}_page')
+        window, total = view.page(page - 1, page_size, filters, sort_by, ascending)
+    st.dataframe(window, hide_index=True)
+    st.caption(f"Lignes {(page - 1) * page_size + min(len(window), 1)}-{(page - 1) * page_size + len(window)} sur {total}")
+
+    fmt = st.radio("Format d'export", list(EXPORT_FORMATS), horizontal=True, key='raw_format')
+    st.download_button(
+        "⬇️ Exporter la sélection",
+        # Fichier généré au clic seulement (Streamlit >= 1.52), par blocs de lignes
+        data=lambda: export_bytes(view, fmt, filters, sort_by, ascending),
+        file_name=f"{dataset_choice.lower().replace(' ', '_')}.{fmt}",
+        mime=EXPORT_FORMATS[fmt],
+        key='raw_download',
+    )
+
+# Onglets principaux
+TABS = {
+    "📊 Vue d'ensemble": render_overview_tab,
+    "🏃‍♂️ Données GPS": render_gps_tab,
+    "💪 Capacité Physique": render_physical_tab,
+    "😴 Statut de Récupération": render_recovery_tab,
+    "🎯 Zones Prioritaires": render_priorities_tab,
+}
+
+if lazy_tabs:
+    active_tab = st.radio("Onglet", list(TABS), horizontal=True, label_visibility="collapsed", key="active_tab")
+    with section(active_tab, 'tab'):
+        TABS[active_tab]()
+else:
+    for (name, render_tab), tab in zip(TABS.items(), st.tabs(list(TABS))):
+        with tab, section(name, 'tab'):
+            render_tab()
 
 # Footer avec informations de contact
 st.markdown("---")
@@ -804,21 +604,40 @@ with st.sidebar:
     """)
     
     st.markdown("### 🔧 Paramètres")
+    st.toggle("Mode profilage", value=PROFILE_DEFAULT, key='profiling',
+              help="Mesure temps et mémoire de chaque section ; effectif à la prochaine exécution.")
     show_raw_data = st.checkbox("Afficher les données brutes", False)
     
     if show_raw_data:
         st.markdown("### 📊 Données Brutes")
-        dataset_choice = st.selectbox("Choisir le dataset", ["GPS", "Capacité Physique", "Récupération"])
-        
-        if dataset_choice == "GPS":
-            st.dataframe(gps_data.head(10))
-        elif dataset_choice == "Capacité Physique":
-            st.dataframe(physical_data.head(10))
-        else:
-            st.dataframe(recovery_data.head(10))
+        dataset_choice = st.selectbox("Choisir le dataset", list(RAW_DATE_COLUMNS))
+        render_raw_data(dataset_choice)
 
 # Message de bienvenue au démarrage
 if 'welcome_shown' not in st.session_state:
     st.session_state.welcome_shown = True
     st.balloons()
-    st.success("🎉 Bienvenue dans l'application CFC Performance Insights! Explorez les différents onglets pour analyser les données de performance.")
\ No newline at end of file
+    st.success("🎉 Bienvenue dans l'application CFC Performance Insights! Explorez les différents onglets pour analyser les données de performance.")
+
+# Panneau de profilage : sections de cette exécution et caches, également écrits dans le journal
+if profiler is not None:
+    profiler.stop()
+    caches = {
+        **cache_stats(),
+        'filter_service': dashboard.filter_service.stats(),
+        'correlation_service': dashboard.correlation_service.cache.stats(),
+    }
+    profiler.log(caches)
+    with st.sidebar.expander("🩺 Profilage", expanded=True):
+        st.metric("Exécution complète", f"{profiler.total_s * 1000:.0f} ms")
+        st.dataframe(
+            profiler.frame().sort_values('ms', ascending=False).round(2),
+            hide_index=True
+        )
+        st.markdown("**Caches**")
+        st.dataframe(
+            pd.DataFrame.from_dict(caches, orient='index')
+            .reindex(columns=['calls', 'misses', 'hits', 'hit_rate', 'entries', 'nbytes']).round(3)
+        )
+        st.markdown("**Données partagées**")
+        st.dataframe(shared_memory().round(2), hide_index=True)
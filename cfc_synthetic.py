@@ -0,0 +1,253 @@
+import argparse
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from scipy.signal import lfilter
+
+from cfc_data import CAPABILITY_KEYS, HAS_PYARROW, RECOVERY_CATEGORIES, RECOVERY_INPUTS, season_labels
+from cfc_recovery import RecoveryEngine
+
+OPPOSITIONS = ['Arsenal', 'Liverpool', 'Manchester City', 'Tottenham', 'Training Session']
+
+# Plages (heures min, heures max) des zones de fréquence cardiaque
+HR_ZONE_HOURS = {1: (5, 20), 2: (10, 30), 3: (15, 40), 4: (5, 25), 5: (0, 10)}
+
+# Probabilité (min, max) qu'une mesure de la catégorie soit relevée un jour donné
+RECOVERY_PROFILES = {
+    'bio': (0.7, 1.0),
+    'msk_joint_range': (0.8, 1.0),
+    'msk_load_tolerance': (0.75, 1.0),
+    'subjective': (0.85, 1.0),
+    'soreness': (0.9, 1.0),
+    'sleep': (0.8, 1.0),
+}
+
+# Mesures brutes : moyenne de l'effectif, écart-type entre joueurs, écart-type au jour le jour
+RECOVERY_INPUT_PROFILES = {
+    'bio_hrv': (70, 12, 8),
+    'bio_ck': (300, 80, 90),
+    'msk_joint_range_hip_rom': (45, 5, 2),
+    'msk_joint_range_ankle_rom': (38, 4, 1.5),
+    'msk_load_tolerance_adductor_squeeze': (400, 50, 20),
+    'msk_load_tolerance_hamstring_iso': (350, 40, 18),
+    'subjective_mood': (7, 1, 1),
+    'subjective_energy': (7, 1, 1),
+    'subjective_stress': (4, 1, 1),
+    'soreness_upper': (2, 0.7, 1),
+    'soreness_lower': (3, 0.8, 1.2),
+    'sleep_duration': (7.5, 0.5, 0.8),
+    'sleep_quality': (7, 1, 1),
+}
+
+# Catégories d'âge de l'effectif, attribuées à tour de rôle (P001 en équipe première)
+AGE_GROUPS = ['First Team', 'U21', 'U18']
+# Écart-type du niveau des joueurs autour de la moyenne de l'effectif (fraction de la moyenne)
+SQUAD_LEVEL_SPREAD = 0.1
+# Part des tests non réalisés par un joueur
+SQUAD_MISSING_RATE = 0.1
+
+# Autocorrélation d'un jour à l'autre de l'état de forme (AR(1)) des données de récupération
+READINESS_PHI = 0.8
+
+_COLON = ord(':')
+_ZERO = ord('0')
+
+
+# Formatage vectorisé HH:MM:SS : on écrit les chiffres dans un tampon d'octets
+# de largeur fixe puis on le relit comme chaînes de 8 caractères
+def format_hms(hours, minutes, seconds):
+    parts = [np.asarray(hours), np.asarray(minutes), np.asarray(seconds)]
+    buffer = np.full((len(parts[0]), 8), _COLON, dtype=np.uint8)
+    for i, part in enumerate(parts):
+        buffer[:, 3 * i] = _ZERO + part // 10 % 10
+        buffer[:, 3 * i + 1] = _ZERO + part % 10
+    return buffer.view('S8').ravel().astype(str).astype(object)
+
+
+def _date_span(start_season, n_seasons, end_date):
+    start = pd.Timestamp(f'{start_season}-07-01')
+    end = pd.Timestamp(end_date) if end_date is not None else pd.Timestamp(f'{start_season + n_seasons}-06-30')
+    return pd.date_range(start=start, end=end, freq='D')
+
+
+def _player_ids(n_players):
+    return pd.Categorical([f'P{i:03d}' for i in range(1, n_players + 1)])
+
+
+# Sessions GPS simulées pour n_players joueurs sur n_seasons saisons
+def generate_gps_sessions(n_players=1, n_seasons=2, sessions_per_week=3.5, start_season=2023,
+                          end_date=None, seed=42):
+    rng = np.random.default_rng(seed)
+    dates = _date_span(start_season, n_seasons, end_date)
+
+    # Une session par (jour, joueur) avec probabilité sessions_per_week / 7
+    has_session = rng.random((len(dates), n_players)) < sessions_per_week / 7
+    day_idx, player_idx = np.nonzero(has_session)
+    n_sessions = len(day_idx)
+    session_dates = dates[day_idx]
+
+    opposition_codes = np.array([f'OPP{i:02d}' for i in range(1, 20)], dtype=object)
+    md_plus = np.array([f'MD+{i}' for i in range(1, 4)], dtype=object)
+    md_minus = np.array([f'MD-{i}' for i in range(1, 4)], dtype=object)
+
+    data = {
+        'player_id': _player_ids(n_players)[player_idx],
+        'date': session_dates,
+        'opposition_code': np.where(rng.random(n_sessions) < 0.3,
+                                    opposition_codes[rng.integers(0, 19, n_sessions)], 'TRAINING'),
+        'opposition_full': np.array(OPPOSITIONS, dtype=object)[rng.integers(0, len(OPPOSITIONS), n_sessions)],
+        'md_plus_code': np.where(rng.random(n_sessions) < 0.3, md_plus[rng.integers(0, 3, n_sessions)], ''),
+        'md_minus_code': np.where(rng.random(n_sessions) < 0.3, md_minus[rng.integers(0, 3, n_sessions)], ''),
+        'season': season_labels(session_dates),
+        # Distances tronquées à 0 (queues de la loi normale sur de grands effectifs)
+        'distance': np.maximum(rng.normal(8500, 1500, n_sessions), 0),
+        'distance_over_21': np.maximum(rng.normal(1200, 300, n_sessions), 0),
+        'distance_over_24': np.maximum(rng.normal(800, 200, n_sessions), 0),
+        'distance_over_27': np.maximum(rng.normal(400, 100, n_sessions), 0),
+        'accel_decel_over_2_5': rng.integers(40, 120, n_sessions),
+        'accel_decel_over_3_5': rng.integers(20, 80, n_sessions),
+        'accel_decel_over_4_5': rng.integers(5, 40, n_sessions),
+        'day_duration': rng.integers(60, 120, n_sessions),
+        'peak_speed': rng.normal(32, 3, n_sessions),
+    }
+    for zone, (low, high) in HR_ZONE_HOURS.items():
+        data[f'hr_zone_{zone}_hms'] = format_hms(
+            rng.integers(low, high, n_sessions),
+            rng.integers(0, 59, n_sessions),
+            rng.integers(0, 59, n_sessions),
+        )
+
+    return pd.DataFrame(data)
+
+
+# Mesures de récupération quotidiennes simulées, une ligne par (jour, joueur) ; NaN si non relevée.
+# Un état de forme commun (AR(1)) déplace toutes les mesures d'un joueur dans le sens de la récupération.
+def generate_recovery_inputs(n_players=1, n_seasons=2, start_season=2023, end_date=None, seed=42):
+    rng = np.random.default_rng(seed)
+    dates = _date_span(start_season, n_seasons, end_date)
+    n_days = len(dates)
+
+    # readiness[j] = phi * readiness[j - 1] + choc[j] pour tous les joueurs d'un coup (filtre récursif),
+    # le premier jour tiré dans la loi stationnaire N(0, 1)
+    initial = rng.normal(0, 1, n_players)
+    shocks = rng.normal(0, np.sqrt(1 - READINESS_PHI ** 2), (n_days, n_players))
+    shocks[0] = initial
+    readiness = lfilter([1], [1, -READINESS_PHI], shocks, axis=0).ravel()
+
+    data = {
+        'player_id': np.tile(_player_ids(n_players), n_days),
+        'date': np.repeat(dates.values, n_players),
+    }
+    for cat in RECOVERY_CATEGORIES:
+        low, high = RECOVERY_PROFILES[cat]
+        rate = rng.uniform(low, high, n_days * n_players)
+        for name, direction in RECOVERY_INPUTS[cat].items():
+            column = f'{cat}_{name}'
+            mean, between, within = RECOVERY_INPUT_PROFILES[column]
+            player_mean = np.tile(rng.normal(mean, between, n_players), n_days)
+            values = player_mean + within * (0.5 * direction * readiness + rng.normal(0, 1, n_days * n_players))
+            data[column] = np.where(rng.random(n_days * n_players) < rate, np.maximum(values, 0), np.nan)
+
+    df = pd.DataFrame(data)
+    df['player_id'] = df['player_id'].astype(_player_ids(n_players).dtype)
+    return df
+
+
+# Données de récupération quotidiennes : mesures simulées et scores calculés par le moteur de récupération
+def generate_recovery_days(n_players=1, n_seasons=2, start_season=2023, end_date=None, seed=42):
+    inputs = generate_recovery_inputs(n_players, n_seasons, start_season, end_date, seed)
+    return RecoveryEngine.from_days(inputs).scores()
+
+
+# Résultats bruts simulés des tests physiques de l'effectif, aux dates et sur les séries du CSV de
+# capacité physique. Le joueur suivi (P001) reprend benchmarkPct × 100 là où il est renseigné ;
+# chaque autre joueur a son propre niveau par série, plus la variabilité de test observée dans le CSV.
+def generate_squad_tests(physical, n_players=25, seed=42):
+    rng = np.random.default_rng(seed)
+    tests = physical[['testDate'] + CAPABILITY_KEYS].reset_index(drop=True)
+    n_tests = len(tests)
+    codes = tests.groupby(CAPABILITY_KEYS, observed=True, sort=True).ngroup().to_numpy()
+    pct = physical['benchmarkPct'].to_numpy(dtype='float64', na_value=np.nan)
+    stats = pd.Series(pct).groupby(codes).agg(['mean', 'std'])
+    mean = stats['mean'].to_numpy()[codes] * 100
+    within = stats['std'].fillna(0).to_numpy()[codes] * 100
+
+    level = rng.normal(0, SQUAD_LEVEL_SPREAD, (n_players, len(stats)))
+    results = mean * (1 + level[:, codes]) + within * rng.normal(0, 1, (n_players, n_tests))
+    results[0] = np.where(np.isnan(pct), results[0], pct * 100)
+    results[1:][rng.random((n_players - 1, n_tests)) < SQUAD_MISSING_RATE] = np.nan
+
+    df = tests.iloc[np.tile(np.arange(n_tests), n_players)].reset_index(drop=True)
+    players = _player_ids(n_players)
+    df.insert(0, 'player_id', players[np.repeat(np.arange(n_players), n_tests)])
+    df.insert(1, 'age_group', pd.Categorical(
+        np.array(AGE_GROUPS, dtype=object)[np.repeat(np.arange(n_players) % len(AGE_GROUPS), n_tests)],
+        categories=AGE_GROUPS
+    ))
+    df['result'] = results.ravel()
+    return df.dropna(subset=['result']).reset_index(drop=True)
+
+
+# Suivi brut simulé d'une session (10 Hz) : vitesse par paliers de 2 s interpolés, avec sprints,
+# fréquence cardiaque suivant la vitesse avec retard
+def generate_tracking_session(duration_min=95, hz=10, seed=42):
+    rng = np.random.default_rng(seed)
+    n = int(duration_min * 60 * hz)
+    t = np.arange(n) / hz
+
+    knots = np.arange(0, t[-1] + 2, 2.0)
+    targets = np.minimum(rng.gamma(2.0, 0.8, len(knots)), 6.0)
+    sprint = rng.random(len(knots)) < 0.03
+    targets[sprint] = rng.uniform(6.0, 9.5, sprint.sum())
+    speed = np.clip(np.interp(t, knots, targets) + rng.normal(0, 0.08, n), 0, None)
+
+    # Lissage exponentiel de la vitesse (constante de temps ~30 s) vectorisé par convolution
+    kernel = np.exp(-np.arange(30 * hz) / (30 * hz))
+    effort = np.convolve(speed, kernel / kernel.sum())[:n]
+    heart_rate = 110 + 12 * effort + rng.normal(0, 2, n)
+    return pd.DataFrame({'time': t, 'speed': speed, 'heart_rate': np.clip(heart_rate, 60, 205)})
+
+
+# Parquet si pyarrow est installé, sinon CSV (relu par cfc_report, cfc_api et cfc_ingest)
+def write_frame(frame, path):
+    path = Path(path).with_suffix('.parquet' if HAS_PYARROW else '.csv')
+    if HAS_PYARROW:
+        frame.to_parquet(path, index=False)
+    else:
+        frame.to_csv(path, index=False)
+    return path
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Génère des données GPS et de récupération simulées pour les tests de charge.")
+    parser.add_argument('--players', type=int, default=25)
+    parser.add_argument('--seasons', type=int, default=2)
+    parser.add_argument('--sessions-per-week', type=float, default=3.5)
+    parser.add_argument('--start-season', type=int, default=2023)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--out', type=Path, default=Path('synthetic_data'))
+    parser.add_argument('--tracking-days', type=int, default=0,
+                        help="Écrit aussi le suivi brut 10 Hz de chaque joueur sur les N derniers jours (tracking/)")
+    args = parser.parse_args(argv)
+
+    gps = generate_gps_sessions(args.players, args.seasons, args.sessions_per_week, args.start_season, seed=args.seed)
+    recovery = generate_recovery_days(args.players, args.seasons, args.start_season, seed=args.seed)
+
+    args.out.mkdir(parents=True, exist_ok=True)
+    write_frame(gps, args.out / 'gps_sessions')
+    write_frame(recovery, args.out / 'recovery_days')
+    print(f"{len(gps)} sessions GPS et {len(recovery)} jours de récupération écrits dans {args.out}")
+
+    if args.tracking_days:
+        tracking_dir = args.out / 'tracking'
+        tracking_dir.mkdir(exist_ok=True)
+        last_dates = recovery['date'].drop_duplicates().nlargest(args.tracking_days)
+        for i, (date, player) in enumerate((d, p) for d in last_dates for p in recovery['player_id'].cat.categories):
+            session = generate_tracking_session(seed=args.seed + i)
+            write_frame(session, tracking_dir / f'{player}_{date:%Y-%m-%d}')
+        print(f"Suivi brut de {args.tracking_days * args.players} sessions écrit dans {tracking_dir}")
+
+
+if __name__ == '__main__':
+    main()
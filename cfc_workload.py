@@ -0,0 +1,278 @@
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+LOAD_COLUMNS = [
+    'distance',
+    'distance_over_21',
+    'distance_over_24',
+    'distance_over_27',
+    'accel_decel_over_2_5',
+    'accel_decel_over_3_5',
+    'accel_decel_over_4_5',
+]
+METRICS = ['acute', 'chronic', 'acwr', 'acwr_ewma', 'monotony', 'strain']
+
+ACUTE_DAYS = 7
+CHRONIC_DAYS = 28
+ACUTE_LAMBDA = 2 / (ACUTE_DAYS + 1)
+CHRONIC_LAMBDA = 2 / (CHRONIC_DAYS + 1)
+
+DAY = pd.Timedelta(days=1)
+
+
+def metric_column(load_col, metric):
+    return f'{load_col}_{metric}'
+
+
+# Indicateurs du jour à partir des sommes glissantes (mêmes formules en calcul complet et incrémental)
+def _daily_metrics(sum7, sum28, sumsq7, ewma_a, ewma_c, n_days):
+    with np.errstate(invalid='ignore', divide='ignore'):
+        acute = np.where(n_days >= ACUTE_DAYS, sum7 / ACUTE_DAYS, np.nan)
+        chronic = np.where(n_days >= CHRONIC_DAYS, sum28 / CHRONIC_DAYS, np.nan)
+        acwr = np.where(chronic > 0, acute / chronic, np.nan)
+        acwr_ewma = np.where(ewma_c > 0, ewma_a / ewma_c, np.nan)
+        variance = np.maximum(sumsq7 - sum7 ** 2 / ACUTE_DAYS, 0) / (ACUTE_DAYS - 1)
+        std = np.sqrt(variance)
+        monotony = np.where((n_days >= ACUTE_DAYS) & (std > 1e-9), (sum7 / ACUTE_DAYS) / std, np.nan)
+        strain = sum7 * monotony
+    return acute, chronic, acwr, acwr_ewma, monotony, strain
+
+
+# État glissant d'un joueur : 28 derniers jours de charge, sommes 7/28 jours et EWMA.
+# Chaque nouvelle session met l'état à jour en O(1) (au plus 28 jours de repos rejoués).
+class PlayerLoadState:
+
+    def __init__(self, n_cols):
+        self.ring = np.zeros((CHRONIC_DAYS, n_cols))
+        self.pos = CHRONIC_DAYS - 1
+        self.sum7 = np.zeros(n_cols)
+        self.sum28 = np.zeros(n_cols)
+        self.sumsq7 = np.zeros(n_cols)
+        self.ewma_a = np.zeros(n_cols)
+        self.ewma_c = np.zeros(n_cols)
+        self.ewma_a_prev = np.zeros(n_cols)
+        self.ewma_c_prev = np.zeros(n_cols)
+        self.n_days = 0
+        self.last_date = None
+
+    # Sommes recalculées sur la fenêtre (28 valeurs au plus) : coût constant et pas de dérive
+    # d'arrondi, contrairement à des sommes courantes mises à jour par différence
+    def _refresh_sums(self):
+        acute = self.ring[(self.pos - np.arange(ACUTE_DAYS)) % CHRONIC_DAYS]
+        self.sum7 = acute.sum(axis=0)
+        self.sumsq7 = (acute ** 2).sum(axis=0)
+        self.sum28 = self.ring.sum(axis=0)
+
+    def _step(self, load):
+        self.pos = (self.pos + 1) % CHRONIC_DAYS
+        self.ring[self.pos] = load
+        self._refresh_sums()
+
+        self.ewma_a_prev, self.ewma_c_prev = self.ewma_a, self.ewma_c
+        if self.n_days == 0:
+            self.ewma_a, self.ewma_c = load.copy(), load.copy()
+        else:
+            self.ewma_a = ACUTE_LAMBDA * load + (1 - ACUTE_LAMBDA) * self.ewma_a
+            self.ewma_c = CHRONIC_LAMBDA * load + (1 - CHRONIC_LAMBDA) * self.ewma_c
+        self.n_days += 1
+
+    def _rest_days(self, k):
+        if k >= CHRONIC_DAYS:
+            # Au-delà de 28 jours de repos, la fenêtre est vide et l'EWMA décroît géométriquement
+            self.ring[:] = 0
+            self._refresh_sums()
+            self.ewma_a_prev = self.ewma_a * (1 - ACUTE_LAMBDA) ** (k - 1)
+            self.ewma_c_prev = self.ewma_c * (1 - CHRONIC_LAMBDA) ** (k - 1)
+            self.ewma_a = self.ewma_a_prev * (1 - ACUTE_LAMBDA)
+            self.ewma_c = self.ewma_c_prev * (1 - CHRONIC_LAMBDA)
+            self.n_days += k
+            return
+        zero = np.zeros_like(self.sum7)
+        for _ in range(k):
+            self._step(zero)
+
+    # Ajoute la charge d'une session ; retourne False si la date est antérieure au dernier jour
+    def add(self, date, load):
+        if self.last_date is None or date > self.last_date:
+            if self.last_date is not None:
+                self._rest_days((date - self.last_date) // DAY - 1)
+            self._step(load)
+            self.last_date = date
+            return True
+        if date == self.last_date:
+            # Seconde session le même jour : on corrige la charge du jour et l'EWMA du jour
+            current = self.ring[self.pos] + load
+            self.ring[self.pos] = current
+            self._refresh_sums()
+            if self.n_days == 1:
+                self.ewma_a, self.ewma_c = current.copy(), current.copy()
+            else:
+                self.ewma_a = ACUTE_LAMBDA * current + (1 - ACUTE_LAMBDA) * self.ewma_a_prev
+                self.ewma_c = CHRONIC_LAMBDA * current + (1 - CHRONIC_LAMBDA) * self.ewma_c_prev
+            return True
+        return False
+
+    def metrics(self):
+        return _daily_metrics(self.sum7, self.sum28, self.sumsq7, self.ewma_a, self.ewma_c, self.n_days)
+
+
+# Moteur de charge aiguë:chronique. Le calcul initial est vectorisé sur tous les joueurs ;
+# les sessions ajoutées ensuite ne mettent à jour que l'état glissant du joueur concerné.
+class WorkloadEngine:
+
+    def __init__(self, load_columns=LOAD_COLUMNS, player_col='player_id', date_col='date'):
+        self.load_columns = list(load_columns)
+        self.player_col = player_col
+        self.date_col = date_col
+        self.states = {}
+        self._history = self._empty_metrics()
+        self._updates = {}
+        self._sessions = []
+        self._session_rows = []
+        self._metrics = None
+
+    @classmethod
+    def from_sessions(cls, sessions, **kwargs):
+        engine = cls(**kwargs)
+        engine._sessions = [engine._session_frame(sessions)]
+        engine._history, engine.states = engine._bulk(engine._sessions[0])
+        return engine
+
+    def _session_frame(self, sessions):
+        frame = sessions[[self.date_col] + self.load_columns].copy()
+        frame.insert(0, self.player_col, sessions[self.player_col] if self.player_col in sessions else 'P001')
+        frame[self.date_col] = pd.to_datetime(frame[self.date_col]).dt.normalize()
+        return frame
+
+    def _empty_metrics(self):
+        columns = [self.player_col, self.date_col] + [
+            metric_column(col, metric) for col in self.load_columns for metric in METRICS
+        ]
+        return pd.DataFrame(columns=columns)
+
+    def _bulk(self, sessions):
+        if sessions.empty:
+            return self._empty_metrics(), {}
+
+        player_codes, players = pd.factorize(sessions[self.player_col], sort=True)
+        first_day = sessions[self.date_col].min()
+        day_codes = ((sessions[self.date_col] - first_day) // DAY).to_numpy()
+        n_days = int(day_codes.max()) + 1
+        n_players, n_cols = len(players), len(self.load_columns)
+
+        # Charge quotidienne (jour × joueur × colonne), jours sans session à 0
+        loads = np.zeros((n_days, n_players, n_cols))
+        values = sessions[self.load_columns].to_numpy(dtype='float64', na_value=0.0)
+        np.add.at(loads, (day_codes, player_codes), values)
+
+        start = np.full(n_players, n_days)
+        np.minimum.at(start, player_codes, day_codes)
+        elapsed = np.arange(n_days)[:, None] - start[None, :] + 1
+
+        # Sommes glissantes par fenêtres (et non par différences de cumsum, sujettes à l'arrondi)
+        padded = np.concatenate([np.zeros((CHRONIC_DAYS - 1, n_players, n_cols)), loads])
+        windows = sliding_window_view(padded, CHRONIC_DAYS, axis=0)
+        sum28 = windows.sum(axis=-1)
+        sum7 = windows[..., -ACUTE_DAYS:].sum(axis=-1)
+        sumsq7 = (windows[..., -ACUTE_DAYS:] ** 2).sum(axis=-1)
+
+        # EWMA : récurrence sur les jours, vectorisée sur joueurs et colonnes
+        ewma_a = np.empty_like(loads)
+        ewma_c = np.empty_like(loads)
+        prev_a = np.zeros((n_players, n_cols))
+        prev_c = np.zeros((n_players, n_cols))
+        for day in range(n_days):
+            first = (elapsed[day] == 1)[:, None]
+            prev_a = np.where(first, loads[day], ACUTE_LAMBDA * loads[day] + (1 - ACUTE_LAMBDA) * prev_a)
+            prev_c = np.where(first, loads[day], CHRONIC_LAMBDA * loads[day] + (1 - CHRONIC_LAMBDA) * prev_c)
+            ewma_a[day], ewma_c[day] = prev_a, prev_c
+
+        metrics = _daily_metrics(sum7, sum28, sumsq7, ewma_a, ewma_c, elapsed[:, :, None])
+        active = elapsed >= 1
+        day_idx, player_idx = np.nonzero(active)
+        data = {
+            self.player_col: players[player_idx],
+            self.date_col: first_day + pd.to_timedelta(day_idx, unit='D'),
+        }
+        for j, col in enumerate(self.load_columns):
+            for metric, values in zip(METRICS, metrics):
+                data[metric_column(col, metric)] = values[day_idx, player_idx, j]
+        history = pd.DataFrame(data)
+
+        states = {}
+        for p, player in enumerate(players):
+            state = PlayerLoadState(n_cols)
+            window = loads[max(n_days - CHRONIC_DAYS, 0):, p]
+            state.ring[CHRONIC_DAYS - len(window):] = window
+            state.sum7, state.sum28, state.sumsq7 = sum7[-1, p].copy(), sum28[-1, p].copy(), sumsq7[-1, p].copy()
+            state.ewma_a, state.ewma_c = ewma_a[-1, p].copy(), ewma_c[-1, p].copy()
+            if n_days >= 2 and elapsed[-2, p] >= 1:
+                state.ewma_a_prev, state.ewma_c_prev = ewma_a[-2, p].copy(), ewma_c[-2, p].copy()
+            state.n_days = int(elapsed[-1, p])
+            state.last_date = first_day + (n_days - 1) * DAY
+            states[player] = state
+        return history, states
+
+    # Ajout incrémental d'une session (dict ou Series avec joueur, date et colonnes de charge)
+    def add_session(self, session):
+        player = session.get(self.player_col, 'P001')
+        date = pd.Timestamp(session[self.date_col]).normalize()
+        load = np.array([float(session.get(col, 0) or 0) for col in self.load_columns])
+        self._session_rows.append({self.player_col: player, self.date_col: date, **dict(zip(self.load_columns, load))})
+        self._metrics = None
+
+        state = self.states.setdefault(player, PlayerLoadState(len(self.load_columns)))
+        if state.last_date is not None and date < state.last_date:
+            # Session antérieure au dernier jour connu : on recalcule ce joueur uniquement
+            self._rebuild_player(player)
+            return self.latest(player)
+
+        # Jours de repos intermédiaires (charge nulle), puis le jour de la session
+        if state.last_date is not None:
+            rest = np.zeros(len(self.load_columns))
+            for _ in range(1, (date - state.last_date) // DAY):
+                rest_date = state.last_date + DAY
+                state.add(rest_date, rest)
+                self._updates[(player, rest_date)] = self._metrics_row(player, rest_date, state)
+        state.add(date, load)
+        self._updates[(player, date)] = self._metrics_row(player, date, state)
+        return self.latest(player)
+
+    def _metrics_row(self, player, date, state):
+        row = {self.player_col: player, self.date_col: date}
+        for metric, values in zip(METRICS, state.metrics()):
+            for col, value in zip(self.load_columns, values):
+                row[metric_column(col, metric)] = value
+        return row
+
+    def _rebuild_player(self, player):
+        sessions = pd.concat(self._sessions + [pd.DataFrame(self._session_rows)], ignore_index=True)
+        history, states = self._bulk(sessions[sessions[self.player_col] == player])
+        others = self._history[self._history[self.player_col] != player]
+        self._history = pd.concat([others, history], ignore_index=True)
+        self._updates = {key: row for key, row in self._updates.items() if key[0] != player}
+        self.states.update(states)
+
+    def latest(self, player):
+        state = self.states[player]
+        return self._metrics_row(player, state.last_date, state)
+
+    # Dernier état connu de chaque joueur (pour les métriques de synthèse)
+    def latest_frame(self):
+        return pd.DataFrame([self.latest(player) for player in self.states], columns=self._empty_metrics().columns)
+
+    # Historique quotidien complet des indicateurs (une ligne par joueur et par jour)
+    def metrics(self):
+        if self._metrics is None:
+            frames = [self._history]
+            if self._updates:
+                frames.append(pd.DataFrame(list(self._updates.values())))
+            metrics = pd.concat([f for f in frames if not f.empty], ignore_index=True) if any(
+                not f.empty for f in frames) else self._empty_metrics()
+            self._metrics = (
+                metrics.drop_duplicates([self.player_col, self.date_col], keep='last')
+                .sort_values([self.date_col, self.player_col], kind='stable')
+                .reset_index(drop=True)
+            )
+        return self._metrics
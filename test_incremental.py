@@ -0,0 +1,162 @@
+import numpy as np
+import pandas as pd
+
+from cfc_benchmark import REFERENCES, BenchmarkEngine, SortedSample
+from cfc_data import CAPABILITY_KEYS, parse_physical_capability_csv
+from cfc_events import PeakDropDetector
+from cfc_recovery import RecoveryEngine
+from cfc_rollup import GRAINS, RollupTable
+from cfc_synthetic import generate_gps_sessions, generate_recovery_inputs
+from cfc_workload import WorkloadEngine
+
+
+def _split(frame, date_col, fraction=0.7):
+    cutoff = frame[date_col].quantile(fraction)
+    return frame[frame[date_col] <= cutoff], frame[frame[date_col] > cutoff]
+
+
+# Mêmes valeurs sur chaque ligne du calcul incrémental. Le calcul complet prolonge chaque joueur
+# (jours de repos) jusqu'au dernier jour du jeu : il peut avoir des lignes en plus, jamais en moins.
+def _assert_same(incremental, bulk, keys):
+    incremental, bulk = (
+        frame.astype({key: str for key in keys}).set_index(keys).sort_index() for frame in (incremental, bulk)
+    )
+    assert incremental.index.isin(bulk.index).all()
+    pd.testing.assert_frame_equal(
+        incremental, bulk.loc[incremental.index], check_dtype=False, check_categorical=False, rtol=1e-9, atol=1e-9
+    )
+
+
+# Charge aiguë:chronique : sessions ajoutées une à une == calcul complet
+def test_workload_incremental_matches_bulk():
+    sessions = generate_gps_sessions(n_players=3, n_seasons=1, end_date='2023-12-31', seed=1)
+    head, tail = _split(sessions, 'date')
+    engine = WorkloadEngine.from_sessions(head)
+    for _, session in tail.iterrows():
+        engine.add_session(session)
+    _assert_same(engine.metrics(), WorkloadEngine.from_sessions(sessions).metrics(), ['player_id', 'date'])
+
+
+# Session arrivée en retard (antérieure au dernier jour connu) : recalcul du joueur
+def test_workload_late_session_rebuilds_player():
+    sessions = generate_gps_sessions(n_players=2, n_seasons=1, end_date='2023-10-31', seed=2)
+    late = sessions.iloc[len(sessions) // 2]
+    engine = WorkloadEngine.from_sessions(sessions.drop(index=late.name))
+    engine.add_session(late)
+    _assert_same(engine.metrics(), WorkloadEngine.from_sessions(sessions).metrics(), ['player_id', 'date'])
+
+
+# Scores de récupération : jours ajoutés un à un (référence glissante en anneau) == calcul complet
+def test_recovery_incremental_matches_bulk():
+    days = generate_recovery_inputs(n_players=3, n_seasons=1, end_date='2023-11-30', seed=3)
+    # Jours sans mesure pour un joueur : la référence doit sauter les trous comme le calcul complet
+    days = days.drop(index=days.sample(frac=0.1, random_state=0).index)
+    head, tail = _split(days, 'date')
+    engine = RecoveryEngine.from_days(head)
+    for _, day in tail.iterrows():
+        engine.add_day(day.to_dict())
+    _assert_same(engine.scores(), RecoveryEngine.from_days(days).scores(), ['player_id', 'date'])
+
+
+def test_recovery_late_day_rebuilds_player():
+    days = generate_recovery_inputs(n_players=2, n_seasons=1, end_date='2023-10-31', seed=4)
+    late = days.iloc[len(days) // 2]
+    engine = RecoveryEngine.from_days(days.drop(index=late.name))
+    engine.add_day(late.to_dict())
+    _assert_same(engine.scores(), RecoveryEngine.from_days(days).scores(), ['player_id', 'date'])
+
+
+# Tables d'agrégats : lots ajoutés dans le désordre (périodes déjà présentes fusionnées) == calcul complet
+def test_rollup_incremental_matches_bulk():
+    sessions = generate_gps_sessions(n_players=3, n_seasons=1, end_date='2024-02-29', seed=5)
+    columns = ['distance', 'distance_over_21', 'peak_speed']
+    # Valeurs manquantes : l'effectif et le min/max fusionnés doivent les ignorer comme le calcul complet
+    sessions.loc[sessions.sample(frac=0.05, random_state=0).index, 'peak_speed'] = float('nan')
+    shuffled = sessions.sample(frac=1, random_state=1)
+    for keys in ([], ['player_id']):
+        bulk = RollupTable.from_frame(sessions, columns, keys)
+        rollup = RollupTable(columns, keys)
+        for start in range(0, len(shuffled), 40):
+            rollup.add(shuffled.iloc[start:start + 40])
+        for grain in GRAINS:
+            pd.testing.assert_frame_equal(rollup.tables[grain], bulk.tables[grain], check_dtype=False, rtol=1e-9)
+            pd.testing.assert_frame_equal(
+                rollup.query(grain, stats=('mean', 'min', 'max')), bulk.query(grain, stats=('mean', 'min', 'max')),
+                check_dtype=False, rtol=1e-9
+            )
+
+
+# Pics et chutes : tests ajoutés par lots, plus un test en retard (recalcul de sa série) == détection complète
+def test_peak_drop_incremental_matches_bulk():
+    tests = parse_physical_capability_csv().sort_values('testDate', kind='stable')
+    bulk = PeakDropDetector.from_frame(tests).events()
+    # Test en retard : celui d'un événement du premier tiers, arrivé après tous les autres
+    event = bulk.iloc[len(bulk) // 3]
+    late = tests[(tests['testDate'] == event['testDate']) & (tests['benchmarkPct'] == event['benchmarkPct'])
+                 & np.logical_and.reduce([tests[key] == event[key] for key in CAPABILITY_KEYS])]
+    head, tail = _split(tests.drop(index=late.index), 'testDate', fraction=0.5)
+    detector = PeakDropDetector.from_frame(head)
+    for start in range(0, len(tail), 500):
+        detector.add_tests(tail.iloc[start:start + 500])
+    detector.add_tests(late)
+
+    incremental, bulk = (events.astype({key: str for key in CAPABILITY_KEYS}) for events in (detector.events(), bulk))
+    pd.testing.assert_frame_equal(incremental, bulk, check_dtype=False, check_categorical=False, rtol=1e-6)
+
+
+# Résultats de tests simulés : valeurs arrondies (ex aequo) et quelques résultats manquants
+def _squad_tests(n=3000, seed=6):
+    rng = np.random.default_rng(seed)
+    tests = pd.DataFrame({
+        'player_id': rng.integers(0, 40, n).astype(str),
+        'age_group': pd.Categorical(rng.choice(['U18', 'U21', 'First team'], n)),
+        'expression': rng.choice(['isometric', 'dynamic'], n),
+        'movement': rng.choice(['sprint', 'jump', 'agility'], n),
+        'quality': rng.choice(['acceleration', 'max velocity'], n),
+        'result': rng.normal(50, 10, n).round(),
+    })
+    tests.loc[rng.random(n) < 0.02, 'result'] = np.nan
+    return tests
+
+
+# Rang centile par force brute : valeurs strictement inférieures, plus la moitié des ex aequo
+def _brute_percentiles(tests, reference):
+    keys = (['age_group'] if reference == 'age_group' else []) + ['expression', 'movement', 'quality']
+    out = pd.Series(np.nan, index=tests.index)
+    for _, group in tests.groupby(keys, observed=True):
+        sample = group['result'].dropna().to_numpy()
+        for index, value in group['result'].items():
+            if not np.isnan(value):
+                out[index] = ((sample < value).sum() + (sample == value).sum() / 2) / len(sample)
+    return out
+
+
+# Percentiles : tests ajoutés par petits lots (tampon puis fusion) == moteur construit d'un coup == force brute
+def test_benchmark_incremental_matches_bulk():
+    tests = _squad_tests()
+    bulk = BenchmarkEngine.from_tests(tests)
+    engine = BenchmarkEngine()
+    for start in range(0, len(tests), 7):
+        engine.add(tests.iloc[start:start + 7])
+    for reference in REFERENCES:
+        expected = _brute_percentiles(tests, reference)
+        np.testing.assert_allclose(bulk.percentiles(tests, reference), expected, rtol=1e-12)
+        np.testing.assert_allclose(engine.percentiles(tests, reference), expected, rtol=1e-12)
+        sizes = [frame.sort_values(list(frame.columns)).reset_index(drop=True)
+                 for frame in (engine.sizes(reference), bulk.sizes(reference))]
+        pd.testing.assert_frame_equal(*sizes)
+
+
+def test_sorted_sample_merge_matches_combined():
+    rng = np.random.default_rng(7)
+    a, b = rng.normal(size=500).round(1), rng.normal(size=300).round(1)
+    left = SortedSample(a[:100])
+    for start in range(100, len(a), 3):
+        left.add(a[start:start + 3])
+    right = SortedSample().add(b)
+    merged = left.merge(right)
+    combined = SortedSample(np.concatenate([a, b]))
+    probe = np.linspace(-3, 3, 61)
+    np.testing.assert_array_equal(merged.values, combined.values)
+    np.testing.assert_allclose(merged.percentile(probe), combined.percentile(probe))
+    np.testing.assert_allclose(left.percentile(probe), SortedSample(a).percentile(probe))